@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .client import get_paga_client
+from .utils import generate_reference
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "paga:banks:v1"
+REFRESH_LOCK_KEY = "paga:banks:refresh-lock"
+# set for PAGA_BANKS_FAILURE_TTL seconds after a failed cold fetch, so callers fail fast meanwhile
+FAILURE_KEY = "paga:banks:unavailable"
+
+# Paga identifies banks by any of these keys depending on the endpoint, we index them all
+BANK_CODE_KEYS = ("uuid", "bankCode", "sortCode", "interInstitutionCode")
+
+
+class BankDirectoryUnavailable(Exception):
+    """Raised when there is no cached bank list and Paga could not be reached."""
+
+
+class BankDirectory:
+    """
+        Bank list from Paga's ``getBanks``, cached with Django's cache framework.
+
+        The cached entry never expires on its own: once ``PAGA_BANKS_TTL`` has passed
+        it is served stale while one background thread refreshes it
+        (stale-while-revalidate). If Paga is down, or answers with an error or an empty
+        list, the last good list keeps being served. Only a cold cache waits on Paga, and
+        only one caller at a time: the others, and every caller for PAGA_BANKS_FAILURE_TTL
+        seconds after a failed fetch, get BankDirectoryUnavailable at once.
+
+        Each process also keeps the entry in memory for LOCAL_TTL seconds, so bulk
+        lookups (batch rows) do not go back to the cache for every row.
+    """
+
+    LOCAL_TTL = 60
+
+    def __init__(self):
+        self._local = None
+        self._local_until = 0.0
+
+    def get(self) -> dict:
+        """
+            Return the cached entry: {"banks", "index", "reference", "fetched_at"}.
+        """
+        if self._local is not None and time.monotonic() < self._local_until:
+            return self._local
+
+        entry = cache.get(CACHE_KEY)
+        if entry is None:
+            return self.refresh_cold()
+        if time.time() - entry["fetched_at"] > settings.PAGA_BANKS_TTL:
+            self.refresh_in_background()
+        return self._remember(entry)
+
+    def banks(self) -> list:
+        return self.get()["banks"]
+
+    def lookup(self, bank_code):
+        """
+            Find a bank by any of its codes, None when the code is unknown.
+        """
+        return self.get()["index"].get(str(bank_code).strip().upper())
+
+    def refresh(self) -> dict:
+        """
+            Fetch the list from Paga and store it, raises BankDirectoryUnavailable on failure.
+        """
+        ref = generate_reference()
+        try:
+            res = get_paga_client().post("getBanks", {"referenceNumber": ref}, ref, idempotent=True)
+        except Exception as e:
+            raise BankDirectoryUnavailable(f"Paga request failed {e}") from e
+
+        if res.status_code != 200:
+            raise BankDirectoryUnavailable(res.text)
+        try:
+            body = res.json()
+        except ValueError as e:
+            raise BankDirectoryUnavailable("Paga getBanks response is not JSON") from e
+        if not isinstance(body, dict) or body.get("responseCode", 0) != 0:
+            raise BankDirectoryUnavailable(f"Paga getBanks failed {str(body)[:200]}")
+        banks = body.get("banks")
+        if not banks or not isinstance(banks, list):
+            # never replace a good list with an empty one
+            raise BankDirectoryUnavailable("Paga getBanks returned no banks")
+
+        entry = {
+            "banks": banks,
+            "index": self.build_index(banks),
+            "reference": ref,
+            "fetched_at": time.time(),
+        }
+        cache.set(CACHE_KEY, entry, timeout=None)
+        return self._remember(entry)
+
+    def refresh_cold(self) -> dict:
+        """
+            refresh() for an empty cache, by one caller at a time (the refresh lock) and not
+            again for PAGA_BANKS_FAILURE_TTL seconds after a failure.
+        """
+        if cache.get(FAILURE_KEY):
+            raise BankDirectoryUnavailable("Paga getBanks failed recently")
+        if not cache.add(REFRESH_LOCK_KEY, 1, timeout=settings.PAGA_BANKS_REFRESH_LOCK):
+            raise BankDirectoryUnavailable("Bank list is being fetched")
+        try:
+            entry = self.refresh()
+        except BankDirectoryUnavailable:
+            cache.set(FAILURE_KEY, True, timeout=settings.PAGA_BANKS_FAILURE_TTL)
+            raise
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+        cache.delete(FAILURE_KEY)
+        return entry
+
+    def _remember(self, entry) -> dict:
+        self._local = entry
+        self._local_until = time.monotonic() + self.LOCAL_TTL
+        return entry
+
+    def forget(self):
+        """Drop the cached list (this process and the shared cache)."""
+        self._local = None
+        cache.delete(CACHE_KEY)
+
+    def refresh_in_background(self):
+        """
+            Refresh in a daemon thread. The cache lock keeps it to one refresh at a time
+            across workers, and is left to expire after a failure so Paga is not hammered.
+        """
+        if not cache.add(REFRESH_LOCK_KEY, 1, timeout=settings.PAGA_BANKS_REFRESH_LOCK):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except BankDirectoryUnavailable as e:
+                logger.warning("Bank directory refresh failed, serving stale list: %s", e)
+            else:
+                cache.delete(REFRESH_LOCK_KEY)
+
+        threading.Thread(target=run, name="paga-banks-refresh", daemon=True).start()
+
+    @staticmethod
+    def build_index(banks) -> dict:
+        index = {}
+        for bank in banks:
+            for key in BANK_CODE_KEYS:
+                code = bank.get(key)
+                if code:
+                    index[str(code).strip().upper()] = bank
+        return index
+
+
+bank_directory = BankDirectory()
@@ -0,0 +1,154 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import duplicates
+from .models import Payment, PaymentBatch, PaymentDispatch
+from .serializers import PaymentRowSerializer
+from .services import build_payment
+
+logger = logging.getLogger(__name__)
+
+# a batch whose idempotency keys keep clashing with concurrent requests is given up after this many tries
+CREATE_ATTEMPTS = 3
+
+
+def create_batch(rows, user=None, initiator="SCHEDULE", description="") -> PaymentBatch:
+    """
+        Validate an iterable of row dicts and store the accepted ones as PENDING payments.
+
+        Rows are validated without per-row queries, then duplicates are resolved for the
+        whole batch with two set-based queries (idempotency keys, recent identical payments)
+        and the payments are written with bulk_create, each queued for the payment dispatcher
+        in the same transaction (enqueue_batch). Rows whose idempotency key a concurrent
+        request takes meanwhile are rejected like any used key.
+    """
+    accepted, rejections = [], []
+    for row_no, row in enumerate(rows, start=1):
+        if row_no > settings.PAGA_BATCH_MAX_ROWS:
+            raise serializers.ValidationError({"rows": f"A batch can hold at most {settings.PAGA_BATCH_MAX_ROWS} rows."})
+        ser = PaymentRowSerializer(data=row)
+        if ser.is_valid():
+            accepted.append((row_no, ser.validated_data))
+        else:
+            rejections.append({"row": row_no, "errors": ser.errors})
+
+    total_rows = len(accepted) + len(rejections)
+    if not total_rows:
+        raise serializers.ValidationError({"rows": "The batch is empty."})
+
+    for attempt in range(1, CREATE_ATTEMPTS + 1):
+        kept, row_rejections = reject_duplicates(accepted, list(rejections))
+        try:
+            batch, payments = store_batch(kept, row_rejections, total_rows, user, initiator, description)
+        except IntegrityError:
+            # a concurrent request took one of the idempotency keys meanwhile: it is committed
+            # now, so the next check rejects the clashing rows
+            if attempt == CREATE_ATTEMPTS:
+                raise
+            logger.info("Payment batch idempotency key clash, checking the rows again (%s)", attempt)
+        else:
+            duplicates.remember(*payments)
+            return batch
+
+
+def store_batch(accepted, rejections, total_rows, user, initiator, description):
+    """Write the batch, its payments and their dispatch jobs in one transaction."""
+    rejections.sort(key=lambda r: r["row"])
+    with transaction.atomic():
+        batch = PaymentBatch.objects.create(
+            user=user,
+            initiator=initiator,
+            description=description,
+            total_rows=total_rows,
+            accepted_rows=len(accepted),
+            rejected_rows=len(rejections),
+            total_amount=sum((data["amount"] for _, data in accepted), 0),
+            rejections=rejections,
+            status="PENDING" if accepted else "COMPLETED",
+            completed_at=None if accepted else timezone.now(),
+        )
+        payments = Payment.objects.bulk_create(
+            [
+                build_payment(data, user=user, batch=batch, batch_row=row_no, initiator=initiator)
+                for row_no, data in accepted
+            ],
+            batch_size=500,
+        )
+        enqueue_batch(payments)
+    return batch, payments
+
+
+def reject_duplicates(accepted, rejections):
+    """
+        Drop rows whose idempotency key is already used, or that repeat a PENDING/SUCCESS
+        payment made inside PAGA_DUPLICATE_WINDOW (in the database or earlier in the batch).
+        Returns the rows that remain and ``rejections`` with the rejected rows appended.
+    """
+    used_keys, recent = duplicates.check_rows([data for _, data in accepted])
+
+    kept = []
+    for row_no, data in accepted:
+        key = data.get("idempotency_key")
+        fingerprint = duplicates.fingerprint(data["account_number"], data["bank_code"], data["amount"])
+        if key and key in used_keys:
+            rejections.append({"row": row_no, "errors": {"idempotency_key": ["This payment request has already been processed."]}})
+        elif fingerprint in recent:
+            rejections.append({"row": row_no, "errors": {"duplicate": ["A similar payment already exist!"]}})
+        else:
+            kept.append((row_no, data))
+            recent.add(fingerprint)
+            if key:
+                used_keys.add(key)
+    return kept, rejections
+
+
+def enqueue_batch(payments) -> int:
+    """
+        Queue a batch's PENDING payments for the dispatcher (apps.paga_payments.dispatch),
+        in row order and spaced to PAGA_BATCH_RATE_LIMIT calls per second with available_at,
+        so the rate holds whichever dispatcher processes pick the jobs up. Call it inside the
+        transaction that stores the payments. Returns the number of jobs queued.
+    """
+    rate = settings.PAGA_BATCH_RATE_LIMIT
+    start = timezone.now()
+    payments = sorted(payments, key=lambda payment: payment.batch_row or 0)
+    PaymentDispatch.objects.bulk_create(
+        [
+            PaymentDispatch(payment=payment, available_at=start + timedelta(seconds=i / rate) if rate else start)
+            for i, payment in enumerate(payments)
+        ],
+        batch_size=500,
+    )
+    return len(payments)
+
+
+def close_batch(batch_id: int) -> bool:
+    """
+        Mark a batch COMPLETED with its final counts once none of its payments is waiting in
+        the dispatch queue. The dispatcher calls it after each batch job; the batch row lock
+        makes the last two jobs of a batch agree. Returns whether the batch is closed.
+    """
+    with transaction.atomic():
+        batch = PaymentBatch.objects.select_for_update().filter(pk=batch_id).exclude(status="COMPLETED").first()
+        if batch is None:
+            return True
+        if PaymentDispatch.objects.filter(payment__batch_id=batch_id, status__in=["QUEUED", "PROCESSING"]).exists():
+            return False
+        counts = batch.payments.aggregate(
+            succeeded=Count("id", filter=Q(status="SUCCESS")),
+            failed=Count("id", filter=Q(status="FAILED")),
+        )
+        PaymentBatch.objects.filter(pk=batch_id).update(
+            status="COMPLETED",
+            succeeded_rows=counts["succeeded"],
+            failed_rows=counts["failed"],
+            completed_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+    return True
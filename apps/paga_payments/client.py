@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Gateway-side failures that are safe to replay for idempotent calls
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+def never_sent(error) -> bool:
+    """
+        Whether a failed Paga call certainly never reached Paga: the connection could not be
+        opened, or the request was not built. A read timeout or a connection dropped mid-request
+        may come after Paga received (and paid) it.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+    return not isinstance(error, requests.RequestException)
+
+
+class PagaClient:
+    """
+        Pooled, keep-alive HTTP client for the Paga business API.
+
+        Settings are read once when the client is built, and every call reuses
+        the same ``requests.Session`` so connections are kept alive between calls.
+        Connection failures are retried for every call (the request never reached Paga),
+        read timeouts and 5xx answers are only retried when the call is idempotent: at most
+        PAGA_MAX_RETRIES retries in all, by post() alone.
+    """
+
+    def __init__(
+        self,
+        base_url=None,
+        principal=None,
+        credentials=None,
+        hash_key=None,
+        connect_timeout=None,
+        read_timeout=None,
+        pool_maxsize=None,
+        max_retries=None,
+        backoff_factor=None,
+        pooled=True,
+    ):
+        self.base_url = (base_url if base_url is not None else settings.PAGA_BASE_URL or "").rstrip("/")
+        self.principal = principal if principal is not None else settings.PAGA_PRINCIPAL
+        self.credentials = credentials if credentials is not None else settings.PAGA_CREDENTIALS
+        self.hash_key = hash_key if hash_key is not None else settings.PAGA_HASHKEY or ""
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else settings.PAGA_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else settings.PAGA_READ_TIMEOUT,
+        )
+        self.max_retries = max_retries if max_retries is not None else settings.PAGA_MAX_RETRIES
+        self.backoff_factor = backoff_factor if backoff_factor is not None else settings.PAGA_RETRY_BACKOFF
+        self.pooled = pooled
+
+        if not self.principal and not self.credentials:
+            logger.warning("PAGA_PRINCIPAL or PAGA_CREDENTIALS is not configured")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize or settings.PAGA_POOL_MAXSIZE,
+            pool_block=True,
+            # no urllib3 retries: post() is the only retry layer
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def hash(self, concat_str: str) -> str:
+        """
+            Compute SHA-512 hash(concat + hashKey)
+        """
+        raw = concat_str + self.hash_key
+        return hashlib.sha512(raw.encode("utf-8")).hexdigest()
+
+    def url(self, endpoint: str) -> str:
+        if not self.base_url:
+            raise RuntimeError("Missing required setting: PAGA_BASE_URL")
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def post(self, endpoint: str, payload: dict, concat_str: str, idempotent: bool = False):
+        """
+            POST to Paga with principal, credentials and hash headers.
+            A call that never reached Paga (never_sent) is retried with backoff; set
+            ``idempotent`` for read-only calls (getBanks, status lookups) to also retry
+            read timeouts and 502/503/504 answers.
+        """
+        url = self.url(endpoint)
+        headers = {
+            "principal": self.principal,
+            "credentials": self.credentials,
+            "hash": self.hash(concat_str),
+            "Content-Type": "application/json",
+        }
+        attempts = 1 + self.max_retries
+
+        for attempt in range(attempts):
+            last_try = attempt == attempts - 1
+            try:
+                res = self._send(url, payload, headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_try or not (idempotent or never_sent(e)):
+                    raise
+                logger.info("Paga %s failed, retrying (%s/%s)", endpoint, attempt + 1, attempts - 1)
+            else:
+                if last_try or not idempotent or res.status_code not in RETRY_STATUSES:
+                    return res
+                logger.info("Paga %s returned %s, retrying (%s/%s)", endpoint, res.status_code, attempt + 1, attempts - 1)
+            time.sleep(self.backoff_factor * (2 ** attempt))
+
+    def transaction_status(self, reference: str):
+        """
+            Look up a transaction by the referenceNumber it was sent with.
+        """
+        return self.post("transactionStatus", {"referenceNumber": reference}, reference, idempotent=True)
+
+    def _send(self, url, payload, headers):
+        if self.pooled:
+            return self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+        # Un-pooled mode opens a fresh connection per call (kept for benchmarks)
+        return requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_paga_client() -> PagaClient:
+    """
+        Return the process-wide Paga client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PagaClient()
+    return _client
+
+
+def reset_paga_client():
+    """
+        Drop the process-wide client so the next call picks up new settings.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,144 @@
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .batches import close_batch
+from .models import PaymentBatch, PaymentDispatch
+from .services import send_payment
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_payment(payment) -> PaymentDispatch:
+    """
+        Queue a PENDING payment for the dispatcher. Call it inside the transaction that
+        creates the payment so both rows commit together.
+    """
+    return PaymentDispatch.objects.create(payment=payment)
+
+
+def claim_jobs(worker_id: str, limit: int, jobs=None) -> list:
+    """
+        Lock up to ``limit`` due jobs (of the ``jobs`` queryset, every job by default) and mark
+        them PROCESSING. SKIP LOCKED lets any number of dispatcher processes share the queue.
+    """
+    now = timezone.now()
+    jobs = PaymentDispatch.objects.all() if jobs is None else jobs
+    with transaction.atomic():
+        jobs = list(
+            jobs.select_for_update(skip_locked=True)
+            .filter(status="QUEUED", available_at__lte=now)
+            .order_by("available_at")[:limit]
+        )
+        if jobs:
+            PaymentDispatch.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status="PROCESSING",
+                locked_at=now,
+                locked_by=worker_id,
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+    return jobs
+
+
+def requeue_stale_jobs(jobs=None) -> int:
+    """
+        Put back jobs (of the ``jobs`` queryset, every job by default) whose worker died
+        mid-flight. The payment keeps its reference_number, so a replay is recognised by Paga
+        as the same transaction.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.PAGA_DISPATCH_LEASE)
+    jobs = PaymentDispatch.objects.all() if jobs is None else jobs
+    stale = jobs.filter(status="PROCESSING", locked_at__lt=cutoff)
+    given_up = stale.filter(attempts__gte=settings.PAGA_DISPATCH_MAX_ATTEMPTS)
+    batch_ids = set(given_up.exclude(payment__batch__isnull=True).values_list("payment__batch_id", flat=True))
+    exhausted = given_up.update(
+        status="FAILED", last_error="Worker lease expired too many times", updated_at=timezone.now()
+    )
+    requeued = stale.update(status="QUEUED", locked_at=None, locked_by="", updated_at=timezone.now())
+    for batch_id in batch_ids:
+        close_batch(batch_id)
+    if exhausted or requeued:
+        logger.warning("Dispatch queue: requeued %s stale jobs, gave up on %s", requeued, exhausted)
+    return requeued
+
+
+def process_job(job_id: int):
+    """
+        Send one claimed job's payment to Paga, then close the job.
+    """
+    close_old_connections()
+    job = PaymentDispatch.objects.select_related("payment").get(pk=job_id)
+    batch_id = job.payment.batch_id
+    if batch_id:
+        PaymentBatch.objects.filter(pk=batch_id, status="PENDING").update(status="PROCESSING", updated_at=timezone.now())
+    try:
+        if job.payment.status == "PENDING":
+            send_payment(job.payment)
+    except Exception as e:
+        logger.exception("Dispatch of payment %s failed", job.payment.reference_number)
+        job.status = "FAILED"
+        job.last_error = str(e)
+    else:
+        job.status = "DONE"
+    job.save(update_fields=["status", "last_error", "updated_at"])
+    if batch_id:
+        close_batch(batch_id)
+    close_old_connections()
+
+
+class PaymentDispatcher:
+    """
+        Thread pool that drains the PaymentDispatch queue.
+
+        Run it with ``python manage.py run_payment_dispatcher``; several processes can run
+        side by side. Paga latency only ties up these threads, never the API workers.
+        ``jobs`` narrows the queue to a PaymentDispatch queryset (e.g. a benchmark's own jobs).
+    """
+
+    def __init__(self, workers=None, poll_interval=1.0, worker_id=None, jobs=None):
+        self.workers = workers or settings.PAGA_DISPATCH_WORKERS
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.jobs = jobs
+        self.stop_event = threading.Event()
+
+    def run(self, once=False) -> int:
+        """
+            Process jobs until stopped (or until the queue is empty when ``once`` is set).
+            Returns the number of jobs processed.
+        """
+        processed = 0
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="paga-dispatch") as pool:
+            while not self.stop_event.is_set():
+                requeue_stale_jobs(self.jobs)
+                free = self.workers - len(in_flight)
+                jobs = claim_jobs(self.worker_id, free, self.jobs) if free else []
+                in_flight.update(pool.submit(process_job, job.pk) for job in jobs)
+
+                if not in_flight:
+                    if once:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                done, in_flight = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        logger.error("Dispatch worker error: %s", future.exception())
+                processed += len(done)
+            wait(in_flight)
+            processed += len(in_flight)
+        return processed
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .models import Payment
+
+# Payments that block an identical one inside the duplicate window
+ACTIVE_STATUSES = ["PENDING", "SUCCESS"]
+
+
+class DuplicateCheck(NamedTuple):
+    """Outcome of check_payment."""
+    replay: Optional[Payment] = None      # same idempotency key, answer with this payment
+    duplicate: bool = False               # an identical payment was made recently
+    duplicate_ref: Optional[str] = None   # its reference, when known
+
+
+def fingerprint(account_number, bank_code, amount) -> str:
+    amount = Decimal(amount).quantize(Decimal("0.01"))
+    return f"paga:fp:{account_number}:{bank_code}:{amount}"
+
+
+def window_start():
+    return timezone.now() - timedelta(seconds=settings.PAGA_DUPLICATE_WINDOW)
+
+
+def check_payment(data) -> DuplicateCheck:
+    """
+        Resolve the idempotency and double-payment checks for one payment.
+
+        1. Recent fingerprints in the cache reject an obvious duplicate with no query.
+        2. Otherwise one query, backed by the idempotency_key unique index and the
+           (account_number, bank_code, amount, created_at) index, finds either the
+           payment with the same idempotency key (preferred) or an identical recent one.
+        3. When neither exists the fingerprint is claimed with cache.add, so a concurrent
+           identical request loses the race instead of creating a second payment. That only
+           holds across workers with a shared cache (REDIS_URL); the per-process default
+           covers one worker. If no payment is created after all, call release(data).
+    """
+    key = data.get("idempotency_key") or None
+    fp = fingerprint(data["account_number"], data["bank_code"], data["amount"])
+
+    cached = cache.get(fp)
+    if cached and not (key and cached.get("key") == key):
+        return DuplicateCheck(duplicate=True, duplicate_ref=cached.get("ref"))
+
+    match = Q(
+        account_number=data["account_number"],
+        bank_code=data["bank_code"],
+        amount=data["amount"],
+        created_at__gte=window_start(),
+        status__in=ACTIVE_STATUSES,
+    )
+    if key:
+        qs = Payment.objects.filter(match | Q(idempotency_key=key)).annotate(
+            key_match=Case(When(idempotency_key=key, then=Value(0)), default=Value(1), output_field=IntegerField())
+        ).order_by("key_match", "-created_at")
+    else:
+        qs = Payment.objects.filter(match).order_by("-created_at")
+    existing = qs.first()
+
+    if existing is not None:
+        if key and existing.idempotency_key == key:
+            return DuplicateCheck(replay=existing)
+        remember(existing)
+        return DuplicateCheck(duplicate=True, duplicate_ref=existing.reference_number)
+
+    if not cache.add(fp, {"key": key, "ref": None}, timeout=settings.PAGA_DUPLICATE_WINDOW):
+        return DuplicateCheck(duplicate=True, duplicate_ref=(cache.get(fp) or {}).get("ref"))
+    return DuplicateCheck()
+
+
+def check_rows(rows):
+    """
+        Set-based variant for a batch of validated rows: returns (used idempotency keys,
+        fingerprints of recent active payments) with one query each.
+    """
+    keys = {data["idempotency_key"] for data in rows if data.get("idempotency_key")}
+    used_keys = set(
+        Payment.objects.filter(idempotency_key__in=keys).values_list("idempotency_key", flat=True)
+    ) if keys else set()
+
+    accounts = {data["account_number"] for data in rows}
+    recent = {
+        fingerprint(*values)
+        for values in Payment.objects.filter(
+            account_number__in=accounts,
+            created_at__gte=window_start(),
+            status__in=ACTIVE_STATUSES,
+        ).values_list("account_number", "bank_code", "amount")
+    } if accounts else set()
+    return used_keys, recent
+
+
+def remember(*payments):
+    """Record payments in the recent-fingerprints cache."""
+    cache.set_many(
+        {
+            fingerprint(p.account_number, p.bank_code, p.amount): {"key": p.idempotency_key, "ref": p.reference_number}
+            for p in payments
+        },
+        timeout=settings.PAGA_DUPLICATE_WINDOW,
+    )
+
+
+def forget(payment):
+    """A failed payment no longer blocks an identical retry."""
+    cache.delete(fingerprint(payment.account_number, payment.bank_code, payment.amount))
+
+
+def release(data):
+    """Drop the fingerprint check_payment claimed for ``data`` when its payment was not created."""
+    fp = fingerprint(data["account_number"], data["bank_code"], data["amount"])
+    cached = cache.get(fp)
+    if cached and cached.get("ref") is None and cached.get("key") == (data.get("idempotency_key") or None):
+        cache.delete(fp)
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BANKS = [
+    {"name": "Access Bank", "uuid": "3E94C4BC-6F9A-442F-8F1A-8214478D5D86", "sortCode": "044150149", "interInstitutionCode": "000014"},
+    {"name": "Guaranty Trust Bank", "uuid": "31AF9C6B-7B87-4E6D-8D25-8BEC2E3FE3D8", "sortCode": "058152036", "interInstitutionCode": "000013"},
+    {"name": "First Bank of Nigeria", "uuid": "8B9CCA7B-D6D6-4A08-A8C4-6C4C1F0B4C2F", "sortCode": "011151003", "interInstitutionCode": "000016"},
+    {"name": "Zenith Bank", "uuid": "6C5D7C3E-8A7B-4E5F-9C0D-1A2B3C4D5E6F", "sortCode": "057150013", "interInstitutionCode": "000015"},
+]
+
+
+class FakePagaServer:
+    """
+        Local stand-in for the Paga business API, used by benchmarks and manual testing.
+
+        Answers ``getBanks``, ``payment`` and ``transactionStatus`` over keep-alive HTTP/1.1
+        after an artificial ``latency`` (seconds). Payments it accepted are remembered in
+        ``transactions`` (reference -> status) for status lookups. Extra endpoints can be added through
+        ``handlers``: a mapping of endpoint name -> callable(payload) returning
+        ``(status_code, body)``.
+
+        Usage:
+            with FakePagaServer(latency=0.02) as paga:
+                client = PagaClient(base_url=paga.base_url)
+    """
+
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0, banks=None, handlers=None):
+        self.latency = latency
+        self.banks = banks if banks is not None else DEFAULT_BANKS
+        self.handlers = {
+            "getBanks": self.get_banks,
+            "payment": self.payment,
+            "transactionStatus": self.transaction_status,
+        }
+        self.transactions = {}
+        self.handlers.update(handlers or {})
+        self.calls = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/paga-external-business-rest/secured"
+
+    def get_banks(self, payload):
+        return 200, {"responseCode": 0, "referenceNumber": payload.get("referenceNumber"), "banks": self.banks}
+
+    def payment(self, payload):
+        transaction_id = uuid.uuid4().hex[:12].upper()
+        self.transactions[payload.get("referenceNumber")] = {"status": "SUCCESSFUL", "transactionId": transaction_id}
+        return 200, {
+            "responseCode": 0,
+            "referenceNumber": payload.get("referenceNumber"),
+            "transactionId": transaction_id,
+            "message": "Transaction successful",
+        }
+
+    def transaction_status(self, payload):
+        ref = payload.get("referenceNumber")
+        found = self.transactions.get(ref)
+        if found is None:
+            return 200, {"responseCode": 0, "referenceNumber": ref, "status": "NOT_FOUND"}
+        return 200, {"responseCode": 0, "referenceNumber": ref, **found}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment, avoids delayed-ACK stalls on keep-alive
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                with server._lock:
+                    server.calls += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                handler = server.handlers.get(self.path.rstrip("/").rsplit("/", 1)[-1])
+                if handler is None:
+                    status, body = 404, {"responseCode": -1, "message": "Unknown endpoint"}
+                else:
+                    status, body = handler(payload)
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
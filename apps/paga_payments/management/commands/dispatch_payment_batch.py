@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.paga_payments.batches import close_batch, enqueue_batch
+from apps.paga_payments.models import PaymentBatch, PaymentDispatch
+
+
+class Command(BaseCommand):
+    """
+        Queue (again) the PENDING payments of a payment batch for the payment dispatcher:
+        those without a dispatch job, and those whose job failed. run_payment_dispatcher
+        sends them.
+
+        python manage.py dispatch_payment_batch 42
+    """
+
+    help = "Queue the PENDING payments of a payment batch for the payment dispatcher"
+
+    def add_arguments(self, parser):
+        parser.add_argument("batch_id", type=int)
+
+    def handle(self, *args, **options):
+        batch_id = options["batch_id"]
+        batch = PaymentBatch.objects.filter(pk=batch_id).first()
+        if batch is None:
+            raise CommandError(f"Payment batch {batch_id} does not exist")
+
+        pending = batch.payments.filter(status="PENDING")
+        with transaction.atomic():
+            retried = PaymentDispatch.objects.filter(payment__in=pending, status="FAILED").update(
+                status="QUEUED", attempts=0, locked_at=None, locked_by="", last_error="",
+                available_at=timezone.now(), updated_at=timezone.now(),
+            )
+            queued = enqueue_batch(pending.filter(dispatch__isnull=True).order_by("batch_row"))
+            if retried or queued:
+                PaymentBatch.objects.filter(pk=batch_id).update(status="PROCESSING", completed_at=None, updated_at=timezone.now())
+        if not (retried or queued):
+            close_batch(batch_id)
+        batch.refresh_from_db()
+        self.stdout.write(self.style.SUCCESS(str(batch)))
+        self.stdout.write(f"queued={queued} retried={retried} status={batch.status}")
@@ -0,0 +1,283 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import TruncDate
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.paga_payments.banks import CACHE_KEY as BANKS_CACHE_KEY, bank_directory
+from apps.paga_payments.client import PagaClient, reset_paga_client
+from apps.paga_payments import duplicates
+from apps.paga_payments.dispatch import PaymentDispatcher
+from apps.paga_payments.fake_paga import DEFAULT_BANKS, FakePagaServer
+from apps.paga_payments.models import Payment, PaymentDispatch
+from apps.paga_payments.reconciliation import reconcilable_payments, reconcile_payments
+from apps.paga_payments.rollups import rebuild_rollups, record_transitions
+from apps.paga_payments.utils import generate_reference
+from apps.paga_payments.views import InitiatePaymentView
+
+BENCH_EMAIL = "paga-bench@sunkinghub.local"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    """
+        Benchmarks for the Paga integration, run against a local fake Paga server.
+
+        python manage.py paga_bench --scenario latency --requests 500 --concurrency 8 --latency-ms 5
+        python manage.py paga_bench --scenario dispatch --requests 200 --concurrency 8 --latency-ms 250
+        python manage.py paga_bench --scenario duplicates --rows 1000000 --requests 1000
+        python manage.py paga_bench --scenario reconcile --requests 2000 --concurrency 8 --latency-ms 20
+
+        Scenarios that write payments use a throw-away bench user or description, and delete
+        those payments at the end (reconcile rolls its runs back, rollup deltas included).
+    """
+
+    help = "Benchmark the Paga integration against a local fake Paga server"
+
+    scenarios = ["latency", "dispatch", "duplicates", "reconcile"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=self.scenarios, default="latency")
+        parser.add_argument("--requests", type=int, default=500, help="Number of calls per run")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+        parser.add_argument("--latency-ms", type=float, default=5.0, help="Artificial Paga latency")
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Payments seeded for the duplicates scenario")
+
+    def handle(self, *args, **options):
+        getattr(self, f"bench_{options['scenario']}")(**options)
+
+    def bench_latency(self, requests, concurrency, latency_ms, **options):
+        """p50/p99 of getBanks calls with and without the pooled session."""
+        with FakePagaServer(latency=latency_ms / 1000) as paga:
+            for pooled in (False, True):
+                client = PagaClient(
+                    base_url=paga.base_url,
+                    principal="bench",
+                    credentials="bench",
+                    hash_key="bench",
+                    pool_maxsize=concurrency,
+                    pooled=pooled,
+                )
+                connections_before = paga.connections
+                samples, elapsed = self._run(client, requests, concurrency)
+                client.close()
+                self.stdout.write(
+                    f"{'pooled' if pooled else 'unpooled':>9}: "
+                    f"p50={percentile(samples, 50) * 1000:.2f}ms "
+                    f"p99={percentile(samples, 99) * 1000:.2f}ms "
+                    f"throughput={requests / elapsed:.0f} req/s "
+                    f"connections={paga.connections - connections_before}"
+                )
+
+    def bench_dispatch(self, requests, concurrency, latency_ms, **options):
+        """API throughput of initiate-payment in sync mode vs queue mode, with a slow Paga."""
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(email=BENCH_EMAIL)
+        view = InitiatePaymentView.as_view()
+        factory = APIRequestFactory()
+        bank = DEFAULT_BANKS[0]
+
+        def call(i):
+            request = factory.post("/api/payments/initiate-payment/", {
+                "amount": "100.00",
+                "account_number": f"{mode[:1]}{i:09d}",
+                "bank_code": bank["sortCode"],
+            }, format="json")
+            force_authenticate(request, user=user)
+            started = time.perf_counter()
+            view(request)
+            return time.perf_counter() - started
+
+        # the fake Paga's banks replace the cached list while the bench runs
+        saved_banks = cache.get(BANKS_CACHE_KEY)
+        try:
+            with FakePagaServer(latency=latency_ms / 1000) as paga:
+                for mode in ("sync", "queue"):
+                    with override_settings(PAGA_BASE_URL=paga.base_url, PAGA_DISPATCH_MODE=mode):
+                        reset_paga_client()
+                        bank_directory.refresh()  # warm, so only the payment path is timed
+                        started = time.perf_counter()
+                        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                            samples = list(pool.map(call, range(requests)))
+                        elapsed = time.perf_counter() - started
+                        line = (
+                            f"{mode:>6}: api throughput={requests / elapsed:.0f} req/s "
+                            f"p50={percentile(samples, 50) * 1000:.1f}ms p99={percentile(samples, 99) * 1000:.1f}ms"
+                        )
+                        if mode == "queue":
+                            # only the bench's jobs: the fake Paga must never see a real queued payout
+                            dispatcher = PaymentDispatcher(
+                                workers=concurrency, poll_interval=0.05,
+                                jobs=PaymentDispatch.objects.filter(payment__user=user),
+                            )
+                            started = time.perf_counter()
+                            sent = dispatcher.run(once=True)
+                            line += f" | dispatcher drained {sent} payments in {time.perf_counter() - started:.2f}s"
+                        self.stdout.write(line)
+        finally:
+            reset_paga_client()
+            bank_directory.forget()
+            if saved_banks is not None:
+                cache.set(BANKS_CACHE_KEY, saved_banks, timeout=None)
+            cache.delete_many([
+                duplicates.fingerprint(f"{mode[:1]}{i:09d}", bank["sortCode"], 100)
+                for mode in ("sync", "queue") for i in range(requests)
+            ])
+            self._delete_settled(Payment.objects.filter(user=user))
+            user.delete()
+
+    def bench_duplicates(self, requests, rows, **options):
+        """Queries and latency per duplicate check: legacy 3-query path vs duplicates.check_payment."""
+        bank = DEFAULT_BANKS[1]
+        self.stdout.write(f"Seeding {rows} payments...")
+        self._seed_payments(rows, bank)
+        try:
+            # Half the probes repeat a seeded payment inside the window, half are new
+            probes = [
+                {
+                    "account_number": f"{(i * 7919) % 250000:010d}" if i % 2 else f"9{i:09d}",
+                    "bank_code": bank["sortCode"],
+                    "bank_name": bank["name"],
+                    "amount": ((i * 7919) % 50 + 1) * 100 if i % 2 else 100,
+                    "idempotency_key": f"bench-{i}",
+                }
+                for i in range(requests)
+            ]
+
+            def legacy(data):
+                Payment.objects.filter(
+                    account_number=data["account_number"], amount=data["amount"], bank_name=data["bank_name"],
+                    bank_code=data["bank_code"], created_at__gte=duplicates.window_start(),
+                    status__in=duplicates.ACTIVE_STATUSES,
+                ).order_by("-created_at").first()
+                if Payment.objects.filter(idempotency_key=data["idempotency_key"]).exists():
+                    Payment.objects.get(idempotency_key=data["idempotency_key"])
+                Payment.objects.filter(idempotency_key=data["idempotency_key"]).exists()
+
+            def service(data):
+                duplicates.check_payment(data)
+
+            # only the probes' own fingerprints, the rest of the cache is shared with the app
+            probe_keys = [duplicates.fingerprint(d["account_number"], d["bank_code"], d["amount"]) for d in probes]
+
+            for label, check, warm in (("legacy", legacy, False), ("service cold", service, False), ("service warm", service, True)):
+                if not warm:
+                    cache.delete_many(probe_keys)
+                samples = []
+                with CaptureQueriesContext(connection) as queries:
+                    for data in probes:
+                        started = time.perf_counter()
+                        check(data)
+                        samples.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"{label:>12}: queries/request={len(queries) / len(probes):.2f} "
+                    f"p50={percentile(samples, 50) * 1000:.2f}ms p99={percentile(samples, 99) * 1000:.2f}ms"
+                )
+        finally:
+            cache.delete_many(probe_keys)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {Payment._meta.db_table} WHERE description = %s", ["paga_bench"])
+
+    def bench_reconcile(self, requests, concurrency, latency_ms, **options):
+        """
+            Reconciliation throughput (payments/s) with 1 worker vs ``concurrency`` workers.
+            Each run is rolled back: the seeded payments and their rollup deltas never commit.
+        """
+        bank = DEFAULT_BANKS[0]
+        # Paga's view of the seeded payments: mostly paid, some failed, some still in flight or unknown
+        paga_states = ["SUCCESSFUL"] * 4 + ["FAILED", "SUCCESSFUL", "FAILED", "PENDING", "NOT_FOUND", "SUCCESSFUL"]
+        try:
+            with FakePagaServer(latency=latency_ms / 1000) as paga:
+                for workers in (1, concurrency):
+                    # the lookups run in threads without database work, so one transaction holds every write
+                    with transaction.atomic():
+                        report = self._reconcile_run(paga, requests, workers, bank, paga_states)
+                        transaction.set_rollback(True)
+                    self.stdout.write(f"{workers:>3} workers: {report.summary()}")
+        finally:
+            reset_paga_client()
+
+    def _reconcile_run(self, paga, requests, workers, bank, paga_states):
+        payments = Payment.objects.bulk_create([
+            Payment(
+                amount=100, account_number=f"{i:010d}", bank_code=bank["sortCode"], bank_name=bank["name"],
+                reference_number=f"BENCH{i}", initiator="SYSTEM", description="paga_bench",
+                # every 5th payment timed out locally: FAILED with an error, maybe paid by Paga
+                status="FAILED" if i % 5 == 4 else "PENDING",
+                raw_response={"error": "Read timed out"} if i % 5 == 4 else None,
+            )
+            for i in range(requests)
+        ], batch_size=1000)
+        # counted as send_payment counts a failure, so reconciling them to SUCCESS moves real counts
+        record_transitions((payment, "PENDING", payment.status) for payment in payments if payment.status == "FAILED")
+        # created_at is auto_now_add, age the rows past the reconciliation grace period
+        Payment.objects.filter(description="paga_bench").update(created_at=timezone.now() - timedelta(hours=1))
+        paga.transactions = {
+            p.reference_number: {"status": paga_states[i % 10], "transactionId": f"T{i}"}
+            for i, p in enumerate(payments) if paga_states[i % 10] != "NOT_FOUND"
+        }
+
+        with override_settings(
+            PAGA_BASE_URL=paga.base_url, PAGA_PRINCIPAL="bench", PAGA_CREDENTIALS="bench",
+            PAGA_POOL_MAXSIZE=workers,
+        ):
+            reset_paga_client()
+            return reconcile_payments(
+                queryset=reconcilable_payments().filter(description="paga_bench"), workers=workers,
+            )
+
+    def _delete_settled(self, payments):
+        """
+            Delete bench payments that were settled through the app (dispatcher threads, their
+            own transactions) and rebuild the rollups of their days without them.
+        """
+        days = list(payments.annotate(day=TruncDate("created_at")).values_list("day", flat=True).distinct())
+        payments.delete()
+        for day in days:
+            rebuild_rollups(day, day)
+
+    def _seed_payments(self, rows, bank):
+        """Insert ``rows`` payments spread over the last hour with one INSERT ... SELECT (PostgreSQL)."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Payment._meta.db_table} (
+                    amount, account_number, currency, bank_code, bank_name, reference_number, status,
+                    is_automated, initiator, description, created_at, updated_at
+                )
+                SELECT (i %% 50 + 1) * 100, lpad((i %% 250000)::text, 10, '0'), 'NGN', %s, %s, 'BENCH' || i,
+                       CASE WHEN i %% 10 = 0 THEN 'FAILED' ELSE 'SUCCESS' END, true, 'SYSTEM', 'paga_bench',
+                       now() - make_interval(secs => i %% 3600), now()
+                FROM generate_series(1, %s) AS i
+                """,
+                [bank["sortCode"], bank["name"], rows],
+            )
+            cursor.execute(f"ANALYZE {Payment._meta.db_table}")
+
+    def _run(self, client, requests, concurrency):
+        def call(_):
+            ref = generate_reference()
+            started = time.perf_counter()
+            client.post("getBanks", {"referenceNumber": ref}, ref, idempotent=True)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(call, range(requests)))
+        return samples, time.perf_counter() - started
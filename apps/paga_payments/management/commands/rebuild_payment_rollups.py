@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.paga_payments.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+        Recompute PaymentDailyRollup from Payment, e.g. after a backfill or data fix.
+
+        python manage.py rebuild_payment_rollups                     # everything
+        python manage.py rebuild_payment_rollups --from 2024-01-01 --to 2024-01-31
+    """
+
+    help = "Rebuild the payment daily rollups from the payments table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", default=None, help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", default=None, help="Last day to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for name in ("date_from", "date_to"):
+            if options[name]:
+                dates[name] = parse_date(options[name])
+                if dates[name] is None:
+                    raise CommandError(f"Invalid date {options[name]!r}, expected YYYY-MM-DD")
+
+        started = time.perf_counter()
+        rows = rebuild_rollups(**dates)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows in {time.perf_counter() - started:.2f}s"))
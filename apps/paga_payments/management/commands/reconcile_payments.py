@@ -0,0 +1,64 @@
+import csv
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.paga_payments.reconciliation import REPORT_COLUMNS, reconcilable_payments, reconcile_payments
+
+
+class Command(BaseCommand):
+    """
+        Reconcile PENDING and ambiguous FAILED payments against Paga's transactionStatus.
+
+        python manage.py reconcile_payments --report mismatches.csv
+        python manage.py reconcile_payments --interval 300      # periodic job
+    """
+
+    help = "Reconcile unsettled payments against Paga's transaction status"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Concurrent status lookups (PAGA_RECONCILE_WORKERS)")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Payments per round (PAGA_RECONCILE_CHUNK)")
+        parser.add_argument("--rate-limit", type=float, default=None, help="Lookups per second (PAGA_RECONCILE_RATE_LIMIT)")
+        parser.add_argument("--grace", type=int, default=None, help="Seconds a payment must be PENDING (PAGA_RECONCILE_GRACE)")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many payments")
+        parser.add_argument("--dry-run", action="store_true", help="Look up and report, change nothing")
+        parser.add_argument("--report", default=None, help="Write the mismatch report to this CSV file")
+        parser.add_argument("--interval", type=float, default=None, help="Run every N seconds until stopped")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if options["interval"]:
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        while True:
+            report = reconcile_payments(
+                queryset=reconcilable_payments(grace=options["grace"]),
+                workers=options["workers"],
+                chunk_size=options["chunk_size"],
+                rate_limit=options["rate_limit"],
+                dry_run=options["dry_run"],
+                limit=options["limit"],
+            )
+            self.stdout.write(("[dry run] " if options["dry_run"] else "") + report.summary())
+            for row in report.mismatches[:20]:
+                self.stdout.write(
+                    f"  {row['reference_number']}: {row['local_status']} -> {row['new_status']} "
+                    f"(paga {row['paga_status']}){'' if row['applied'] else ' not applied'}"
+                )
+            if options["report"]:
+                self.write_report(options["report"], report.mismatches)
+
+            close_old_connections()
+            if not options["interval"] or stop.wait(options["interval"]):
+                break
+
+    def write_report(self, path, mismatches):
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=REPORT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(mismatches)
+        self.stdout.write(f"Mismatch report written to {path} ({len(mismatches)} rows)")
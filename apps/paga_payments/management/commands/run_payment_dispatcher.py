@@ -0,0 +1,29 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.paga_payments.dispatch import PaymentDispatcher
+
+
+class Command(BaseCommand):
+    """
+        Worker process for the payment dispatch queue.
+
+        python manage.py run_payment_dispatcher --workers 8
+    """
+
+    help = "Send queued payments to Paga with a pool of worker threads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Worker threads (PAGA_DISPATCH_WORKERS)")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds between queue polls when idle")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+
+    def handle(self, *args, **options):
+        dispatcher = PaymentDispatcher(workers=options["workers"], poll_interval=options["poll"])
+        signal.signal(signal.SIGTERM, lambda *_: dispatcher.stop())
+        signal.signal(signal.SIGINT, lambda *_: dispatcher.stop())
+
+        self.stdout.write(f"Payment dispatcher {dispatcher.worker_id} started with {dispatcher.workers} workers")
+        processed = dispatcher.run(once=options["once"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} payments"))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paga_payments', '0003_payment_batch_row_paymentbatch_payment_batch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['account_number', 'bank_code', 'amount', 'created_at'], name='payment_duplicate_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paga_payments', '0004_payment_payment_duplicate_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='payment_user_keyset_idx'),
+        ),
+    ]
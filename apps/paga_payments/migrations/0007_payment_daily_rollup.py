@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('paga_payments', '0006_payment_reconciled_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=20)),
+                ('currency', models.CharField(max_length=5)),
+                ('bank_code', models.CharField(max_length=50)),
+                ('bank_name', models.CharField(blank=True, max_length=150)),
+                ('initiator', models.CharField(choices=[('SYSTEM', 'System'), ('USER', 'User'), ('SCHEDULE', 'Scheduled job')], max_length=28)),
+                ('count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Payment daily rollup',
+                'verbose_name_plural': 'Payment daily rollups',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='paymentdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'status', 'currency', 'bank_code', 'initiator'), name='payment_rollup_bucket_unique'),
+        ),
+    ]
@@ -1,8 +1,53 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 # Create your models here.
 
+class PaymentBatch(models.Model):
+    """
+        A bulk payout upload (e.g. a payroll run). Valid rows become Payments linked to the
+        batch, rejected rows are kept in ``rejections`` for the report.
+    """
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("COMPLETED", "Completed"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="payment_batches",
+        blank=True,
+        null=True
+    )
+    initiator = models.CharField(max_length=28, default="SCHEDULE")
+    description = models.CharField(max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+
+    # Row accounting
+    total_rows = models.PositiveIntegerField(default=0)
+    accepted_rows = models.PositiveIntegerField(default=0)
+    rejected_rows = models.PositiveIntegerField(default=0)
+    succeeded_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    rejections = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Payment batch"
+        verbose_name_plural = "Payment batches"
+
+    def __str__(self):
+        return f"Batch #{self.pk} | {self.accepted_rows}/{self.total_rows} rows | {self.status}"
+
+
 class Payment(models.Model):
     STATUS_CHOICES = [
         ("PENDING", "Pending"),
@@ -32,7 +77,7 @@ class Payment(models.Model):
     
     # Tracking identifiers
     paga_transaction_id = models.CharField(max_length=100, blank=True, null=True)
-    reference_number = models.CharField(max_length=50, blank=True, null=True)
+    reference_number = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     
     # Automation / Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
@@ -41,6 +86,16 @@ class Payment(models.Model):
     idempotency_key = models.CharField(max_length=128, blank=True, null=True, unique=True, db_index=True)
     description = models.CharField(max_length=255, blank=True, null=True)
     
+    # Bulk payouts
+    batch = models.ForeignKey(
+        PaymentBatch,
+        on_delete=models.SET_NULL,
+        related_name="payments",
+        blank=True,
+        null=True
+    )
+    batch_row = models.PositiveIntegerField(blank=True, null=True)
+    
     # JSON for tracability
     raw_request = models.JSONField(blank=True, null=True)
     raw_response = models.JSONField(blank=True, null=True)
@@ -49,6 +104,7 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add = True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(blank=True, null=True)
+    reconciled_at = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         ordering = ["-created_at"]
@@ -57,11 +113,79 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=["status", "created_at"]),
             models.Index(fields=["initiator", "status"]),
+            # duplicate-payment detection (duplicates.check_payment / check_rows)
+            models.Index(fields=["account_number", "bank_code", "amount", "created_at"], name="payment_duplicate_idx"),
+            # keyset pagination of a user's history (pagination.KeysetPagination)
+            models.Index(fields=["user", "-created_at", "-id"], name="payment_user_keyset_idx"),
         ]
     
     def __str__(self):
         user_ident = getattr(self.user, "email", "system")
         ref = self.reference_number or "-"
         return f"{self.reference_number} | {self.user.email} | {self.amount} {self.currency} | {self.status}"
-    
-    
+
+
+class PaymentDispatch(models.Model):
+    """
+        DB-backed queue entry for sending a payment to Paga outside the API request.
+        Workers claim QUEUED rows with SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    STATUS_CHOICES = [
+        ("QUEUED", "Queued"),
+        ("PROCESSING", "Processing"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    ]
+
+    payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name="dispatch")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="QUEUED")
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Payment dispatch"
+        verbose_name_plural = "Payment dispatches"
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.payment.reference_number} | {self.status} | attempts={self.attempts}"
+
+
+class PaymentDailyRollup(models.Model):
+    """
+        Count and amount of terminal (SUCCESS/FAILED) payments per day, status, currency,
+        bank and initiator, keyed by the payment's created_at date (TIME_ZONE).
+        Kept up to date by rollups.record_transitions, rebuilt by rebuild_payment_rollups.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Payment.STATUS_CHOICES)
+    currency = models.CharField(max_length=5)
+    bank_code = models.CharField(max_length=50)
+    bank_name = models.CharField(max_length=150, blank=True)
+    initiator = models.CharField(max_length=28, choices=Payment.INITIATOR_CHOICES)
+
+    count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-day"]
+        verbose_name = "Payment daily rollup"
+        verbose_name_plural = "Payment daily rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "currency", "bank_code", "initiator"], name="payment_rollup_bucket_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} | {self.status} | {self.bank_code} | {self.count} payments | {self.total_amount} {self.currency}"
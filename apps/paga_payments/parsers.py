@@ -0,0 +1,26 @@
+import codecs
+import csv
+
+from rest_framework.parsers import BaseParser
+
+
+def csv_rows(lines, encoding="utf-8-sig"):
+    """
+        Lazily read CSV rows as dicts from an iterable of byte lines (header row first).
+    """
+    return csv.DictReader(codecs.iterdecode(lines, encoding))
+
+
+class CSVRowsParser(BaseParser):
+    """
+        Parses a ``text/csv`` request body into a lazy iterator of row dicts,
+        so a large upload is read line by line instead of all at once.
+    """
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding") or "utf-8-sig"
+        if stream is None:
+            return iter(())
+        return csv_rows(iter(stream.readline, b""), encoding)
@@ -0,0 +1,213 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import duplicates, rollups
+from .client import get_paga_client
+from .models import Payment
+from .utils import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# transactionStatus answers, anything else (PENDING, PROCESSING, ...) is left for a later run
+PAGA_SUCCESS_STATUSES = {"SUCCESSFUL", "SUCCESS", "COMPLETED"}
+PAGA_FAILED_STATUSES = {"FAILED", "DECLINED", "CANCELLED", "REVERSED", "NOT_FOUND"}
+
+UPDATE_FIELDS = ["status", "paga_transaction_id", "completed_at", "raw_response", "reconciled_at", "updated_at"]
+
+REPORT_COLUMNS = ["payment_id", "reference_number", "local_status", "paga_status", "new_status", "applied"]
+
+
+class ReconciliationReport:
+    """
+        Counters and mismatches of one reconciliation run.
+
+        ``mismatches`` holds one row per payment whose local status disagreed with Paga:
+        PENDING payments Paga has settled, and FAILED ones (local timeouts) Paga actually paid.
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.succeeded = 0     # moved to SUCCESS
+        self.failed = 0        # PENDING moved to FAILED
+        self.confirmed = 0     # ambiguous FAILED confirmed as failed by Paga
+        self.unresolved = 0    # Paga has no final answer yet
+        self.errors = 0        # status lookup failed
+        self.skipped = 0       # row changed while it was being looked up
+        self.mismatches = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+        return self
+
+    @property
+    def throughput(self) -> float:
+        return self.checked / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"checked={self.checked} succeeded={self.succeeded} failed={self.failed} "
+            f"confirmed={self.confirmed} unresolved={self.unresolved} errors={self.errors} "
+            f"skipped={self.skipped} mismatches={len(self.mismatches)} "
+            f"elapsed={self.elapsed:.2f}s throughput={self.throughput:.1f} payments/s"
+        )
+
+
+def reconcilable_payments(grace=None):
+    """
+        Payments whose outcome is unknown locally:
+
+        - PENDING for longer than ``grace`` seconds (PAGA_RECONCILE_GRACE), which includes
+          those whose Paga call timed out or got no readable answer (send_payment), and
+        - FAILED because the Paga call itself errored and not reconciled yet (recorded so
+          before send_payment kept ambiguous outcomes PENDING).
+
+        Payments still waiting in the dispatch queue or in an unfinished batch have not
+        been sent yet and are left alone.
+    """
+    grace = settings.PAGA_RECONCILE_GRACE if grace is None else grace
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    pending = Q(status="PENDING", created_at__lte=cutoff)
+    ambiguous = Q(status="FAILED", raw_response__has_key="error", reconciled_at__isnull=True)
+    return (
+        Payment.objects.filter(pending | ambiguous)
+        .exclude(dispatch__status__in=["QUEUED", "PROCESSING"])
+        .exclude(batch__status__in=["PENDING", "PROCESSING"])
+        .only("id", "reference_number", "account_number", "bank_code", "bank_name", "amount", "currency",
+              "initiator", "idempotency_key", "created_at", *UPDATE_FIELDS)
+        .order_by("id")
+    )
+
+
+def paga_outcome(res):
+    """
+        Read a transactionStatus response: returns (paga status, local status or None, transaction id, body).
+    """
+    try:
+        body = res.json()
+    except Exception:
+        body = {"raw": res.text}
+    if res.status_code != 200 or not isinstance(body, dict) or body.get("responseCode", 0) != 0:
+        return "", None, None, body
+
+    paga_status = str(body.get("status") or body.get("transactionStatus") or "").upper()
+    if paga_status in PAGA_SUCCESS_STATUSES:
+        outcome = "SUCCESS"
+    elif paga_status in PAGA_FAILED_STATUSES:
+        outcome = "FAILED"
+    else:
+        outcome = None
+    return paga_status, outcome, body.get("transactionId") or body.get("transactionReference"), body
+
+
+def reconcile_payments(queryset=None, workers=None, chunk_size=None, rate_limit=None, dry_run=False, limit=None):
+    """
+        Check payments against Paga's transactionStatus and apply the transitions.
+
+        Payments are streamed with ``iterator()`` in chunks of PAGA_RECONCILE_CHUNK; each chunk
+        is looked up by a pool of PAGA_RECONCILE_WORKERS threads (HTTP only, no database work)
+        and written back with one bulk_update. Only rows whose status has not changed since they
+        were read are written, so a payment settled meanwhile by send_payment is not overwritten.
+    """
+    queryset = reconcilable_payments() if queryset is None else queryset
+    workers = workers or settings.PAGA_RECONCILE_WORKERS
+    chunk_size = chunk_size or settings.PAGA_RECONCILE_CHUNK
+    limiter = RateLimiter(settings.PAGA_RECONCILE_RATE_LIMIT if rate_limit is None else rate_limit)
+    client = get_paga_client()
+    report = ReconciliationReport()
+
+    def lookup(payment):
+        limiter.wait()
+        try:
+            return payment, paga_outcome(client.transaction_status(payment.reference_number))
+        except Exception as e:
+            logger.warning("Paga status lookup for %s failed: %s", payment.reference_number, e)
+            return payment, None
+
+    rows = queryset.iterator(chunk_size=chunk_size)
+    if limit:
+        rows = islice(rows, limit)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="paga-reconcile") as pool:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            apply_results(pool.map(lookup, chunk), report, dry_run)
+
+    return report.finish()
+
+
+def apply_results(results, report, dry_run=False):
+    """
+        Turn one chunk of lookups into status transitions and write them with bulk_update.
+    """
+    now = timezone.now()
+    changed, read_status, mismatches = [], {}, []
+
+    for payment, result in results:
+        report.checked += 1
+        if result is None:
+            report.errors += 1
+            continue
+        paga_status, outcome, transaction_id, body = result
+        if outcome is None:
+            report.unresolved += 1
+            continue
+
+        local_status = payment.status
+        if outcome != local_status:
+            payment.status = outcome
+            if outcome == "SUCCESS":
+                payment.paga_transaction_id = transaction_id
+                payment.completed_at = now
+            mismatches.append({
+                "payment_id": payment.pk,
+                "reference_number": payment.reference_number,
+                "local_status": local_status,
+                "paga_status": paga_status,
+                "new_status": outcome,
+                "applied": False,
+            })
+        payment.raw_response = {**(payment.raw_response or {}), "reconciliation": body}
+        payment.reconciled_at = now
+        payment.updated_at = now
+        read_status[payment.pk] = local_status
+        changed.append(payment)
+
+    report.mismatches.extend(mismatches)
+    if dry_run or not changed:
+        return
+
+    with transaction.atomic():
+        unchanged = Q()
+        for status in set(read_status.values()):
+            unchanged |= Q(status=status, pk__in=[pk for pk, s in read_status.items() if s == status])
+        locked = set(Payment.objects.select_for_update().filter(unchanged).values_list("pk", flat=True))
+        writable = [payment for payment in changed if payment.pk in locked]
+        Payment.objects.bulk_update(writable, UPDATE_FIELDS)
+        rollups.record_transitions((payment, read_status[payment.pk], payment.status) for payment in writable)
+
+    report.skipped += len(changed) - len(writable)
+    for payment in writable:
+        local_status = read_status[payment.pk]
+        if payment.status == "SUCCESS" and local_status != "SUCCESS":
+            report.succeeded += 1
+            if payment.created_at >= duplicates.window_start():
+                duplicates.remember(payment)
+        elif local_status == "PENDING":
+            report.failed += 1
+            duplicates.forget(payment)
+        else:
+            report.confirmed += 1
+    for row in mismatches:
+        row["applied"] = row["payment_id"] in locked
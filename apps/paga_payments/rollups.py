@@ -0,0 +1,127 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Payment, PaymentDailyRollup
+
+TERMINAL_STATUSES = ["SUCCESS", "FAILED"]
+
+
+def bucket(payment, status):
+    return (
+        timezone.localdate(payment.created_at),
+        status,
+        payment.currency,
+        payment.bank_code,
+        payment.initiator,
+    )
+
+
+def record_transitions(transitions):
+    """
+        Apply ``(payment, old status, new status)`` transitions to the daily rollups.
+
+        A payment is counted once it reaches SUCCESS or FAILED, and moved between buckets if
+        it changes terminal status later (a timed-out FAILED payment reconciled to SUCCESS).
+        All deltas are summed first and written with one INSERT ... ON CONFLICT DO UPDATE,
+        so call it inside the transaction that changes the payments.
+    """
+    deltas = defaultdict(lambda: [0, Decimal("0"), ""])
+    for payment, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        if old_status in TERMINAL_STATUSES:
+            delta = deltas[bucket(payment, old_status)]
+            delta[0] -= 1
+            delta[1] -= payment.amount
+            delta[2] = payment.bank_name or ""
+        if new_status in TERMINAL_STATUSES:
+            delta = deltas[bucket(payment, new_status)]
+            delta[0] += 1
+            delta[1] += payment.amount
+            delta[2] = payment.bank_name or ""
+
+    rows = [(*key, count, amount, bank_name) for key, (count, amount, bank_name) in deltas.items() if count or amount]
+    if not rows:
+        return
+
+    table = PaymentDailyRollup._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"""
+            INSERT INTO {table} (day, status, currency, bank_code, initiator, count, total_amount, bank_name, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, now())
+            ON CONFLICT (day, status, currency, bank_code, initiator) DO UPDATE SET
+                count = {table}.count + EXCLUDED.count,
+                total_amount = {table}.total_amount + EXCLUDED.total_amount,
+                bank_name = EXCLUDED.bank_name,
+                updated_at = EXCLUDED.updated_at
+            """,
+            rows,
+        )
+
+
+def rebuild_rollups(date_from=None, date_to=None) -> int:
+    """
+        Recompute the rollups for days in [date_from, date_to] (all days when omitted) from
+        Payment. The rollup table is locked for the duration, so payments settled meanwhile
+        are applied on top of the rebuilt rows once it commits. Returns the number of rows written.
+    """
+    payments = Payment.objects.filter(status__in=TERMINAL_STATUSES).annotate(day=TruncDate("created_at"))
+    existing = PaymentDailyRollup.objects.all()
+    if date_from:
+        payments = payments.filter(day__gte=date_from)
+        existing = existing.filter(day__gte=date_from)
+    if date_to:
+        payments = payments.filter(day__lte=date_to)
+        existing = existing.filter(day__lte=date_to)
+
+    grouped = (
+        payments.order_by()
+        .values("day", "status", "currency", "bank_code", "initiator")
+        .annotate(count=Count("id"), total_amount=Sum("amount"), latest_bank_name=Max("bank_name"))
+    )
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {PaymentDailyRollup._meta.db_table} IN EXCLUSIVE MODE")
+        existing.delete()
+        rows = PaymentDailyRollup.objects.bulk_create(
+            (
+                PaymentDailyRollup(bank_name=values.pop("latest_bank_name") or "", **values)
+                for values in grouped.iterator(chunk_size=2000)
+            ),
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def payment_stats(date_from, date_to, group_fields=(), **filters) -> dict:
+    """
+        Totals and grouped rows for days in [date_from, date_to], read from the rollups only.
+        ``filters`` are exact matches on status, currency, bank_code or initiator.
+    """
+    qs = PaymentDailyRollup.objects.filter(day__gte=date_from, day__lte=date_to, **filters).exclude(count=0)
+    totals = qs.aggregate(count=Sum("count"), total_amount=Sum("total_amount"))
+
+    results = []
+    if group_fields:
+        grouped = qs.values(*group_fields).annotate(count=Sum("count"), total_amount=Sum("total_amount"))
+        if "bank_code" in group_fields:
+            grouped = grouped.annotate(latest_bank_name=Max("bank_name"))
+        for row in grouped.order_by(*group_fields):
+            if "latest_bank_name" in row:
+                row["bank_name"] = row.pop("latest_bank_name")
+            results.append(row)
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "group_by": list(group_fields),
+        "totals": {"count": totals["count"] or 0, "total_amount": totals["total_amount"] or Decimal("0")},
+        "results": results,
+    }
@@ -1,7 +1,10 @@
-from rest_framework import serializers
-from django.utils import timezone
 from datetime import timedelta
-from .models import Payment
+
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Payment, PaymentBatch
+from .banks import bank_directory, BankDirectoryUnavailable
+from .duplicates import check_payment
 
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -39,9 +42,121 @@ class PaymentSerializer(serializers.ModelSerializer):
         )
 
 
-class InitiatePaymentSerializer(serializers.Serializer):
+class PaymentListSerializer(serializers.ModelSerializer):
+    """Slim row for payment lists, the raw Paga payloads are only returned on detail."""
+
+    user_email = serializers.EmailField(source="user.email", read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = [
+            "id",
+            "user",
+            "user_email",
+            "amount",
+            "account_number",
+            "currency",
+            "bank_code",
+            "bank_name",
+            "reference_number",
+            "paga_transaction_id",
+            "status",
+            "is_automated",
+            "initiator",
+            "idempotency_key",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class PaymentFilterSerializer(serializers.Serializer):
+    """Query-string filters for payment lists."""
+
+    status = serializers.ChoiceField(choices=Payment.STATUS_CHOICES, required=False)
+    initiator = serializers.ChoiceField(choices=Payment.INITIATOR_CHOICES, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    min_amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    max_amount = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+
+    # query param -> ORM lookup
+    lookups = {
+        "status": "status",
+        "initiator": "initiator",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+        "min_amount": "amount__gte",
+        "max_amount": "amount__lte",
+    }
+
+    def filter_queryset(self, queryset):
+        """Apply the validated filters (call is_valid first)."""
+        return queryset.filter(**{self.lookups[name]: value for name, value in self.validated_data.items()})
+
+
+class PaymentStatsFilterSerializer(serializers.Serializer):
     """
-    Used when creating a payment (manual, Zapier, or system job).
+        Query-string for payment stats: a day range (default the last 30 days), optional
+        filters and ``group_by``, a comma separated list of day,status,currency,bank,initiator.
+    """
+
+    GROUPS = {
+        "day": ["day"],
+        "status": ["status"],
+        "currency": ["currency"],
+        "bank": ["bank_code"],
+        "initiator": ["initiator"],
+    }
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=Payment.STATUS_CHOICES, required=False)
+    currency = serializers.CharField(max_length=5, required=False)
+    bank_code = serializers.CharField(max_length=50, required=False)
+    initiator = serializers.ChoiceField(choices=Payment.INITIATOR_CHOICES, required=False)
+    group_by = serializers.CharField(required=False, default="day")
+
+    def validate_group_by(self, value):
+        groups = [g.strip() for g in value.split(",") if g.strip()]
+        unknown = [g for g in groups if g not in self.GROUPS]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown group(s) {', '.join(unknown)}, use {', '.join(self.GROUPS)}.")
+        return list(dict.fromkeys(groups))
+
+    def validate(self, attrs):
+        attrs.setdefault("date_to", timezone.localdate())
+        attrs.setdefault("date_from", attrs["date_to"] - timedelta(days=29))
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError({"date_from": "date_from must not be after date_to."})
+        return attrs
+
+    def group_fields(self):
+        return [field for group in self.validated_data["group_by"] for field in self.GROUPS[group]]
+
+
+class PaymentStatusSerializer(serializers.ModelSerializer):
+    """Small payload for polling a payment's outcome."""
+
+    class Meta:
+        model = Payment
+        fields = [
+            "id",
+            "reference_number",
+            "paga_transaction_id",
+            "status",
+            "amount",
+            "currency",
+            "created_at",
+            "updated_at",
+            "completed_at",
+        ]
+        read_only_fields = fields
+
+
+class PaymentRowSerializer(serializers.Serializer):
+    """
+    Field-level checks for one payment, without touching the database.
+    Used as-is for batch rows, where duplicates are checked for the whole batch at once.
     """
 
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -56,41 +171,74 @@ class InitiatePaymentSerializer(serializers.Serializer):
     description = serializers.CharField(required=False, allow_blank=True)
 
     def validate(self, data):
-        """
-            Prevent double submission by verifying the idempotency key, bank_code, and account number.
-        """
-        idempotency_key = data.get("idempotency_key")
-        amount = data.get("amount")
-        account_number = data.get("account_number")
-        bank_name = data.get("bank_name")
-        bank_code = data.get("bank_code")
-        
-        # double payment protection
-        fifteen_min_ago = timezone.now() - timedelta(min=15)
-        recent_payment = Payment.objects.filter(
-            account_number = account_number,
-            amount = amount,
-            bank_name = bank_name,
-            bank_code = bank_code,
-            created_at = fifteen_min_ago,
-            status_in = ["PENDING", "SUCCESS"]
-        ).order_by("-created_at").first()
-        
-        if recent_duplicate:
-            raise serializers.ValidationError({
-                "duplicate": f"A similar payment ({ref: {recent_payment.reference_number}}, already exist!)"
-            })
-            
+        data["bank_name"] = self.resolve_bank_name(data.get("bank_code"), data.get("bank_name"))
+
         # Sanity on payment amount
-        if amount <= 0:
+        if data.get("amount") <= 0:
             raise serializers.ValidationError({
                 "amount": "Payment amount must be greater than zero"
             })
-        
-        # idempotency protection
-        if idempotency_key and Payment.objects.filter(idempotency_key=idempotency_key).exists():
-            raise serializers.ValidationError(
-                {"idempotency_key": "This payment request has already been processed."}
-            )
-            
         return data
+
+    def resolve_bank_name(self, bank_code, bank_name):
+        """
+            Fill in bank_name from the cached bank directory and reject unknown or mismatching banks.
+            Falls back to the client's bank_name only when the directory cannot be loaded at all.
+        """
+        try:
+            bank = bank_directory.lookup(bank_code)
+        except BankDirectoryUnavailable:
+            return bank_name or ""
+
+        if bank is None:
+            raise serializers.ValidationError({"bank_code": "Unknown bank code."})
+        if bank_name and bank_name.strip().lower() != bank["name"].strip().lower():
+            raise serializers.ValidationError({"bank_name": f"Bank name does not match bank code ({bank['name']})."})
+        return bank["name"]
+
+
+class InitiatePaymentSerializer(PaymentRowSerializer):
+    """
+    Used when creating a payment (manual, Zapier, or system job).
+    A repeated idempotency key is not an error: ``existing_payment`` is set and the
+    view answers with the original payment.
+    """
+
+    existing_payment = None
+
+    def validate(self, data):
+        """
+            Prevent double submission by verifying the idempotency key, bank_code, account number and amount.
+        """
+        data = super().validate(data)
+
+        result = check_payment(data)
+        if result.replay is not None:
+            self.existing_payment = result.replay
+        elif result.duplicate:
+            raise serializers.ValidationError({
+                "duplicate": f"A similar payment (ref: {result.duplicate_ref or 'in progress'}) already exist!"
+            })
+        return data
+
+
+class PaymentBatchSerializer(serializers.ModelSerializer):
+    """Batch summary, per-row outcomes are in the downloadable report."""
+
+    class Meta:
+        model = PaymentBatch
+        fields = [
+            "id",
+            "initiator",
+            "description",
+            "status",
+            "total_rows",
+            "accepted_rows",
+            "rejected_rows",
+            "succeeded_rows",
+            "failed_rows",
+            "total_amount",
+            "created_at",
+            "completed_at",
+        ]
+        read_only_fields = fields
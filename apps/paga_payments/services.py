@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import duplicates, rollups
+from .client import get_paga_client, never_sent
+from .models import Payment
+from .utils import generate_reference
+
+
+def build_payment_payload(payment):
+    """
+        Build the Paga ``payment`` payload and the string to hash for a payment.
+        The payment's own reference_number is the referenceNumber sent to Paga.
+    """
+    ref = payment.reference_number
+    concat = f"{ref}{payment.amount}{payment.bank_code}{payment.account_number}"
+    payload = {
+        "referenceNumber": ref,
+        "amount": str(payment.amount),
+        "destinationBank": payment.bank_name,
+        "destinationBankCode": payment.bank_code,
+        "destinationBankAccountNumber": payment.account_number,
+        "currency": payment.currency,
+    }
+    return payload, concat
+
+
+def build_payment(data, user=None, **extra) -> Payment:
+    """
+        Build (without saving) a PENDING payment from validated payment serializer data.
+        Reference and raw_request are filled in here, so the result is ready for bulk_create.
+    """
+    initiator = extra.pop("initiator", None) or data.get("initiator", "USER")
+    payment = Payment(
+        user=user,
+        amount=data["amount"],
+        account_number=data["account_number"],
+        currency=data.get("currency", "NGN"),
+        bank_code=data["bank_code"],
+        bank_name=data.get("bank_name", ""),
+        initiator=initiator,
+        idempotency_key=data.get("idempotency_key") or None,
+        description=data.get("description", ""),
+        status="PENDING",
+        is_automated=(initiator in ["SYSTEM", "API", "SCHEDULE"]),
+        reference_number=generate_reference(),
+        **extra,
+    )
+    payment.raw_request = build_payment_payload(payment)[0]
+    return payment
+
+
+def create_payment(data, user=None) -> Payment:
+    """
+        Create the local PENDING record from validated InitiatePaymentSerializer data.
+    """
+    payment = build_payment(data, user=user)
+    payment.save()
+    duplicates.remember(payment)
+    return payment
+
+
+def send_payment(payment) -> int:
+    """
+        Send a PENDING payment to Paga and record the outcome on it.
+        Returns the HTTP status the API should answer with: Paga's, 502 when Paga was not
+        reached, or 202 when the outcome is unknown (timeout, gateway error, unreadable
+        answer). Such a payment stays PENDING with the error and its duplicate fingerprint,
+        and reconcile_payments settles it from Paga's transactionStatus.
+    """
+    payload, concat = build_payment_payload(payment)
+    previous_status = payment.status
+    try:
+        res = get_paga_client().post("payment", payload, concat)
+    except Exception as e:
+        payment.raw_response = {"error": str(e)}
+        if not never_sent(e):
+            payment.save(update_fields=["raw_response", "updated_at"])
+            return 202
+        payment.status = "FAILED"
+        with transaction.atomic():
+            payment.save(update_fields=["status", "raw_response", "updated_at"])
+            rollups.record_transitions([(payment, previous_status, payment.status)])
+        duplicates.forget(payment)
+        return 502
+
+    # handle Paga response
+    try:
+        body = res.json()
+    except Exception:
+        body = {"raw": res.text}
+
+    payment.raw_response = body
+    answered = res.status_code == 200 and isinstance(body, dict)
+
+    if answered and body.get("responseCode", 0) == 0:
+        payment.status = "SUCCESS"
+        payment.paga_transaction_id = body.get("transactionId") or body.get("transactionReference")
+        payment.completed_at = timezone.now()
+    elif answered or 400 <= res.status_code < 500:
+        payment.status = "FAILED"
+        duplicates.forget(payment)
+    else:
+        # a gateway error or an answer that cannot be read: Paga may have paid
+        payment.raw_response = {"error": f"Paga answered {res.status_code}", "response": body}
+        payment.save(update_fields=["raw_response", "updated_at"])
+        return 202
+
+    with transaction.atomic():
+        payment.save(update_fields=["status", "paga_transaction_id", "completed_at", "raw_response", "updated_at"])
+        rollups.record_transitions([(payment, previous_status, payment.status)])
+    return res.status_code
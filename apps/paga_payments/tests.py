@@ -1,3 +1,298 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import duplicates
+from .banks import CACHE_KEY as BANKS_CACHE_KEY, BankDirectory, bank_directory
+from .batches import create_batch
+from .client import reset_paga_client
+from .dispatch import claim_jobs, requeue_stale_jobs
+from .fake_paga import DEFAULT_BANKS, FakePagaServer
+from .models import Payment, PaymentBatch, PaymentDailyRollup, PaymentDispatch
+from .reconciliation import reconcilable_payments, reconcile_payments
+from .rollups import payment_stats, rebuild_rollups, record_transitions
+
+BANK = DEFAULT_BANKS[0]
+
+# a private cache, so tests may clear it without touching a shared one (REDIS_URL)
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "paga-tests"}}
+
+
+def make_payment(account_number="0123456789", amount=100, **fields):
+    return Payment.objects.create(
+        amount=amount, account_number=account_number, bank_code=BANK["sortCode"], bank_name=BANK["name"], **fields,
+    )
+
+
+def stock_bank_directory():
+    """Start from an empty cache holding the fake Paga's bank list, so no test calls Paga."""
+    cache.clear()
+    bank_directory.forget()
+    cache.set(BANKS_CACHE_KEY, {
+        "banks": DEFAULT_BANKS, "index": BankDirectory.build_index(DEFAULT_BANKS),
+        "reference": "tests", "fetched_at": time.time(),
+    }, timeout=None)
+
+
+class DispatchQueueTests(TestCase):
+    """claim_jobs and requeue_stale_jobs on the PaymentDispatch queue."""
+
+    def job(self, i, **fields):
+        return PaymentDispatch.objects.create(payment=make_payment(f"{i:010d}"), **fields)
+
+    def test_claim_takes_due_jobs_once(self):
+        due = [self.job(1), self.job(2)]
+        later = self.job(3, available_at=timezone.now() + timedelta(minutes=5))
+
+        claimed = claim_jobs("worker-1", 10)
+
+        self.assertEqual({job.pk for job in claimed}, {job.pk for job in due})
+        for job in due:
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.locked_by, job.attempts), ("PROCESSING", "worker-1", 1))
+            self.assertIsNotNone(job.locked_at)
+        later.refresh_from_db()
+        self.assertEqual(later.status, "QUEUED")
+        self.assertEqual(claim_jobs("worker-2", 10), [])
+
+    def test_claim_respects_limit_and_jobs(self):
+        jobs = [self.job(i) for i in range(3)]
+
+        narrowed = claim_jobs("worker-1", 10, jobs=PaymentDispatch.objects.filter(pk=jobs[2].pk))
+        self.assertEqual([job.pk for job in narrowed], [jobs[2].pk])
+
+        self.assertEqual(len(claim_jobs("worker-1", 1)), 1)
+        self.assertEqual(PaymentDispatch.objects.filter(status="QUEUED").count(), 1)
+
+    def test_requeue_stale_jobs(self):
+        stale_at = timezone.now() - timedelta(seconds=settings.PAGA_DISPATCH_LEASE + 1)
+        stale = self.job(1, status="PROCESSING", locked_at=stale_at, locked_by="dead", attempts=1)
+        running = self.job(2, status="PROCESSING", locked_at=timezone.now(), locked_by="alive", attempts=1)
+
+        with self.assertLogs("apps.paga_payments.dispatch", "WARNING"):
+            self.assertEqual(requeue_stale_jobs(), 1)
+
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_at, stale.locked_by), ("QUEUED", None, ""))
+        running.refresh_from_db()
+        self.assertEqual(running.status, "PROCESSING")
+
+    def test_requeue_gives_up_after_max_attempts(self):
+        stale_at = timezone.now() - timedelta(seconds=settings.PAGA_DISPATCH_LEASE + 1)
+        job = self.job(
+            1, status="PROCESSING", locked_at=stale_at, locked_by="dead", attempts=settings.PAGA_DISPATCH_MAX_ATTEMPTS,
+        )
+
+        with self.assertLogs("apps.paga_payments.dispatch", "WARNING"):
+            self.assertEqual(requeue_stale_jobs(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertEqual(job.last_error, "Worker lease expired too many times")
+        self.assertEqual(claim_jobs("worker-1", 10), [])
+
+
+@override_settings(CACHES=TEST_CACHES, PAGA_BATCH_RATE_LIMIT=0)
+class PaymentBatchTests(TestCase):
+    """create_batch's duplicate rejection and the batch upload endpoint."""
+
+    def setUp(self):
+        stock_bank_directory()
+        self.addCleanup(bank_directory.forget)
+
+    def row(self, account_number, amount="100.00", **fields):
+        return {"account_number": account_number, "bank_code": BANK["sortCode"], "amount": amount, **fields}
+
+    def test_duplicate_rows_are_rejected(self):
+        make_payment("1111111111", idempotency_key="used-key")
+        make_payment("2222222222", amount=250)
+
+        batch = create_batch([
+            self.row("3333333333", idempotency_key="used-key"),  # key taken by a stored payment
+            self.row("2222222222", amount="250.00"),            # repeats a recent payment
+            self.row("4444444444"),
+            self.row("4444444444"),                              # repeats row 3 of this batch
+            self.row("5555555555", amount="-1"),                 # invalid
+        ])
+
+        self.assertEqual((batch.total_rows, batch.accepted_rows, batch.rejected_rows), (5, 1, 4))
+        self.assertEqual([rejection["row"] for rejection in batch.rejections], [1, 2, 4, 5])
+        self.assertIn("idempotency_key", batch.rejections[0]["errors"])
+        self.assertIn("duplicate", batch.rejections[1]["errors"])
+        self.assertIn("duplicate", batch.rejections[2]["errors"])
+        payment = batch.payments.get()
+        self.assertEqual((payment.account_number, payment.batch_row, payment.status), ("4444444444", 3, "PENDING"))
+        self.assertEqual(PaymentDispatch.objects.get(payment=payment).status, "QUEUED")
+
+    def test_endpoint_accepts_rows_and_refuses_other_objects(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(email="batches@sunkinghub.local"))
+
+        response = client.post("/api/payments/batches/", {"rows": [self.row("6666666666")]}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["accepted_rows"], 1)
+
+        response = client.post("/api/payments/batches/", self.row("7777777777"), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PaymentBatch.objects.count(), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DuplicateCheckTests(TestCase):
+    """duplicates.check_payment: idempotency replays, recent duplicates and the fingerprint claim."""
+
+    def setUp(self):
+        cache.clear()
+
+    def data(self, account_number="0123456789", amount=100, idempotency_key=None):
+        return {
+            "account_number": account_number, "bank_code": BANK["sortCode"], "amount": amount,
+            "idempotency_key": idempotency_key,
+        }
+
+    def test_reused_idempotency_key_replays_the_payment(self):
+        payment = make_payment("0123456789", idempotency_key="key-1")
+
+        self.assertEqual(duplicates.check_payment(self.data(idempotency_key="key-1")).replay, payment)
+        # the key wins over the details: a reused key never makes a second payment
+        self.assertEqual(duplicates.check_payment(self.data("9999999999", 5, idempotency_key="key-1")).replay, payment)
+
+    def test_reused_key_of_a_failed_payment_still_replays(self):
+        payment = make_payment("0123456789", idempotency_key="key-1", status="FAILED")
+
+        check = duplicates.check_payment(self.data(idempotency_key="key-1"))
+
+        self.assertEqual(check.replay, payment)
+        self.assertFalse(check.duplicate)
+
+    def test_recent_identical_payment_is_a_duplicate(self):
+        payment = make_payment("0123456789", idempotency_key="key-1")
+
+        check = duplicates.check_payment(self.data(idempotency_key="key-2"))
+
+        self.assertIsNone(check.replay)
+        self.assertTrue(check.duplicate)
+        self.assertEqual(check.duplicate_ref, payment.reference_number)
+
+    def test_claim_blocks_a_concurrent_identical_payment_until_released(self):
+        first = self.data(idempotency_key="key-1")
+        self.assertEqual(duplicates.check_payment(first), duplicates.DuplicateCheck())
+
+        self.assertTrue(duplicates.check_payment(self.data(idempotency_key="key-2")).duplicate)
+        # a retry with the same key while the first is in flight has nothing to replay yet
+        self.assertTrue(duplicates.check_payment(first).duplicate)
+
+        duplicates.release(first)
+        self.assertFalse(duplicates.check_payment(self.data(idempotency_key="key-2")).duplicate)
+
+
+class PaymentRollupTests(TestCase):
+    """record_transitions keeps the daily rollups equal to a rebuild from Payment."""
+
+    def rollups(self):
+        return {
+            row.status: (row.count, row.total_amount)
+            for row in PaymentDailyRollup.objects.exclude(count=0)
+        }
+
+    def test_failed_payment_reconciled_to_success_moves_buckets(self):
+        payment = make_payment(amount=100)
+        other = make_payment("9876543210", amount=40)
+        payment.status = other.status = "FAILED"
+        record_transitions([(payment, "PENDING", "FAILED"), (other, "PENDING", "FAILED")])
+        self.assertEqual(self.rollups(), {"FAILED": (2, 140)})
+
+        payment.status = "SUCCESS"
+        record_transitions([(payment, "FAILED", "SUCCESS")])
+
+        self.assertEqual(self.rollups(), {"FAILED": (1, 40), "SUCCESS": (1, 100)})
+        day = timezone.localdate(payment.created_at)
+        self.assertEqual(payment_stats(day, day, status="SUCCESS")["totals"], {"count": 1, "total_amount": 100})
+
+        Payment.objects.filter(pk=payment.pk).update(status="SUCCESS")
+        Payment.objects.filter(pk=other.pk).update(status="FAILED")
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_pending_and_repeated_statuses_are_not_counted(self):
+        payment = make_payment()
+        record_transitions([(payment, "PENDING", "PENDING"), (payment, "SUCCESS", "SUCCESS")])
+        self.assertEqual(self.rollups(), {})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReconciliationTests(TestCase):
+    """reconcile_payments against a local fake Paga."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.paga = FakePagaServer().__enter__()
+        cls.addClassCleanup(cls.paga.__exit__, None, None, None)
+        cls.enterClassContext(override_settings(
+            PAGA_BASE_URL=cls.paga.base_url, PAGA_PRINCIPAL="tests", PAGA_CREDENTIALS="tests",
+        ))
+
+    def setUp(self):
+        cache.clear()
+        reset_paga_client()
+        self.addCleanup(reset_paga_client)
+
+    def payment(self, account_number, paga_status=None, aged=True, **fields):
+        payment = make_payment(account_number, **fields)
+        if aged:
+            # created_at is auto_now_add: age the row past the grace period
+            Payment.objects.filter(pk=payment.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        if paga_status:
+            self.paga.transactions[payment.reference_number] = {"status": paga_status, "transactionId": account_number}
+        return payment
+
+    def test_transitions_and_report(self):
+        paid = self.payment("1111111111", "SUCCESSFUL")
+        unknown = self.payment("2222222222")
+        processing = self.payment("3333333333", "PROCESSING")
+        timed_out = self.payment(
+            "4444444444", "SUCCESSFUL", status="FAILED", raw_response={"error": "timeout"}, amount=40,
+        )
+        record_transitions([(timed_out, "PENDING", "FAILED")])
+        fresh = self.payment("5555555555", "SUCCESSFUL", aged=False)
+        queued = self.payment("6666666666", "SUCCESSFUL")
+        PaymentDispatch.objects.create(payment=queued)
+
+        report = reconcile_payments(workers=2, chunk_size=2)
+
+        self.assertEqual(
+            (report.checked, report.succeeded, report.failed, report.unresolved, report.errors), (4, 2, 1, 1, 0),
+        )
+        self.assertEqual(
+            sorted((row["payment_id"], row["new_status"], row["applied"]) for row in report.mismatches),
+            [(paid.pk, "SUCCESS", True), (unknown.pk, "FAILED", True), (timed_out.pk, "SUCCESS", True)],
+        )
+        statuses = dict(Payment.objects.values_list("pk", "status"))
+        self.assertEqual(
+            [statuses[p.pk] for p in (paid, unknown, processing, timed_out, fresh, queued)],
+            ["SUCCESS", "FAILED", "PENDING", "SUCCESS", "PENDING", "PENDING"],
+        )
+        self.assertEqual(Payment.objects.get(pk=paid.pk).paga_transaction_id, "1111111111")
+
+        rows = {row.status: (row.count, row.total_amount) for row in PaymentDailyRollup.objects.exclude(count=0)}
+        self.assertEqual(rows, {"SUCCESS": (2, 140), "FAILED": (1, 100)})
+
+        # settled and confirmed payments are not looked up again
+        self.assertEqual(list(reconcilable_payments().values_list("pk", flat=True)), [processing.pk])
+
+    def test_dry_run_writes_nothing(self):
+        paid = self.payment("1111111111", "SUCCESSFUL")
+
+        report = reconcile_payments(dry_run=True)
+
+        self.assertEqual([row["applied"] for row in report.mismatches], [False])
+        paid.refresh_from_db()
+        self.assertEqual((paid.status, paid.reconciled_at), ("PENDING", None))
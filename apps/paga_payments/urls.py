@@ -1,9 +1,20 @@
 from django.urls import path
-from .views import GetBanksView, InitiatePaymentView, PaymentHistoryView
+from .views import (
+    GetBanksView, InitiatePaymentView, PaymentHistoryView, PaymentDetailView, PaymentStatusView,
+    PaymentBatchView, PaymentBatchDetailView, PaymentBatchReportView, PaymentStatsView,
+    PaymentExportView,
+)
 
 
 urlpatterns = [
     path("get-banks/", GetBanksView.as_view(), name="get-banks"),
     path("initiate-payment/", InitiatePaymentView.as_view(), name="initiate-payment"),
     path("transactions/", PaymentHistoryView.as_view(), name="transactions"),
+    path("transactions/export/", PaymentExportView.as_view(), name="transactions-export"),
+    path("transactions/<int:pk>/", PaymentDetailView.as_view(), name="transaction-detail"),
+    path("stats/", PaymentStatsView.as_view(), name="payment-stats"),
+    path("status/<str:reference_number>/", PaymentStatusView.as_view(), name="payment-status"),
+    path("batches/", PaymentBatchView.as_view(), name="payment-batches"),
+    path("batches/<int:pk>/", PaymentBatchDetailView.as_view(), name="payment-batch-detail"),
+    path("batches/<int:pk>/report/", PaymentBatchReportView.as_view(), name="payment-batch-report"),
 ]
\ No newline at end of file
@@ -1,12 +1,13 @@
 import os
 from dotenv import load_dotenv
-import hashlib, uuid, requests
+import hashlib, uuid, threading, time
 from django.conf import settings
 import logging
 
+from .client import get_paga_client
+
 logger = logging.getLogger(__name__)
 load_dotenv()
-DEFAULT_TIMEOUT = 25
 
 def generate_reference() -> str:
     """
@@ -22,26 +23,28 @@ def sha512_hash(concat_str: str) -> str:
     raw = concat_str + os.getenv("PAGA_HASHKEY")
     return hashlib.sha512(raw.encode("utf-8")).hexdigest()
 
-def paga_post(endpoint: str, payload: dict, concat_str: str):
-    """Generic POST request to Paga with principal, credentials, hash."""
-    # Get base url and validate
-    base = (os.getenv("PAGA_BASE_URL")  or "").rstrip('/')
-    if not base:
-        raise RuntimeError("Missing required environment variable: PAGA_BASE_URL")
-    # Safe url to be used
-    url = f"{base}/{endpoint.lstrip('/')}"
-    
-    # validation of principal and credential variables
-    principal = os.getenv("PAGA_PRINCIPAL")
-    credentials = os.getenv("PAGA_CREDENTIALS")
-    
-    if not principal and not credentials:
-        logger.warning("PAGA_PRINCIPAL or PAGA_CREDENTIALS is not in environment")
-        
-    headers = {
-        "principal": principal,
-        "credentials": credentials,
-        "hash": sha512_hash(concat_str),
-        "Content-Type": "application/json",
-    }
-    return requests.post(url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
\ No newline at end of file
+def paga_post(endpoint: str, payload: dict, concat_str: str, idempotent: bool = False):
+    """Generic POST request to Paga with principal, credentials, hash (through the pooled client)."""
+    return get_paga_client().post(endpoint, payload, concat_str, idempotent=idempotent)
+
+
+class RateLimiter:
+    """
+        Thread-safe limiter spacing calls to at most ``rate`` per second (0 disables it).
+        Call wait() before each request.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(self.next_at, now)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
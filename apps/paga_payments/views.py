@@ -3,121 +3,241 @@ from rest_framework import permissions, status, generics
 from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.db import transaction
-from django.utils import timezone
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+import csv, io, json
 
-from .models import Payment
-from .serializers import PaymentSerializer, InitiatePaymentSerializer
-from .utils import generate_reference, paga_post
+from . import duplicates
+from .models import Payment, PaymentBatch
+from .serializers import (
+    PaymentSerializer, PaymentListSerializer, PaymentFilterSerializer, InitiatePaymentSerializer,
+    PaymentStatusSerializer, PaymentBatchSerializer, PaymentStatsFilterSerializer,
+)
+from .banks import bank_directory, BankDirectoryUnavailable
+from .services import create_payment, send_payment
+from .dispatch import enqueue_payment
+from .batches import create_batch
+from .parsers import CSVRowsParser, csv_rows
+from .pagination import KeysetPagination
+from .rollups import payment_stats
+from apps.roles.permissions import HasRole
+from apps.common.exports import ExportMixin
 
 # Create your views here.
 
 class GetBanksView(APIView):
-    "Fetch list of banks from paga"
+    "Fetch list of banks from paga (served from the cached bank directory)"
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request):
-        ref = generate_reference()
-        payload = {"referenceNumber": ref}
         try:
-            res = paga_post("getBanks", payload, ref)
-        except Exception as e:
-            return Response({"detail": f"Paga request failed {e}"}, status=502)
+            entry = bank_directory.get()
+        except BankDirectoryUnavailable as e:
+            return Response({"detail": str(e)}, status=502)
         
-        if res.status_code != 200:
-            return Response({ "detail": res.text}, status=res.status_code)
-        
-        data = res.json()
-        banks = data.get("banks")
-        
-        return Response({"referenceNumber": ref, "banks": banks}, status=200)
+        return Response({"referenceNumber": entry["reference"], "banks": entry["banks"]}, status=200)
     
 
 
 class InitiatePaymentView(APIView):
     """
-        Initiating the payment to Paga
+        Initiating the payment to Paga.
+        With PAGA_DISPATCH_MODE="queue" the PENDING payment is committed and queued for the
+        dispatcher and the view answers 202 straight away; poll status/<reference>/ for the outcome.
+        With "sync" the view calls Paga itself, after the payment row is committed; when the
+        outcome is unknown (timeout) it also answers 202 with the PENDING payment, which
+        reconciliation settles.
     """
     
     permission_classes = [permissions.IsAuthenticated]
     
-    @transaction.atomic
     def post(self, request):
         ser = InitiatePaymentSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         data = ser.validated_data
         
-        # Check for idempotency duplicates
-        idempotency_key = data.get("idempotency_key")
-        if idempotency_key and Payment.objects.filter(idempotency_key=idempotency_key).exists():
-            existing = Payment.objects.get(idempotency_key=idempotency_key)
-            return Response(PaymentSerializer(existing).data, status=status.HTTP_200_OK)
-
-        # generate reference
-        ref = generate_reference()
-
-        # build local record
-        payment = Payment.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            amount=data["amount"],
-            account_number=data["account_number"],
-            currency=data.get("currency", "NGN"),
-            bank_code=data["bank_code"],
-            bank_name=data.get("bank_name", ""),
-            initiator=data.get("initiator", "USER"),
-            idempotency_key=idempotency_key,
-            description=data.get("description", ""),
-            status="PENDING",
-            is_automated=(data.get("initiator") in ["SYSTEM", "API", "SCHEDULE"]),
-            raw_request=data,
-        )
+        # Same idempotency key as an earlier request: answer with that payment
+        if ser.existing_payment is not None:
+            return Response(PaymentSerializer(ser.existing_payment).data, status=status.HTTP_200_OK)
 
-        # compute hash & send to Paga
-        concat = f"{ref}{data['amount']}{data['bank_code']}{data['account_number']}"
-        payload = {
-            "referenceNumber": ref,
-            "amount": str(data["amount"]),
-            "destinationBank": data.get("bank_name"),
-            "destinationBankCode": data["bank_code"],
-            "destinationBankAccountNumber": data["account_number"],
-            "currency": data.get("currency", "NGN"),
-        }
+        user = request.user if request.user.is_authenticated else None
+        queued = settings.PAGA_DISPATCH_MODE == "queue"
 
+        # build local record, committed before Paga is contacted
         try:
-            res = paga_post("payment", payload, concat)
-        except Exception as e:
-            payment.status = "FAILED"
-            payment.raw_response = {"error": str(e)}
-            payment.save(update_fields=["status", "raw_response"])
-            return Response({"detail": f"Paga request failed: {e}"}, status=502)
-
-        # handle Paga response
-        body = {}
-        try:
-            body = res.json()
+            with transaction.atomic():
+                payment = create_payment(data, user=user)
+                if queued:
+                    enqueue_payment(payment)
         except Exception:
-            body = {"raw": res.text}
+            # a corrected retry must not be refused as "in progress"
+            duplicates.release(data)
+            raise
 
-        payment.raw_response = body
+        if queued:
+            return Response(PaymentSerializer(payment).data, status=status.HTTP_202_ACCEPTED)
 
-        if res.status_code == 200:
-            payment.status = "SUCCESS"
-            payment.paga_transaction_id = body.get("transactionId") or body.get("transactionReference")
-            payment.completed_at = timezone.now()
-        else:
-            payment.status = "FAILED"
-
-        payment.save(update_fields=["status", "paga_transaction_id", "completed_at", "raw_response"])
-        return Response(PaymentSerializer(payment).data, status=res.status_code)
+        paga_status = send_payment(payment)
+        if paga_status == 502 and payment.raw_response.get("error"):
+            return Response({"detail": f"Paga request failed: {payment.raw_response['error']}"}, status=502)
+        return Response(PaymentSerializer(payment).data, status=paga_status)
     
     
+class PaymentStatusView(generics.RetrieveAPIView):
+    """Poll the status of a payment by its reference number."""
+    serializer_class = PaymentStatusSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = "reference_number"
+
+    def get_queryset(self):
+        return Payment.objects.filter(user=self.request.user).only(*PaymentStatusSerializer.Meta.fields)
+
+
+class PaymentBatchView(APIView):
+    """
+        Bulk payout upload. Accepts JSON (a list of rows, or {"rows": [...], "initiator", "description"}),
+        a text/csv body, or a multipart CSV "file". Valid rows are stored in one go and queued
+        for the payment dispatcher (run_payment_dispatcher); rejected rows are reported per row.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, CSVRowsParser, MultiPartParser]
+
+    def post(self, request):
+        options = request.query_params.dict()
+        if "file" in request.FILES:
+            rows = csv_rows(request.FILES["file"])
+            options.update(request.data.dict())
+        elif isinstance(request.data, dict) and isinstance(request.data.get("rows"), list):
+            rows = request.data["rows"]
+            options.update({k: v for k, v in request.data.items() if k != "rows"})
+        elif isinstance(request.data, list) or request.content_type.startswith(CSVRowsParser.media_type):
+            rows = request.data
+        else:
+            return Response(
+                {"rows": 'Send a list of rows, {"rows": [...]}, a text/csv body or a CSV "file".'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        initiator = options.get("initiator") or "SCHEDULE"
+        if initiator not in dict(Payment.INITIATOR_CHOICES):
+            return Response({"initiator": f"Invalid initiator '{initiator}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user if request.user.is_authenticated else None
+        batch = create_batch(rows, user=user, initiator=initiator, description=options.get("description", ""))
+        return Response(PaymentBatchSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+
+class PaymentBatchDetailView(generics.RetrieveAPIView):
+    """Batch summary and progress."""
+    serializer_class = PaymentBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return PaymentBatch.objects.filter(user=self.request.user)
+
+
+class PaymentBatchReportView(APIView):
+    """Download the per-row outcome of a batch as CSV."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    columns = ["row", "result", "reference_number", "account_number", "bank_code", "amount",
+               "paga_transaction_id", "error"]
+
+    def get(self, request, pk):
+        batch = get_object_or_404(PaymentBatch, pk=pk, user=request.user)
+        response = StreamingHttpResponse(self.lines(batch), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="payment-batch-{batch.pk}.csv"'
+        return response
+
+    def lines(self, batch):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush(row):
+            writer.writerow(row)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return line
+
+        yield flush(self.columns)
+        payments = batch.payments.order_by("batch_row").values_list(
+            "batch_row", "status", "reference_number", "account_number", "bank_code", "amount",
+            "paga_transaction_id",
+        )
+        for payment in payments.iterator(chunk_size=1000):
+            yield flush([*payment, ""])
+        for rejection in batch.rejections:
+            yield flush([rejection["row"], "REJECTED", "", "", "", "", "", json.dumps(rejection["errors"])])
+
+
 class PaymentHistoryView(generics.ListAPIView):
-    """List all payments for authenticated user or system."""
-    serializer_class = PaymentSerializer
+    """
+        List payments for authenticated user or system, newest first, with keyset pagination.
+        Filters: ?status= &initiator= &created_after= &created_before= &min_amount= &max_amount=
+    """
+    serializer_class = PaymentListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        qs = Payment.objects.all()
+        qs = Payment.objects.select_related("user").defer("raw_request", "raw_response")
         if self.request.user.is_authenticated:
             qs = qs.filter(user=self.request.user)
-        return qs.order_by("-created_at")
\ No newline at end of file
+
+        filters = PaymentFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filters.filter_queryset(qs).order_by("-created_at", "-id")
+
+
+class PaymentExportView(ExportMixin, PaymentHistoryView):
+    """
+        Stream the filtered payment history: ?output=csv|ndjson &columns=... plus the history filters.
+    """
+    export_filename = "payments"
+    export_columns = {
+        "id": "id",
+        "reference_number": "reference_number",
+        "paga_transaction_id": "paga_transaction_id",
+        "amount": "amount",
+        "currency": "currency",
+        "account_number": "account_number",
+        "bank_code": "bank_code",
+        "bank_name": "bank_name",
+        "status": "status",
+        "initiator": "initiator",
+        "description": "description",
+        "batch": "batch_id",
+        "created_at": "created_at",
+        "completed_at": "completed_at",
+    }
+
+    def get(self, request, *args, **kwargs):
+        return self.export_response(request)
+
+
+class PaymentDetailView(generics.RetrieveAPIView):
+    """One payment with its raw Paga request/response."""
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Payment.objects.select_related("user").filter(user=self.request.user)
+
+
+class PaymentStatsView(APIView):
+    """
+        Payment totals for finance, answered from the daily rollups (never scans Payment).
+        ?date_from= &date_to= &status= &currency= &bank_code= &initiator= &group_by=day,status,currency,bank,initiator
+    """
+    permission_classes = [permissions.IsAuthenticated, HasRole(["Admin", "Finance"])]
+
+    def get(self, request):
+        filters = PaymentStatsFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        data = dict(filters.validated_data)
+        data.pop("group_by")
+        return Response(payment_stats(group_fields=filters.group_fields(), **data))
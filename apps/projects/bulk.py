@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Task
+from .serializers import TaskSerializer
+
+User = get_user_model()
+
+
+def check_rows(rows):
+    """The body of a bulk create/update: a non-empty list of at most TASKS_BULK_MAX_ROWS objects."""
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        raise serializers.ValidationError({"rows": "Expected a non-empty list of task objects."})
+    if len(rows) > settings.TASKS_BULK_MAX_ROWS:
+        raise serializers.ValidationError({"rows": f"At most {settings.TASKS_BULK_MAX_ROWS} tasks per request."})
+    return rows
+
+
+def row_errors(errors):
+    """Per-row errors as ``[{"row": 1, "errors": {...}}, ...]`` (rows counted from 1), valid rows left out."""
+    return [{"row": row_no, "errors": row} for row_no, row in enumerate(errors, start=1) if row]
+
+
+def preload_users(rows) -> dict:
+    """The users assigned by any row, with one query (see PreloadedPrimaryKeyRelatedField)."""
+    ids = set()
+    for row in rows:
+        try:
+            ids.add(int(row["assigned_to"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return User.objects.in_bulk(ids) if ids else {}
+
+
+def validate_rows(rows, context, partial=False):
+    """Validate every row with TaskSerializer(many=True); returns (validated rows, per-row errors)."""
+    context = {**context, "preloaded": {"assigned_to": preload_users(rows)}}
+    ser = TaskSerializer(data=rows, many=True, partial=partial, context=context)
+    if ser.is_valid():
+        return ser.validated_data, []
+    return [], list(ser.errors)
+
+
+def create_tasks(project, rows, context):
+    """
+        Create one task per row in ``project``, or none if any row is invalid.
+
+        Rows are validated without per-row queries and written with one bulk_create, which
+        computes the SLA fields and the project rollups. Returns (tasks, row errors).
+    """
+    validated, errors = validate_rows(check_rows(rows), context)
+    if errors:
+        return [], row_errors(errors)
+    return Task.objects.bulk_create([Task(project=project, **data) for data in validated], batch_size=500), []
+
+
+def update_tasks(project, rows, context):
+    """
+        Partially update the tasks of ``project`` named by each row's ``id``, or none if any row
+        is invalid or names an unknown task. The tasks are read with one query and written with
+        one bulk_update of the fields the rows change. Returns (tasks, row errors).
+    """
+    check_rows(rows)
+    ids, id_errors = [], []
+    for row in rows:
+        try:
+            ids.append(int(row["id"]))
+            id_errors.append({})
+        except KeyError:
+            ids.append(None)
+            id_errors.append({"id": ["This field is required."]})
+        except (TypeError, ValueError):
+            ids.append(None)
+            id_errors.append({"id": ["A valid integer is required."]})
+
+    with transaction.atomic():
+        tasks = (
+            Task.objects.filter(project=project)
+            .select_related("assigned_to")
+            .select_for_update(of=("self",))
+            .in_bulk([pk for pk in ids if pk])
+        )
+        seen = set()
+        for pk, errors in zip(ids, id_errors):
+            if pk is None:
+                continue
+            if pk not in tasks:
+                errors["id"] = [f"Task {pk} not found in this project."]
+            elif pk in seen:
+                errors["id"] = [f"Task {pk} is listed more than once."]
+            seen.add(pk)
+
+        validated, field_errors = validate_rows(rows, context, partial=True)
+        errors = [{**a, **b} for a, b in zip(id_errors, field_errors or [{}] * len(rows))]
+        if any(errors):
+            return [], row_errors(errors)
+
+        changed, fields = [], {"updated_at"}
+        now = timezone.now()
+        for pk, data in zip(ids, validated):
+            task = tasks[pk]
+            for field, value in data.items():
+                setattr(task, field, value)
+            task.updated_at = now
+            fields.update(data)
+            changed.append(task)
+        Task.objects.bulk_update(changed, list(fields), batch_size=500)
+        return changed, []
+
+
+def missing_ids(ids, found):
+    return [
+        {"row": row_no, "errors": {"id": [f"Task {pk} not found in this project."]}}
+        for row_no, pk in enumerate(ids, start=1) if pk not in found
+    ]
+
+
+def reassign_tasks(project, ids, assigned_to):
+    """Assign the tasks ``ids`` of ``project`` to ``assigned_to`` (None unassigns) with one UPDATE."""
+    with transaction.atomic():
+        tasks = Task.objects.filter(project=project, pk__in=ids)
+        errors = missing_ids(ids, set(tasks.select_for_update().values_list("pk", flat=True)))
+        if errors:
+            return 0, errors
+        return tasks.update(assigned_to=assigned_to, updated_at=timezone.now()), []
+
+
+def set_task_status(project, ids, status):
+    """
+        Move the tasks ``ids`` of ``project`` to ``status`` with one bulk_update, so the SLA
+        events (e.g. completed) and the project rollups follow.
+    """
+    with transaction.atomic():
+        tasks = Task.objects.filter(project=project).select_for_update().in_bulk(ids)
+        errors = missing_ids(ids, tasks)
+        if errors:
+            return 0, errors
+        now = timezone.now()
+        for task in tasks.values():
+            task.status = status
+            task.updated_at = now
+        return Task.objects.bulk_update(tasks.values(), ["status", "updated_at"], batch_size=500), []
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.request.models import Request
+
+from . import rollups
+from .models import Project, Task
+
+
+def project_name(request) -> str:
+    return f"{request.system} - {request.request_type}"[:255]
+
+
+def build_project(request, name=None, project_manager=None, today=None) -> Project:
+    """
+        An unsaved project for ``request``. It keeps the request's SLA clock: the target and the
+        due times computed from the request's start under its policy and calendar, and the
+        breach time if it was already breached.
+    """
+    return Project(
+        name=name or project_name(request),
+        description=request.description,
+        request=request,
+        department=request.department,
+        country=request.market,
+        priority=request.priority,
+        project_manager=project_manager or request.assigned_to,
+        start_date=today or timezone.localdate(),
+        sla_target=request.sla_target,
+        sla_due=request.sla_due,
+        sla_due_soon_at=request.sla_due_soon_at,
+        sla_breached=request.sla_breached,
+        sla_breached_at=request.sla_breached_at,
+    )
+
+
+def template_tasks(template) -> list:
+    """Task rows of a named PROJECT_TASK_TEMPLATES entry, or the rows themselves."""
+    if isinstance(template, str):
+        return settings.PROJECT_TASK_TEMPLATES[template]
+    return list(template or [])
+
+
+def build_tasks(project, rows) -> list:
+    """Unsaved tasks of ``project`` from template rows; ``due_in_days`` counts from the project start."""
+    tasks = []
+    for row in rows:
+        row = dict(row)
+        due_in_days = row.pop("due_in_days", None)
+        if due_in_days is not None:
+            row["due_date"] = project.start_date + timedelta(days=due_in_days)
+        tasks.append(Task(project=project, start_date=project.start_date, **row))
+    return tasks
+
+
+def convert_requests(ids, template=None, name=None, project_manager=None):
+    """
+        Turn the requests ``ids`` into projects, each with the tasks of ``template`` (a
+        PROJECT_TASK_TEMPLATES name or a list of task rows), and mark them CONVERTED.
+
+        All or nothing: if a request is missing or already converted nothing is written and
+        the per-row errors are returned. Otherwise the requests are locked with one query and
+        projects, tasks and request statuses are each written with one bulk query per 500
+        rows, so the query count does not grow with the number of requests.
+        Returns (projects, row errors).
+    """
+    rows = template_tasks(template)
+    today = timezone.localdate()
+    with transaction.atomic():
+        requests = (
+            Request.objects.select_related("assigned_to")
+            .select_for_update(of=("self",))
+            .in_bulk(ids)
+        )
+        errors = []
+        for row_no, pk in enumerate(ids, start=1):
+            if pk not in requests:
+                errors.append({"row": row_no, "errors": {"id": [f"Request {pk} not found."]}})
+            elif requests[pk].status == Request.Status.CONVERTED:
+                errors.append({"row": row_no, "errors": {"id": [f"Request {pk} is already converted."]}})
+        if errors:
+            return [], errors
+
+        projects = Project.objects.bulk_create(
+            [build_project(requests[pk], name=name, project_manager=project_manager, today=today) for pk in ids],
+            batch_size=500,
+        )
+        tasks = Task.objects.bulk_create(
+            [task for project in projects for task in build_tasks(project, rows)],
+            batch_size=500,
+        )
+        for project in projects:
+            project.request.status = Request.Status.CONVERTED
+        Request.objects.bulk_update([project.request for project in projects], ["status"], batch_size=500)
+
+    tasks_by_project = {}
+    for task in tasks:
+        tasks_by_project.setdefault(task.project_id, []).append(task)
+    for project in projects:
+        project.created_tasks = tasks_by_project.get(project.pk, [])
+        # the rollups were written in SQL; mirror them on the returned instance
+        for field, value in rollups.totals(rollups.task_state(task) for task in project.created_tasks).items():
+            setattr(project, field, value)
+    return projects, []
+
+
+def convert_request(request_id, template=None, name=None, project_manager=None):
+    """Convert one request; returns (project or None, errors)."""
+    projects, errors = convert_requests([request_id], template=template, name=name, project_manager=project_manager)
+    return (projects[0] if projects else None), errors
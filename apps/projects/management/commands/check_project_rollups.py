@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.projects.models import Project
+from apps.projects.rollups import computed_rollups, drifted, refresh_projects
+
+
+class Command(BaseCommand):
+    """
+        Compare the task rollups stored on every project with their tasks (one aggregate query)
+        and report the projects that drifted, e.g. after raw SQL or a restored backup.
+
+        python manage.py check_project_rollups          # report only
+        python manage.py check_project_rollups --fix    # also recompute the drifted projects
+    """
+
+    help = "Check the project task rollups against the tasks table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Recompute the rollups of drifted projects")
+        parser.add_argument("--show", type=int, default=20, help="Drifted projects to list (default 20)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked, stale = 0, []
+        for project, values in computed_rollups(Project._base_manager.all()):
+            checked += 1
+            if not drifted(project, values):
+                continue
+            if len(stale) < options["show"]:
+                diff = ", ".join(
+                    f"{field} {getattr(project, field)} -> {value}"
+                    for field, value in values.items() if getattr(project, field) != value
+                )
+                self.stdout.write(f"project {project.pk}: {diff}")
+            stale.append(project.pk)
+
+        summary = f"{checked} projects checked, {len(stale)} drifted"
+        if stale and options["fix"]:
+            # recomputed under lock, so tasks written since the check are counted
+            with transaction.atomic():
+                fixed = refresh_projects(Project, stale)
+            summary += f", {fixed} fixed"
+        summary += f" in {time.perf_counter() - started:.2f}s"
+
+        if stale and not options["fix"]:
+            self.stdout.write(self.style.WARNING(f"{summary}; run with --fix to recompute them"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.projects.conversion import convert_request, convert_requests
+from apps.projects.models import Project
+from apps.request.models import Request
+
+BENCH_TAG = "conversion_bench"
+
+
+class QueryCounter:
+    """connection.execute_wrapper that counts statements (CaptureQueriesContext keeps at most 9000)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """
+        Queries and time to convert requests into projects with templated tasks, one request
+        at a time and in one bulk conversion. The bulk query count should not grow with --requests.
+
+        python manage.py conversion_bench --requests 500 --template default
+    """
+
+    help = "Benchmark request -> project conversion"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests converted per path")
+        parser.add_argument("--template", default="default", help="PROJECT_TASK_TEMPLATES entry to scaffold")
+
+    def make_requests(self, count):
+        return Request.objects.bulk_create(
+            [
+                Request(
+                    description=BENCH_TAG, request_type="bench", system=BENCH_TAG, department="bench",
+                    market="bench", improvement_type="bench",
+                )
+                for _ in range(count)
+            ],
+            batch_size=500,
+        )
+
+    def handle(self, *args, **options):
+        count, template = options["requests"], options["template"]
+        try:
+            for label in ("one by one", "bulk"):
+                ids = [request.pk for request in self.make_requests(count)]
+                queries = QueryCounter()
+                started = time.perf_counter()
+                with connection.execute_wrapper(queries):
+                    if label == "bulk":
+                        projects, errors = convert_requests(ids, template=template)
+                    else:
+                        results = [convert_request(pk, template=template) for pk in ids]
+                        projects = [project for project, _ in results]
+                        errors = [error for _, row_errors in results for error in row_errors]
+                elapsed = time.perf_counter() - started
+                assert not errors, errors
+                tasks = sum(len(project.created_tasks) for project in projects)
+                self.stdout.write(
+                    f"{label:>10}: {count} requests, {tasks} tasks, queries={queries.count} "
+                    f"time={elapsed * 1000:.0f}ms ({elapsed / count * 1000:.2f}ms/request)"
+                )
+        finally:
+            Project.objects.filter(request__system=BENCH_TAG).delete()
+            Request.objects.filter(system=BENCH_TAG).delete()
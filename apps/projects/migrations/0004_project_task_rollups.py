@@ -0,0 +1,122 @@
+# Generated by Django 4.2 on 2026-10-18 17:11
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+
+# The backfill is written out with the historical models, not apps.projects.rollups, so this
+# migration keeps computing the same rollups whatever the app code does later.
+
+STATUS_COLUMNS = {
+    "scoping": "tasks_scoping", "wip": "tasks_wip", "completed": "tasks_completed",
+    "deferred": "tasks_deferred", "on-hold": "tasks_on_hold",
+}
+
+
+def backfill_rollups(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Task = apps.get_model("projects", "Task")
+    # a task weighs its estimate in the progress, one hour when it has none
+    weight = Coalesce(NullIf(F("estimated_hours"), Value(0)), Value(1))
+    aggregates = {
+        "tasks_total": Count("pk"),
+        "tasks_overdue": Count("pk", filter=Q(sla_status="overdue") & ~Q(status="completed")),
+        "progress_weight": Sum(weight),
+        "progress_points": Coalesce(
+            Sum(F("completion_rate") * weight, output_field=models.DecimalField(max_digits=14, decimal_places=2)),
+            Value(Decimal("0.00")),
+        ),
+        "estimated_hours_total": Coalesce(Sum("estimated_hours"), 0),
+        "actual_hours_total": Coalesce(Sum("actual_hours"), 0),
+        **{column: Count("pk", filter=Q(status=status)) for status, column in STATUS_COLUMNS.items()},
+    }
+    projects = []
+    # projects without tasks keep the zero defaults
+    for row in Task.objects.order_by().values("project_id").annotate(**aggregates).iterator(chunk_size=2000):
+        project = Project(pk=row.pop("project_id"), **row)
+        project.progress = (Decimal(project.progress_points) / project.progress_weight).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP,
+        )
+        projects.append(project)
+    Project.objects.bulk_update(projects, [*aggregates, "progress"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_sla_due_soon_at_task_sla_due_soon_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='actual_hours_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='estimated_hours_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='progress',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Weighted completion percent of the tasks (0.00 - 100.00)', max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='progress_points',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='progress_weight',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_completed',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_deferred',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_on_hold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_overdue',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Open tasks past their SLA'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_scoping',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_wip',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['progress', 'id'], name='projects_pr_progres_96f5b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['tasks_overdue', 'id'], name='projects_pr_tasks_o_74a59d_idx'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
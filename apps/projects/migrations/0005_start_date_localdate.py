@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 17:14
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_task_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='start_date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='start_date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
@@ -1,10 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from apps.request.models import Request
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from datetime import timedelta
 from .mixins import SLAMixin
+from . import rollups
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -16,6 +19,10 @@ class Project(SLAMixin):
         DEFERRED = "deferred", _("Deferred")
         ON_HOLD = "on-hold", _("On-hold")
 
+    # statuses whose SLA is no longer tracked (skipped by the SLA sweeper)
+    SLA_CLOSED_STATUSES = [Status.COMPLETED]
+    sla_title_field = "name"
+
     class Priority(models.TextChoices):
         LOW = "low", _("Low")
         MEDIUM = "medium", _("Medium")
@@ -30,7 +37,7 @@ class Project(SLAMixin):
     )
     department = models.CharField(max_length=100, blank=True)
     country = models.CharField(max_length=100, blank=True)
-    start_date = models.DateField(default=timezone.now)
+    start_date = models.DateField(default=timezone.localdate)
     end_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PLANNED)
     project_manager = models.ForeignKey(
@@ -38,9 +45,30 @@ class Project(SLAMixin):
         null=True, blank=True, related_name="managed_projects"
     )
     priority = models.CharField(max_length=10, choices=Priority.choices, default=Priority.MEDIUM)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)  # known before the first write (SLA)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # --- Task rollups, maintained from Task writes (apps.projects.rollups) ---
+    tasks_total = models.PositiveIntegerField(default=0, editable=False)
+    tasks_scoping = models.PositiveIntegerField(default=0, editable=False)
+    tasks_wip = models.PositiveIntegerField(default=0, editable=False)
+    tasks_completed = models.PositiveIntegerField(default=0, editable=False)
+    tasks_deferred = models.PositiveIntegerField(default=0, editable=False)
+    tasks_on_hold = models.PositiveIntegerField(default=0, editable=False)
+    tasks_overdue = models.PositiveIntegerField(default=0, editable=False, help_text="Open tasks past their SLA")
+    estimated_hours_total = models.PositiveIntegerField(default=0, editable=False)
+    actual_hours_total = models.PositiveIntegerField(default=0, editable=False)
+    # progress = progress_points / progress_weight, tasks weighted by their estimated hours (1 when unset)
+    progress_weight = models.PositiveIntegerField(default=0, editable=False)
+    progress_points = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    progress = models.DecimalField(
+        max_digits=5, decimal_places=2, default=0, editable=False,
+        help_text="Weighted completion percent of the tasks (0.00 - 100.00)"
+    )
+
+    # name and description, weighted; kept up to date by a database trigger (apps.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
@@ -52,33 +80,15 @@ class Project(SLAMixin):
             # index SLA fields so you can quickly find due/overdue items
             models.Index(fields=["sla_status"]),
             models.Index(fields=["sla_due"]),
+            # sorting the project list by progress / overdue tasks
+            models.Index(fields=["progress", "id"]),
+            models.Index(fields=["tasks_overdue", "id"]),
+            GinIndex(fields=["search_vector"]),
         ]
 
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        """
-        Save once to ensure created_at exists, then evaluate SLA.
-        Only persist SLA fields if they actually changed (update_sla_status returns True).
-        """
-        # First save to get created_at (if new)
-        super().save(*args, **kwargs)
-
-        # update_sla_status should return True when it changed fields; if your mixin does not return a boolean,
-        # you can remove the condition and always save the SLA fields (less optimal).
-        changed = False
-        try:
-            changed = self.update_sla_status()
-        except TypeError:
-            # fallback if update_sla_status doesn't accept no args or doesn't return bool
-            self.update_sla_status()
-            changed = True
-
-        if changed:
-            # only update fields that the SLA logic may have changed
-            super().save(update_fields=["sla_due", "sla_status", "sla_breached", "sla_breached_at"])
-
 
 class Task(SLAMixin):
     class Status(models.TextChoices):
@@ -88,6 +98,11 @@ class Task(SLAMixin):
         DEFERRED = "deferred", _("Deferred")
         ON_HOLD = "on-hold", _("On-hold")
 
+    SLA_CLOSED_STATUSES = [Status.COMPLETED]
+    sla_title_field = "title"
+
+    objects = rollups.TaskQuerySet.as_manager()
+
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="tasks")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -96,7 +111,7 @@ class Task(SLAMixin):
         null=True, blank=True, related_name="tasks_assigned"
     )
 
-    start_date = models.DateField(default=timezone.now)
+    start_date = models.DateField(default=timezone.localdate)
     due_date = models.DateField(null=True, blank=True)
 
     # use positive integers for hours
@@ -116,9 +131,12 @@ class Task(SLAMixin):
         default="medium"
     )
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.WIP)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)  # known before the first write (SLA)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # title and description, weighted; kept up to date by a database trigger (apps.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
@@ -128,21 +146,44 @@ class Task(SLAMixin):
             models.Index(fields=["due_date"]),
             models.Index(fields=["sla_status"]),
             models.Index(fields=["sla_due"]),
+            GinIndex(fields=["search_vector"]),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+    def remember_sla_state(self):
+        """Also keep the rollup inputs as stored, so the next write only applies the difference."""
+        super().remember_sla_state()
+        self._rollup_state = rollups.task_state(self)
+
     def save(self, *args, **kwargs):
-        # Persist (to populate created_at if new)
-        super().save(*args, **kwargs)
-
-        changed = False
-        try:
-            changed = self.update_sla_status()
-        except TypeError:
-            self.update_sla_status()
-            changed = True
-
-        if changed:
-            super().save(update_fields=["sla_due", "sla_status", "sla_breached", "sla_breached_at"])
+        """
+        Writes the task and applies its change to the project rollups in the same transaction.
+        """
+        creating = self._state.adding and self.pk is None
+        old = None if creating else getattr(self, "_rollup_state", None)
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            new = rollups.task_state(self)
+            update_fields = kwargs.get("update_fields")
+            if old is not None and update_fields is not None:
+                # fields left out of update_fields keep their stored value (the SLA ones are always written)
+                saved = {"project_id" if name == "project" else name for name in update_fields} | {"sla_status"}
+                new = old._replace(**{name: getattr(new, name) for name in new._fields if name in saved})
+            if creating or old is not None:
+                rollups.record_changes(Project, [(old, new)])
+            else:
+                rollups.refresh_projects(Project, [self.project_id])
+            self._rollup_state = new
+
+    def delete(self, *args, **kwargs):
+        old = getattr(self, "_rollup_state", None)
+        project_id = self.project_id
+        with transaction.atomic(using=kwargs.get("using")):
+            deleted = super().delete(*args, **kwargs)
+            if old is not None:
+                rollups.record_changes(Project, [(old, None)])
+            else:
+                rollups.refresh_projects(Project, [project_id])
+        return deleted
@@ -0,0 +1,236 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, NullIf
+
+from apps.sla.engine import OVERDUE
+from apps.sla.mixins import SLAQuerySet
+
+# Task fields the project rollups are computed from
+TASK_ROLLUP_FIELDS = ["project", "project_id", "status", "sla_status", "completion_rate", "estimated_hours", "actual_hours"]
+
+TASK_STATUSES = ["scoping", "wip", "completed", "deferred", "on-hold"]
+CLOSED_STATUSES = ["completed"]
+
+# Project columns holding the rollups ("progress" is derived from the two progress_* sums)
+COUNT_FIELDS = ["tasks_total", *[f"tasks_{status.replace('-', '_')}" for status in TASK_STATUSES], "tasks_overdue"]
+SUM_FIELDS = ["progress_weight", "progress_points", "estimated_hours_total", "actual_hours_total"]
+ROLLUP_FIELDS = [*COUNT_FIELDS, *SUM_FIELDS, "progress"]
+
+CENT = Decimal("0.01")
+
+
+class TaskRollupState(NamedTuple):
+    """What one task contributes to its project's rollups."""
+    project_id: Optional[int]
+    status: str
+    sla_status: str
+    completion_rate: Decimal
+    estimated_hours: Optional[int]
+    actual_hours: Optional[int]
+
+
+def task_weight(estimated_hours) -> int:
+    """Weight of a task in the project progress: its estimate, one hour when it has none."""
+    return estimated_hours or 1
+
+
+def compute_progress(points, weight) -> Decimal:
+    if not weight:
+        return Decimal("0.00")
+    return (Decimal(points) / weight).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def task_state(task):
+    """The rollup inputs of a task as loaded, or None if one of them is deferred."""
+    values = task.__dict__
+    if any(name not in values for name in TaskRollupState._fields):
+        return None
+    return TaskRollupState(*(values[name] for name in TaskRollupState._fields))
+
+
+def contribution(state) -> dict:
+    if state is None or state.project_id is None:
+        return {}
+    weight = task_weight(state.estimated_hours)
+    overdue = state.sla_status == OVERDUE and state.status not in CLOSED_STATUSES
+    return {
+        "tasks_total": 1,
+        f"tasks_{state.status.replace('-', '_')}": 1,
+        "tasks_overdue": int(overdue),
+        "progress_weight": weight,
+        "progress_points": Decimal(str(state.completion_rate or 0)).quantize(CENT) * weight,
+        "estimated_hours_total": state.estimated_hours or 0,
+        "actual_hours_total": state.actual_hours or 0,
+    }
+
+
+def totals(states) -> dict:
+    """Every rollup column of a project holding tasks in ``states`` (no query)."""
+    values = dict.fromkeys(COUNT_FIELDS + SUM_FIELDS, 0)
+    for state in states:
+        for field, value in contribution(state).items():
+            values[field] += value
+    values["progress"] = compute_progress(values["progress_points"], values["progress_weight"])
+    return values
+
+
+def record_changes(project_model, changes, batch_size=500):
+    """
+        Apply ``(old state, new state)`` task changes to the project rollups as deltas.
+
+        A created task has no old state and a deleted one no new state; a task moved to
+        another project is taken off the old project and added to the new one. The deltas
+        are summed per project and written with one UPDATE ... SET col = col + CASE id ...
+        per ``batch_size`` projects, so call it inside the transaction that writes the tasks.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old, new in changes:
+        if old == new:
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            for field, value in contribution(state).items():
+                deltas[state.project_id][field] += sign * value
+
+    deltas = {pk: {field: value for field, value in delta.items() if value} for pk, delta in deltas.items()}
+    deltas = [(pk, delta) for pk, delta in deltas.items() if delta]
+    for start in range(0, len(deltas), batch_size):
+        batch = deltas[start:start + batch_size]
+        fields = sorted({field for _, delta in batch for field in delta})
+        values = {
+            field: F(field) + Case(
+                *[When(pk=pk, then=Value(delta[field])) for pk, delta in batch if field in delta],
+                default=Value(0),
+                output_field=project_model._meta.get_field(field),
+            )
+            for field in fields
+        }
+        # the right-hand side reads the row before the update, so apply the deltas here too
+        values["progress"] = Case(
+            *[
+                When(
+                    pk=pk,
+                    progress_weight__gt=-delta.get("progress_weight", 0),
+                    then=(F("progress_points") + delta.get("progress_points", 0))
+                    / (F("progress_weight") + delta.get("progress_weight", 0)),
+                )
+                for pk, delta in batch
+            ],
+            default=Value(Decimal("0.00")),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        )
+        project_model._base_manager.filter(pk__in=[pk for pk, _ in batch]).update(**values)
+
+
+def rollup_aggregates(tasks="tasks") -> dict:
+    """Aggregates over the ``tasks`` relation that recompute every rollup column but progress."""
+    open_overdue = Q(**{f"{tasks}__sla_status": OVERDUE}) & ~Q(**{f"{tasks}__status__in": CLOSED_STATUSES})
+    weight = Coalesce(NullIf(F(f"{tasks}__estimated_hours"), Value(0)), Value(1))
+    aggregates = {
+        "tasks_total": Count(tasks),
+        "tasks_overdue": Count(tasks, filter=open_overdue),
+        # the LEFT JOIN row of a project without tasks would weigh 1
+        "progress_weight": Coalesce(Sum(weight, filter=Q(**{f"{tasks}__isnull": False})), 0),
+        "progress_points": Coalesce(
+            Sum(F(f"{tasks}__completion_rate") * weight, output_field=DecimalField(max_digits=14, decimal_places=2)),
+            Value(Decimal("0.00")),
+        ),
+        "estimated_hours_total": Coalesce(Sum(f"{tasks}__estimated_hours"), 0),
+        "actual_hours_total": Coalesce(Sum(f"{tasks}__actual_hours"), 0),
+    }
+    for status in TASK_STATUSES:
+        aggregates[f"tasks_{status.replace('-', '_')}"] = Count(tasks, filter=Q(**{f"{tasks}__status": status}))
+    return {f"actual_{field}": expression for field, expression in aggregates.items()}
+
+
+def computed_rollups(projects):
+    """
+        ``(project, rollups)`` for each project of the queryset, the rollups recomputed from
+        its tasks in one grouped query. The project carries its stored columns.
+    """
+    rows = projects.order_by().annotate(**rollup_aggregates())
+    for project in rows.iterator(chunk_size=2000):
+        values = {field: getattr(project, f"actual_{field}") for field in COUNT_FIELDS + SUM_FIELDS}
+        values["progress"] = compute_progress(values["progress_points"], values["progress_weight"])
+        yield project, values
+
+
+def drifted(project, values) -> bool:
+    return any(getattr(project, field) != value for field, value in values.items())
+
+
+def refresh_projects(project_model, project_ids, batch_size=500) -> int:
+    """
+        Recompute the rollups of ``project_ids`` from their tasks: the projects are locked, then
+        one aggregate query and one bulk UPDATE. Used for set-based task writes (QuerySet.update/
+        delete) where the old values are unknown; ``project_ids=None`` refreshes every project.
+        Call it inside a transaction. Returns the number of projects corrected.
+    """
+    projects = project_model._base_manager.all()
+    if project_ids is not None:
+        project_ids = {pk for pk in project_ids if pk is not None}
+        if not project_ids:
+            return 0
+        projects = projects.filter(pk__in=project_ids)
+    # FOR UPDATE is not allowed with GROUP BY, so lock first: concurrent deltas wait for the rewrite
+    locked = list(projects.select_for_update().order_by("pk").values_list("pk", flat=True))
+    stale = []
+    for project, values in computed_rollups(project_model._base_manager.filter(pk__in=locked)):
+        if drifted(project, values):
+            for field, value in values.items():
+                setattr(project, field, value)
+            stale.append(project)
+    # the base manager's bulk_update leaves the project's SLA fields alone
+    project_model._base_manager.bulk_update(stale, ROLLUP_FIELDS, batch_size=batch_size)
+    return len(stale)
+
+
+class TaskQuerySet(SLAQuerySet):
+    """
+        Keeps the project rollups in line with bulk task writes: bulk_create adds the new
+        tasks' contributions as deltas, update()/delete() recompute the touched projects with
+        refresh_projects (bulk_update goes through update()).
+    """
+
+    def _project_model(self):
+        return self.model._meta.get_field("project").related_model
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+                # rows that already existed were skipped or changed in place
+                refresh_projects(self._project_model(), {obj.project_id for obj in objs})
+            else:
+                record_changes(self._project_model(), [(None, task_state(obj)) for obj in objs])
+        return created
+
+    def update(self, **kwargs):
+        if not any(field in TASK_ROLLUP_FIELDS for field in kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            project_ids = set(self.order_by().values_list("project_id", flat=True).distinct())
+            rows = super().update(**kwargs)
+            new_project = kwargs.get("project_id", kwargs.get("project"))
+            if hasattr(new_project, "resolve_expression"):
+                project_ids = None  # moved by an expression: recompute every project below
+            else:
+                project_ids.add(getattr(new_project, "pk", new_project))
+            refresh_projects(self._project_model(), project_ids)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            project_ids = set(self.order_by().values_list("project_id", flat=True).distinct())
+            deleted = super().delete()
+            refresh_projects(self._project_model(), project_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
@@ -1,20 +1,43 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from apps.request.models import Request
 from .models import Task, Project
 
 User = get_user_model()
 
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that looks the object up in ``context['preloaded'][<field name>]``
+    (pk -> object) when the caller loaded them for many rows at once, instead of one query per row.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return preloaded[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """
     Task Serializer
     """
     
     assigned_to_name = serializers.StringRelatedField(source="assigned_to", read_only=True)
+    assigned_to = PreloadedPrimaryKeyRelatedField(queryset=User.objects.all(), allow_null=True, required=False)
     
     class Meta:
         model = Task
-        fields = "__all__"
+        exclude = ["search_vector"]
         read_only_fields = ["project"]
     
     def __init__(self, *args, **kwargs):
@@ -22,7 +45,73 @@ class TaskSerializer(serializers.ModelSerializer):
         # Make project field read-only if we're in a nested context
         if self.context.get('view') and 'project_pk' in self.context['view'].kwargs:
             self.fields['project'].read_only = True
-            
+
+
+class TaskBulkIdsSerializer(serializers.Serializer):
+    """Tasks picked by id for a bulk action on /api/projects/<id>/tasks/bulk/..."""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(value) > settings.TASKS_BULK_MAX_ROWS:
+            raise serializers.ValidationError(f"At most {settings.TASKS_BULK_MAX_ROWS} tasks per request.")
+        return list(dict.fromkeys(value))
+
+
+class TaskBulkReassignSerializer(TaskBulkIdsSerializer):
+    assigned_to = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), allow_null=True)
+
+
+class TaskBulkStatusSerializer(TaskBulkIdsSerializer):
+    status = serializers.ChoiceField(choices=Task.Status.choices)
+
+
+class TaskTemplateSerializer(serializers.ModelSerializer):
+    """A task row scaffolded into a project converted from a request."""
+    due_in_days = serializers.IntegerField(min_value=0, required=False, help_text="Due date, in days from the project start")
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'priority', 'status', 'estimated_hours', 'due_in_days']
+
+
+class RequestConvertSerializer(serializers.Serializer):
+    """
+    Options of a request -> project conversion: the project name and manager (default from the
+    request) and the tasks to scaffold, a PROJECT_TASK_TEMPLATES ``template`` or inline ``tasks``.
+    """
+    name = serializers.CharField(max_length=255, required=False)
+    project_manager = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    template = serializers.CharField(required=False)
+    tasks = TaskTemplateSerializer(many=True, required=False)
+
+    def validate_template(self, value):
+        if value not in settings.PROJECT_TASK_TEMPLATES:
+            raise serializers.ValidationError(
+                f"Unknown template, use one of {', '.join(settings.PROJECT_TASK_TEMPLATES)}."
+            )
+        return value
+
+    def validate(self, attrs):
+        if 'template' in attrs and 'tasks' in attrs:
+            raise serializers.ValidationError("Give either a template or tasks, not both.")
+        return attrs
+
+    @property
+    def task_rows(self):
+        return self.validated_data.get('template') or self.validated_data.get('tasks')
+
+
+class RequestBulkConvertSerializer(RequestConvertSerializer):
+    """Many requests converted at once; each project is named after its request."""
+    name = None
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        if len(value) > settings.PROJECT_CONVERT_MAX_REQUESTS:
+            raise serializers.ValidationError(f"At most {settings.PROJECT_CONVERT_MAX_REQUESTS} requests per conversion.")
+        return list(dict.fromkeys(value))
+
+
 class ProjectSerializer(serializers.ModelSerializer):
     # --- Read-only fields for related object names ---
     project_manager_name = serializers.StringRelatedField(source='project_manager', read_only=True)
@@ -56,6 +145,9 @@ class ProjectSerializer(serializers.ModelSerializer):
     priority_write = serializers.ChoiceField(
         choices=Project.Priority.choices, write_only=True, source='priority'
     )
+
+    # --- Task rollups (stored on the project, see apps.projects.rollups) ---
+    task_stats = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
@@ -74,6 +166,9 @@ class ProjectSerializer(serializers.ModelSerializer):
 
             # --- SLA Fields (from mixin) ---
             'sla_due', 'sla_status', 'sla_breached', 'sla_breached_at',
+
+            # --- Task Rollups ---
+            'progress', 'task_stats',
             
             # --- Nested Tasks ---
             'tasks'
@@ -82,9 +177,19 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'sla_due',
             'sla_breached',
-            'sla_breached_at'
+            'sla_breached_at',
+            'progress',
         ]
 
+    def get_task_stats(self, obj):
+        return {
+            'total': obj.tasks_total,
+            'by_status': {status: getattr(obj, f'tasks_{status.replace("-", "_")}') for status in Task.Status.values},
+            'overdue': obj.tasks_overdue,
+            'estimated_hours': obj.estimated_hours_total,
+            'actual_hours': obj.actual_hours_total,
+        }
+
     def save(self, **kwargs):
         """
         Handles the custom 'save' logic from your model.
@@ -93,4 +198,18 @@ class ProjectSerializer(serializers.ModelSerializer):
         # When serializer.save() is called, it will call the
         # Project.save() method, which already contains your
         # double-save logic for the SLA mixin. It just works!
-        return super().save(**kwargs)
\ No newline at end of file
+        return super().save(**kwargs)
+
+
+class ProjectListSerializer(ProjectSerializer):
+    """
+    List representation of a project: the task rollups without the nested tasks.
+
+    The rollups are columns of the project row, so a page costs no query per project.
+    The nested ``tasks`` are only kept when the view asks for them (``?expand=tasks``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'tasks' not in self.context.get('expand', ()):
+            self.fields.pop('tasks')
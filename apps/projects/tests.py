@@ -1,3 +1,229 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.request.models import Request
+from apps.sla.models import BusinessCalendar, SLAEvent, SLAPolicy
+from apps.sla.policies import registry
+
+from .conversion import convert_request
+from .models import Project, Task
+from .rollups import ROLLUP_FIELDS, computed_rollups, refresh_projects
+
+# a private cache, so tests may clear it without touching a shared one (REDIS_URL)
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "projects-tests"}}
+
+
+def reset_policies():
+    cache.clear()
+    registry._loaded = None
+
+
+class TaskRollupTests(TestCase):
+    """The deltas Task.save/delete apply leave the same rollups as refresh_projects."""
+
+    def setUp(self):
+        self.project = Project.objects.create(name="Rollout")
+        self.other = Project.objects.create(name="Migration")
+
+    def assertRollupsMatchRefresh(self):
+        projects = Project.objects.filter(pk__in=[self.project.pk, self.other.pk])
+        for project, values in computed_rollups(projects):
+            self.assertEqual({field: getattr(project, field) for field in ROLLUP_FIELDS}, values, project.name)
+        self.assertEqual(refresh_projects(Project, [self.project.pk, self.other.pk]), 0)
+
+    def task(self, title, **fields):
+        return Task.objects.create(project=self.project, title=title, **fields)
+
+    def test_create_edit_move_and_delete(self):
+        design = self.task("Design", estimated_hours=10, actual_hours=4, completion_rate=Decimal("50"))
+        build = self.task("Build", status=Task.Status.SCOPING)
+        self.task("Test", estimated_hours=0, status=Task.Status.ON_HOLD)
+        self.assertRollupsMatchRefresh()
+
+        design.status = Task.Status.COMPLETED
+        design.completion_rate = Decimal("100")
+        design.actual_hours = 12
+        design.save()
+        self.assertRollupsMatchRefresh()
+
+        build.project = self.other
+        build.save(update_fields=["project"])
+        self.assertRollupsMatchRefresh()
+
+        design.delete()
+        self.assertRollupsMatchRefresh()
+
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.tasks_total, self.project.tasks_on_hold), (1, 1))
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.tasks_total, self.other.tasks_scoping), (1, 1))
+
+    def test_progress_is_weighted_by_the_estimate(self):
+        self.task("Long", estimated_hours=30, completion_rate=Decimal("100"))
+        self.task("Short", estimated_hours=10, completion_rate=Decimal("20"))
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.progress, Decimal("80.00"))
+        self.assertRollupsMatchRefresh()
+
+    def test_overdue_count_follows_the_sla(self):
+        task = self.task("Late", sla_target=timedelta(hours=1))
+        Task.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(days=1), sla_due=None)
+        task.refresh_from_db()
+
+        task.save()  # recomputes the SLA: overdue
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.tasks_overdue, 1)
+        self.assertRollupsMatchRefresh()
+
+        task.status = Task.Status.COMPLETED
+        task.save()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.tasks_overdue, 0)
+        self.assertRollupsMatchRefresh()
+
+    def test_update_fields_only_applies_the_saved_fields(self):
+        task = self.task("Design", estimated_hours=10)
+        task.estimated_hours = 40
+        task.title = "Design v2"
+        task.save(update_fields=["title"])
+
+        self.assertRollupsMatchRefresh()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.estimated_hours_total, 10)
+
+
+class BulkTaskTests(TestCase):
+    """The bulk actions of /api/projects/<id>/tasks/bulk/."""
+
+    def setUp(self):
+        self.project = Project.objects.create(name="Rollout")
+        self.user = get_user_model().objects.create(email="planner@sunkinghub.local")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/projects/{self.project.pk}/tasks/bulk/"
+
+    def rows(self, count):
+        return [
+            {"title": f"Task {i}", "estimated_hours": 2, "assigned_to": self.user.pk, "sla_target": "2 00:00:00"}
+            for i in range(count)
+        ]
+
+    def test_create_costs_the_same_for_any_number_of_rows(self):
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.post(self.url, self.rows(2), format="json")
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.post(self.url, self.rows(30), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(many), len(few))
+
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.tasks_total, self.project.estimated_hours_total), (32, 64))
+        self.assertFalse(Task.objects.filter(sla_due__isnull=True).exists())
+
+    def test_invalid_rows_write_nothing(self):
+        rows = self.rows(3)
+        rows[1]["status"] = "unknown"
+        rows[2]["assigned_to"] = 0
+
+        response = self.client.post(self.url, rows, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3])
+        self.assertIn("status", response.data["errors"][0]["errors"])
+        self.assertIn("assigned_to", response.data["errors"][1]["errors"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_update_by_id(self):
+        first, second = Task.objects.bulk_create(
+            [Task(project=self.project, title="Design"), Task(project=self.project, title="Build")]
+        )
+        other = Task.objects.create(project=Project.objects.create(name="Elsewhere"), title="Foreign")
+
+        response = self.client.patch(self.url, [
+            {"id": first.pk, "completion_rate": "100.00", "status": "completed"},
+            {"id": other.pk, "title": "Mine now"},
+        ], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"], [
+            {"row": 2, "errors": {"id": [f"Task {other.pk} not found in this project."]}},
+        ])
+
+        response = self.client.patch(self.url, [
+            {"id": first.pk, "completion_rate": "100.00", "status": "completed"},
+            {"id": second.pk, "title": "Build v2"},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=second.pk).title, "Build v2")
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.tasks_completed, self.project.progress), (1, Decimal("50.00")))
+
+    def test_reassign_and_status(self):
+        tasks = Task.objects.bulk_create([Task(project=self.project, title=f"Task {i}") for i in range(3)])
+        ids = [task.pk for task in tasks]
+
+        response = self.client.post(f"{self.url}reassign/", {"ids": ids, "assigned_to": self.user.pk}, format="json")
+        self.assertEqual(response.data, {"updated": 3})
+        self.assertEqual(Task.objects.filter(assigned_to=self.user).count(), 3)
+
+        response = self.client.post(f"{self.url}status/", {"ids": [*ids, 0], "status": "completed"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.filter(status="completed").count(), 0)
+
+        response = self.client.post(f"{self.url}status/", {"ids": ids, "status": "completed"}, format="json")
+        self.assertEqual(response.data, {"updated": 3})
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.tasks_completed, 3)
+        self.assertEqual(SLAEvent.objects.filter(model="projects.Task", kind="completed").count(), 3)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConversionTests(TestCase):
+    """A project converted from a request keeps the request's SLA clock."""
+
+    def setUp(self):
+        reset_policies()
+        self.addCleanup(reset_policies)
+
+    def request(self, timestamp):
+        return Request.objects.create(
+            description="Export the payroll", request_type="report", system="ERP", department="Finance",
+            market="Nigeria", improvement_type="automation", timestamp=timestamp,
+        )
+
+    def test_project_keeps_the_working_time_due_dates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            BusinessCalendar.objects.create(name="Nigeria", market="Nigeria", timezone="Africa/Lagos")
+            SLAPolicy.objects.create(name="Reports", request_type="report", target=timedelta(hours=8))
+        # Friday 15:00 in Lagos: two working hours left, the other six on Monday
+        request = self.request(datetime(2026, 10, 16, 15, tzinfo=ZoneInfo("Africa/Lagos")))
+
+        project, errors = convert_request(request.pk)
+
+        self.assertEqual(errors, [])
+        project = Project.objects.get(pk=project.pk)
+        self.assertEqual(project.sla_due, datetime(2026, 10, 19, 15, tzinfo=ZoneInfo("Africa/Lagos")))
+        self.assertEqual(
+            (project.sla_target, project.sla_due, project.sla_due_soon_at),
+            (request.sla_target, request.sla_due, request.sla_due_soon_at),
+        )
+
+    def test_breach_time_is_kept(self):
+        request = self.request(timezone.now() - timedelta(days=5))
+        self.assertTrue(request.sla_breached)
+
+        project, _ = convert_request(request.pk)
+
+        project = Project.objects.get(pk=project.pk)
+        self.assertEqual((project.sla_status, project.sla_due), ("overdue", request.sla_due))
+        self.assertEqual(project.sla_breached_at, request.sla_breached_at)
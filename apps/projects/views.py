@@ -1,8 +1,15 @@
-from rest_framework import viewsets, permissions
+from django.db.models import Prefetch
+from rest_framework import filters, status, viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from apps.common.exports import ExportMixin
+from . import bulk
 from .models import Project, Task
-from .serializers import ProjectSerializer, TaskSerializer
+from .serializers import (
+    ProjectListSerializer, ProjectSerializer, TaskSerializer, TaskBulkReassignSerializer, TaskBulkStatusSerializer,
+)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -14,29 +21,125 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100  # Maximum page size clients can request
     page_query_param = 'page'  # Query parameter name for page number
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ExportMixin, viewsets.ModelViewSet):
     """
         API endpoints for the Project model. This viewset give us /api/projects/ and /api/projects/<id>/
-    """ 
-    queryset = Project.objects.all().select_related('project_manager', 'request').prefetch_related('tasks')
+        and a streaming /api/projects/export/?output=csv|ndjson&columns=...
+
+        Projects carry their task rollups (``progress``, ``task_stats``), kept up to date by Task
+        writes, so the list and ``?ordering=-progress`` cost no extra query. The tasks themselves
+        are nested on retrieve, or on the list with ``?expand=tasks``.
+    """
+    queryset = (
+        Project.objects.all()
+        .select_related('project_manager', 'request')
+        .defer('search_vector', 'request__search_vector')
+    )
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['progress', 'tasks_overdue', 'tasks_total', 'created_at', 'start_date', 'end_date', 'name']
+    ordering = ['-created_at', '-id']
+    export_filename = 'projects'
+    export_columns = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'status': 'status',
+        'priority': 'priority',
+        'department': 'department',
+        'country': 'country',
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        'project_manager': 'project_manager__email',
+        'request': 'request_id',
+        'sla_status': 'sla_status',
+        'sla_due': 'sla_due',
+        'sla_breached': 'sla_breached',
+        'progress': 'progress',
+        'tasks_total': 'tasks_total',
+        'tasks_completed': 'tasks_completed',
+        'tasks_overdue': 'tasks_overdue',
+        'estimated_hours_total': 'estimated_hours_total',
+        'actual_hours_total': 'actual_hours_total',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
      
+    def get_expand(self):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return set()
+        return {part.strip() for part in request.query_params.get('expand', '').split(',') if part.strip()}
+
+    def get_queryset(self):
+        """
+            Tasks are prefetched with their assignee only when they are serialized.
+        """
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            if 'tasks' in self.get_expand():
+                queryset = queryset.prefetch_related(self.tasks_prefetch())
+        elif self.action != 'export':
+            queryset = queryset.prefetch_related(self.tasks_prefetch())
+        return queryset
+
+    @staticmethod
+    def tasks_prefetch():
+        return Prefetch('tasks', queryset=Task.objects.select_related('assigned_to').defer('search_vector'))
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProjectListSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
     def perform_create(self, serializer):
         # You could, for example, set the project_manager to the current user
         # serializer.save(project_manager=self.request.user)
         serializer.save()
          
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ExportMixin, viewsets.ModelViewSet):
     """
         API endpoints for Tasks.
         This ViewSet is nested under projects.
-        Gives us /api/projects/<project_id>/tasks/
+        Gives us /api/projects/<project_id>/tasks/ and /api/projects/<project_id>/tasks/export/
+
+        Bulk actions, each one transaction that writes nothing if any row is rejected
+        (400 with ``{"errors": [{"row": 1, "errors": {...}}]}``):
+        POST  tasks/bulk/           a list of tasks to create
+        PATCH tasks/bulk/           a list of partial updates, each with its task ``id``
+        POST  tasks/bulk/reassign/  {"ids": [...], "assigned_to": <user id> | null}
+        POST  tasks/bulk/status/    {"ids": [...], "status": "completed"}
     """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    export_filename = 'tasks'
+    export_columns = {
+        'id': 'id',
+        'project': 'project_id',
+        'title': 'title',
+        'description': 'description',
+        'status': 'status',
+        'priority': 'priority',
+        'assigned_to': 'assigned_to__email',
+        'start_date': 'start_date',
+        'due_date': 'due_date',
+        'estimated_hours': 'estimated_hours',
+        'actual_hours': 'actual_hours',
+        'completion_rate': 'completion_rate',
+        'sla_status': 'sla_status',
+        'sla_due': 'sla_due',
+        'sla_breached': 'sla_breached',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
     
     def get_queryset(self):
         """
@@ -47,22 +150,62 @@ class TaskViewSet(viewsets.ModelViewSet):
         project_pk = self.kwargs.get('project_pk')
         if project_pk:
             # Return only tasks for that specific project with optimized queries
-            return Task.objects.filter(project_id=project_pk).select_related('assigned_to', 'project')
+            return (
+                Task.objects.filter(project_id=project_pk)
+                .select_related('assigned_to', 'project')
+                .defer('search_vector', 'project__search_vector')
+            )
         # if no project_pk is provided.
         return Task.objects.none()
     
+    def get_project(self):
+        """The project from the URL, looked up once per request."""
+        if not hasattr(self, '_project'):
+            try:
+                self._project = Project.objects.only('id').get(pk=self.kwargs.get('project_pk'))
+            except (Project.DoesNotExist, ValueError):
+                raise PermissionDenied('Project not found')
+        return self._project
+
     def perform_create(self, serializer):
         """
         This automatically sets the project on the task when we create it.
         """
-        project_pk = self.kwargs.get('project_pk')
-        try:
-            project = Project.objects.get(pk=project_pk)
-        except Project.DoesNotExist:
-            raise PermissionDenied('Project not found')
-        
         # Save the task with the project automatically linked
-        serializer.save(project=project)
+        serializer.save(project=self.get_project())
+
+    def bulk_response(self, result, success_status=status.HTTP_200_OK):
+        tasks, errors = result
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TaskSerializer(tasks, many=True, context=self.get_serializer_context()).data, status=success_status)
+
+    @action(detail=False, methods=['post'], url_path='bulk', pagination_class=None)
+    def bulk_create(self, request, *args, **kwargs):
+        result = bulk.create_tasks(self.get_project(), request.data, self.get_serializer_context())
+        return self.bulk_response(result, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        return self.bulk_response(bulk.update_tasks(self.get_project(), request.data, self.get_serializer_context()))
+
+    @action(detail=False, methods=['post'], url_path='bulk/reassign', serializer_class=TaskBulkReassignSerializer)
+    def bulk_reassign(self, request, *args, **kwargs):
+        ser = TaskBulkReassignSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        updated, errors = bulk.reassign_tasks(self.get_project(), ser.validated_data['ids'], ser.validated_data['assigned_to'])
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['post'], url_path='bulk/status', serializer_class=TaskBulkStatusSerializer)
+    def bulk_status(self, request, *args, **kwargs):
+        ser = TaskBulkStatusSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        updated, errors = bulk.set_task_status(self.get_project(), ser.validated_data['ids'], ser.validated_data['status'])
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
         
     def get_serializer_context(self):
         """Passes the 'project_pk' from the URL to the serializer."""
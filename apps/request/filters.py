@@ -0,0 +1,92 @@
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from apps.sla.mixins import SLAMixin
+
+from .models import Request
+
+
+def comma_list(value) -> list:
+    return list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+
+
+def choice_list(value, choices) -> list:
+    values = comma_list(value)
+    unknown = [v for v in values if v not in choices]
+    if unknown:
+        raise serializers.ValidationError(f"Unknown value(s) {', '.join(unknown)}, use {', '.join(choices)}.")
+    return values
+
+
+class RequestFilterParamsSerializer(serializers.Serializer):
+    """
+        Query-string filters of the request list, each optional and combined with AND:
+        ?status=wip,scoping &priority=high &department=IT &market=Kenya &sla_status=overdue
+        &assigned_to=<user id>,none &timestamp_after=2024-01-01 &timestamp_before=2024-02-01
+        Comma-separated values match any of them.
+    """
+
+    status = serializers.CharField(required=False)
+    priority = serializers.CharField(required=False)
+    department = serializers.CharField(required=False)
+    market = serializers.CharField(required=False)
+    sla_status = serializers.CharField(required=False)
+    assigned_to = serializers.CharField(required=False)
+    timestamp_after = serializers.DateTimeField(required=False)
+    timestamp_before = serializers.DateTimeField(required=False)
+
+    def validate_status(self, value):
+        return choice_list(value, Request.Status.values)
+
+    def validate_priority(self, value):
+        return choice_list(value, Request.Priority.values)
+
+    def validate_sla_status(self, value):
+        return choice_list(value, SLAMixin.SLAStatus.values)
+
+    def validate_department(self, value):
+        return comma_list(value)
+
+    def validate_market(self, value):
+        return comma_list(value)
+
+    def validate_assigned_to(self, value):
+        """User ids, ``none`` for unassigned requests."""
+        values = comma_list(value)
+        try:
+            return [None if v == "none" else int(v) for v in values]
+        except ValueError:
+            raise serializers.ValidationError("Expected user ids or none.")
+
+    def validate(self, attrs):
+        after, before = attrs.get("timestamp_after"), attrs.get("timestamp_before")
+        if after and before and after > before:
+            raise serializers.ValidationError({"timestamp_before": "Must not be earlier than timestamp_after."})
+        return attrs
+
+    def filter(self, queryset):
+        """``queryset`` narrowed by the validated filters (``__in`` for the lists)."""
+        data = self.validated_data
+        lookups = {f"{field}__in": data[field] for field in ("status", "priority", "department", "market", "sla_status") if field in data}
+        if "timestamp_after" in data:
+            lookups["timestamp__gte"] = data["timestamp_after"]
+        if "timestamp_before" in data:
+            lookups["timestamp__lt"] = data["timestamp_before"]
+        queryset = queryset.filter(**lookups)
+        if "assigned_to" in data:
+            ids = [pk for pk in data["assigned_to"] if pk is not None]
+            assigned = Q(assigned_to__in=ids)
+            if None in data["assigned_to"]:
+                assigned |= Q(assigned_to__isnull=True)
+            queryset = queryset.filter(assigned)
+        return queryset
+
+
+class RequestFilterBackend(BaseFilterBackend):
+    """Applies RequestFilterParamsSerializer; an invalid filter is a 400."""
+
+    def filter_queryset(self, request, queryset, view):
+        params = RequestFilterParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.filter(queryset)
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 16:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0003_remove_request_requestor_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='request',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0004_sla_start_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='sla_due_soon_at',
+            field=models.DateTimeField(blank=True, help_text='When the item turns due soon (due threshold, in working time under a calendar).', null=True),
+        ),
+    ]
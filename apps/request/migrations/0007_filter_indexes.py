@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='request',
+            name='request_req_status_301325_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='request',
+            name='request_req_priorit_6ad0a3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='request',
+            name='request_req_assigne_9964b4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='request',
+            name='request_req_sla_sta_7e0d6e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['-timestamp', '-id'], name='request_req_timesta_94df3d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['status', '-timestamp', '-id'], name='request_req_status_237b74_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['priority', '-timestamp', '-id'], name='request_req_priorit_ce42b4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['assigned_to', '-timestamp', '-id'], name='request_req_assigne_3e71f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['sla_status', '-timestamp', '-id'], name='request_req_sla_sta_894478_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['department', '-timestamp', '-id'], name='request_req_departm_0a4128_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['market', '-timestamp', '-id'], name='request_req_market_0705ec_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from datetime import timedelta
 from .mixins import SLAMixin
@@ -17,6 +20,9 @@ class Request(SLAMixin, models.Model):
         ON_HOLD = "on-hold", _("On-hold")
         CONVERTED = "converted_to_project", _("Converted to Project")
 
+    # statuses whose SLA is no longer tracked (skipped by the SLA sweeper)
+    SLA_CLOSED_STATUSES = [Status.COMPLETED, Status.CONVERTED]
+
     class Priority(models.TextChoices):
         LOW = "low", _("Low")
         MEDIUM = "medium", _("Medium")
@@ -26,7 +32,7 @@ class Request(SLAMixin, models.Model):
         SHORT = "short_term", _("Short Term")
         LONG = "long_term", _("Long Term")
     
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)  # known before the first write (SLA)
     description = models.TextField()
     request_type = models.CharField(max_length=50)
     system = models.CharField(max_length=100)
@@ -60,16 +66,28 @@ class Request(SLAMixin, models.Model):
     follow_up = models.BooleanField(default=False)
     requestor_email = models.EmailField(blank=True)
     improvement_type = models.CharField(max_length=60)
+
+    # system, request_type and description, weighted; kept up to date by a database trigger (apps.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     
+    sla_start_field = "timestamp"
+    sla_title_field = "description"
+
     class Meta:
         ordering = ["-timestamp"]
+        # the list filters on one of these columns and pages by -timestamp, -id (RequestViewSet),
+        # so each filter column leads an index in that order; a filter on it alone still uses it
         indexes = [
-            models.Index(fields=["status"]),
-            models.Index(fields=["priority"]),
-            models.Index(fields=["assigned_to"]),
-            models.Index(fields=["sla_status"]),
+            models.Index(fields=["-timestamp", "-id"]),
+            models.Index(fields=["status", "-timestamp", "-id"]),
+            models.Index(fields=["priority", "-timestamp", "-id"]),
+            models.Index(fields=["assigned_to", "-timestamp", "-id"]),
+            models.Index(fields=["sla_status", "-timestamp", "-id"]),
+            models.Index(fields=["department", "-timestamp", "-id"]),
+            models.Index(fields=["market", "-timestamp", "-id"]),
             models.Index(fields=["sla_due"]),
+            GinIndex(fields=["search_vector"]),
         ]
         
         
@@ -77,42 +95,16 @@ class Request(SLAMixin, models.Model):
         return f"Request #{self.pk} - {self.request_type} ({self.status})"
     
     
-    def save(self, *args, **kwargs):
+    def get_sla_policy(self):
+        """The SLAPolicy matching this request's type, priority, market and duration type."""
+        from apps.sla.policies import registry
+        return registry.resolve(self.request_type, self.priority, self.market, self.duration_type)
+
+    def get_sla_target(self):
         """
-        Override save to automatically set the sla_target based on
-        duration_type, and then run the mixin's SLA calculator.
+        Without a matching SLAPolicy the target follows duration_type:
+        3 days for short term, 10 days for long term.
         """
-        
-        # --- This is our "Bridge Logic" ---
-        # It sets the sla_target from the mixin based on the
-        # old duration_type field.
         if self.duration_type == self.DurationType.SHORT:
-            self.sla_target = timedelta(days=3)
-        else: # 'long_term'
-            self.sla_target = timedelta(days=10)
-        # ------------------------------------
-
-        # --- This is the Mixin Logic (copied from Project) ---
-        # First save to get a 'timestamp' (if new)
-        # We must avoid an infinite loop, so we only run SLA logic 
-        # if we are NOT just updating SLA fields
-        update_fields = kwargs.get("update_fields")
-        is_sla_update = update_fields and "sla_due" in update_fields
-
-        if not is_sla_update:
-            super().save(*args, **kwargs) # Save normally
-            
-            changed = False
-            try:
-                changed = self.update_sla_status()
-            except TypeError:
-                self.update_sla_status()
-                changed = True
-    
-            if changed:
-                # Save *only* the SLA fields
-                super().save(update_fields=["sla_due", "sla_status", "sla_breached", "sla_breached_at"])
-        else:
-            # This is already the second save (the SLA update)
-            super().save(*args, **kwargs)
-    
+            return timedelta(days=3)
+        return timedelta(days=10)
@@ -68,4 +68,18 @@ class RequestSerializer(serializers.ModelSerializer):
             'sla_breached',
             'sla_breached_at',
             'sla_target'
-        ]
\ No newline at end of file
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset (?fields=, see RequestViewSet.get_sparse_fields): the other fields
+        # are dropped, so their display names and related lookups are never computed.
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def readable_fields(cls):
+        """The field names a response can carry, i.e. what ?fields= may ask for."""
+        return [name for name, field in cls().fields.items() if not field.write_only]
@@ -1,20 +1,125 @@
-from rest_framework import viewsets, permissions
+from rest_framework import filters, viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from apps.common.exports import ExportMixin
+from apps.projects.conversion import convert_request, convert_requests
+from apps.projects.serializers import ProjectSerializer, RequestBulkConvertSerializer, RequestConvertSerializer
+from .filters import RequestFilterBackend
 from .models import Request
 from .serializers import RequestSerializer
 from .pagination import StandardResultsSetPagination
 
 # Create your views here.
 
-class RequestViewSet(viewsets.ModelViewSet):
+class RequestViewSet(ExportMixin, viewsets.ModelViewSet):
     """
     API endpoints for Requests.
     Gives us /api/requests/ and /api/requests/<id>/
+    and a streaming /api/requests/export/?output=csv|ndjson&columns=...
+
+    The list (and the export) take the filters of RequestFilterParamsSerializer
+    (?status=wip,scoping&assigned_to=12&timestamp_after=2024-01-01 ...) and
+    ?ordering=-timestamp|sla_due|completed_at|status|id. List and retrieve take a sparse
+    fieldset, ?fields=id,system,status_display, which also skips the user joins and the
+    description column when those fields are not asked for.
+
+    Conversion to projects (one transaction each, see apps.projects.conversion):
+    POST /api/requests/<id>/convert/  {"name", "project_manager", "template" | "tasks"} -> the project
+    POST /api/requests/convert/       {"ids": [...], "template" | "tasks"} -> request/project pairs
     """
     serializer_class = RequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    filter_backends = [RequestFilterBackend, filters.OrderingFilter]
+    ordering_fields = ['timestamp', 'sla_due', 'completed_at', 'status', 'id']
+    ordering = ['-timestamp', '-id']
+    export_filename = 'requests'
+    export_columns = {
+        'id': 'id',
+        'timestamp': 'timestamp',
+        'description': 'description',
+        'request_type': 'request_type',
+        'system': 'system',
+        'department': 'department',
+        'market': 'market',
+        'priority': 'priority',
+        'duration_type': 'duration_type',
+        'status': 'status',
+        'assigned_to': 'assigned_to__email',
+        'assigned_by': 'assigned_by__email',
+        'requestor_email': 'requestor_email',
+        'improvement_type': 'improvement_type',
+        'follow_up': 'follow_up',
+        'completed_at': 'completed_at',
+        'sla_status': 'sla_status',
+        'sla_due': 'sla_due',
+        'sla_breached': 'sla_breached',
+    }
     
     queryset = Request.objects.select_related(
         'assigned_to', 
         'assigned_by'
-    ).all()
+    ).defer('search_vector')
+
+    def get_sparse_fields(self):
+        """The fields named by ?fields= on list/retrieve, None for all of them."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            value = self.request.query_params.get('fields', '') if self.action in ('list', 'retrieve') else ''
+            fields = list(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+            if fields:
+                allowed = RequestSerializer.readable_fields()
+                unknown = [name for name in fields if name not in allowed]
+                if unknown:
+                    raise serializers.ValidationError(
+                        {'fields': [f"Unknown field(s) {', '.join(unknown)}, use {', '.join(allowed)}."]}
+                    )
+                self._sparse_fields = fields
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            related = [name for name in ('assigned_to', 'assigned_by') if f'{name}_name' in fields]
+            queryset = queryset.select_related(None).select_related(*related)
+            if 'description' not in fields:
+                queryset = queryset.defer('description')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, 'request', None) is not None:
+            context['fields'] = self.get_sparse_fields()
+        return context
+
+    @action(detail=True, methods=['post'], serializer_class=RequestConvertSerializer)
+    def convert(self, request, *args, **kwargs):
+        ser = RequestConvertSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        project, errors = convert_request(
+            self.get_object().pk,
+            template=ser.task_rows,
+            name=ser.validated_data.get('name'),
+            project_manager=ser.validated_data.get('project_manager'),
+        )
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ProjectSerializer(project, context=self.get_serializer_context()).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='convert', serializer_class=RequestBulkConvertSerializer)
+    def bulk_convert(self, request, *args, **kwargs):
+        ser = RequestBulkConvertSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        projects, errors = convert_requests(
+            ser.validated_data['ids'],
+            template=ser.task_rows,
+            project_manager=ser.validated_data.get('project_manager'),
+        )
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        converted = [
+            {'request': project.request_id, 'project': project.pk, 'tasks': len(project.created_tasks)}
+            for project in projects
+        ]
+        return Response({'converted': converted}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+DEFAULT_ROLE_KEY = "roles:default-role"
+
+
+def default_role_id() -> int:
+    """
+        Id of the DEFAULT_USER_ROLE group new users get, created if missing. Cached, so a
+        signup does not look it up again; the roles signals drop it when a role changes.
+    """
+    cached = cache.get(DEFAULT_ROLE_KEY)
+    if cached is not None and cached[0] == settings.DEFAULT_USER_ROLE:
+        return cached[1]
+    role, _ = Group.objects.get_or_create(name=settings.DEFAULT_USER_ROLE)
+    cache.set(DEFAULT_ROLE_KEY, (role.name, role.pk), timeout=None)
+    return role.pk
+
+
+def forget_default_role():
+    cache.delete(DEFAULT_ROLE_KEY)
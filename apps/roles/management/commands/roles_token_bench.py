@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.paga_payments.management.commands.paga_bench import percentile
+from apps.roles.models import Role
+from apps.roles.tokens import RoleClaimsRefreshToken
+
+BENCH_EMAIL = "roles-token-bench@sunkinghub.local"
+
+
+class Command(BaseCommand):
+    """
+        Requests per second on a role-guarded endpoint (default the Admin/Finance payment
+        stats), through the full middleware and URL stack, for one bench user in the Finance
+        role:
+
+        db      ROLES_IN_TOKEN off: the User row is loaded on every request, roles from the snapshot
+        claims  ROLES_IN_TOKEN on: roles from the access token, the token state from the cache
+
+        Each request's queries are reported, the endpoint's own included. The bench user is
+        deleted at the end (and the Finance role, if the bench created it).
+
+        python manage.py roles_token_bench --requests 2000 --path /api/payments/stats/
+    """
+
+    help = "Benchmark a role-guarded endpoint with and without role claims in the token"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+        parser.add_argument("--path", default="/api/payments/stats/", help="Role-guarded GET endpoint")
+
+    def handle(self, *args, requests, path, **options):
+        User = get_user_model()
+        role, role_created = Role.objects.get_or_create(name="Finance")
+        user = User.objects.create(email=BENCH_EMAIL, is_active=True)
+        try:
+            user.groups.add(role)
+            results = {}
+            for name, claims in (("db", False), ("claims", True)):
+                with override_settings(ROLES_IN_TOKEN=claims):
+                    user.refresh_from_db()
+                    results[name] = self.bench(path, user, requests)
+                rate, p50, p95, queries = results[name]
+                self.stdout.write(
+                    f"{name:>6}: {rate:.0f} req/s p50={p50 * 1000:.2f}ms p95={p95 * 1000:.2f}ms queries/request={queries}"
+                )
+            self.stdout.write(f"claims vs db: {results['claims'][0] / results['db'][0]:.2f}x req/s")
+        finally:
+            user.delete()
+            if role_created:
+                role.delete()
+
+    def bench(self, path, user, requests):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RoleClaimsRefreshToken.for_user(user).access_token}")
+        # warm the caches (roles snapshot, token state) and check the token is accepted
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f"GET {path} failed: {response.status_code} {getattr(response, 'data', '')}")
+
+        samples = []
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            for _ in range(requests):
+                request_started = time.perf_counter()
+                client.get(path)
+                samples.append(time.perf_counter() - request_started)
+            elapsed = time.perf_counter() - started
+        return requests / elapsed, percentile(samples, 50), percentile(samples, 95), len(captured) / requests
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    apps.get_model("roles", "RolesGeneration").objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RolesGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
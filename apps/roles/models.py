@@ -14,4 +14,16 @@ class Role(Group):
         verbose_name_plural = "Roles"
         
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class RolesGeneration(models.Model):
+    """
+        Single row bumped whenever a role is renamed, deleted or has its permissions changed
+        (apps.roles.snapshot.invalidate_all), so every worker sees role edits through the
+        database, whatever cache it has.
+    """
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"roles generation {self.value}"
@@ -1,5 +1,24 @@
 from rest_framework.permissions import BasePermission
 
+from .snapshot import codenames, get_snapshot
+
+
+def user_roles(user) -> list:
+    """Role names from a role-claims token (ROLES_IN_TOKEN), else from the cached snapshot."""
+    roles = getattr(user, "token_roles", None)
+    if roles is not None:
+        return roles
+    return get_snapshot(user)["roles"]  # cached, no query on the warm path
+
+
+def user_permissions(user) -> set:
+    """Permission codenames from a role-claims token, else from the cached snapshot."""
+    held = getattr(user, "token_permissions", None)
+    if held is not None:
+        return held
+    return set(codenames(get_snapshot(user)))
+
+
 def HasRole(allowed_roles):
     class _HasRole(BasePermission):
         def has_permission(self, request, view):
@@ -8,6 +27,20 @@ def HasRole(allowed_roles):
                 return False
             if user.is_superuser:
                 return True  # Superuser bypass
-            user_roles = [g.name for g in user.groups.all()]
-            return any(role in user_roles for role in allowed_roles)
-    return _HasRole
\ No newline at end of file
+            user_roles_ = user_roles(user)
+            return any(role in user_roles_ for role in allowed_roles)
+    return _HasRole
+
+
+def HasPermission(required_codenames):
+    """Every one of the permission codenames (e.g. "view_payment") is required."""
+    class _HasPermission(BasePermission):
+        def has_permission(self, request, view):
+            user = request.user
+            if not user or not user.is_authenticated:
+                return False
+            if user.is_superuser:
+                return True  # Superuser bypass
+            held = user_permissions(user)
+            return all(codename in held for codename in required_codenames)
+    return _HasPermission
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import DatabaseError
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .defaults import forget_default_role
+from .models import Role
+from .snapshot import invalidate_all, invalidate_user
+from .tokens import bump_permissions_version, forget_token_state
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_access_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.groups / user.user_permissions (or group.user_set) changed."""
+    if action == "pre_clear" and reverse:
+        # group.user_set.clear(): the members are still known here
+        bump_permissions_version(instance.user_set.all())
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_user(instance.pk)
+        bump_permissions_version([instance.pk])
+        # a later instance.save() must not write the old version back
+        instance.refresh_from_db(fields=["permissions_version"])
+    elif pk_set:
+        invalidate_user(*pk_set)
+        bump_permissions_version(pk_set)
+    else:
+        # group.user_set.clear(): the members are gone already
+        invalidate_all()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def role_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # permission.group_set.clear(): its roles are still known here
+        bump_permissions_version(User.objects.filter(groups__in=instance.group_set.all()).distinct())
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_all()
+        if not reverse:
+            bump_permissions_version(instance.user_set.all())
+        elif pk_set:
+            bump_permissions_version(User.objects.filter(groups__in=pk_set).distinct())
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_all()
+        # the default role may have been renamed or deleted
+        forget_default_role()
+        if kwargs["signal"] is post_save:
+            bump_permissions_version(instance.user_set.all())
+
+
+@receiver(pre_delete, sender=Group)
+@receiver(pre_delete, sender=Role)
+def role_deleting(sender, instance, **kwargs):
+    """The members' role-claims tokens name the role: bump them while they are known."""
+    bump_permissions_version(instance.user_set.all())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """is_active / is_superuser may have changed: re-read the token state."""
+    forget_token_state(instance.pk)
+
+
+@receiver(post_migrate)
+def permissions_migrated(sender, **kwargs):
+    """New permissions may exist (superusers hold all of them)."""
+    try:
+        invalidate_all()
+        bump_permissions_version(User.objects.filter(is_superuser=True))
+    except DatabaseError:
+        # a partial migrate, before the roles and users tables are up to date
+        pass
@@ -0,0 +1,201 @@
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import RolesGeneration
+
+# Cache keys. A snapshot is valid while both the roles generation (bumped when any role
+# changes) and the user's own version (bumped when their roles/permissions change) match.
+# Those only reach the workers sharing the cache, so the snapshot also carries the user's
+# permissions_version (from the User row auth loads anyway, bumped by the same changes) and
+# the role map the RolesGeneration row: with a per-process cache, other workers still see
+# an edit on their next request.
+GENERATION_KEY = "roles:generation"
+USER_VERSION_KEY = "roles:user:{}:version"
+SNAPSHOT_KEY = "roles:user:{}:snapshot"
+# every role's name and permissions, and every permission's "app_label.codename", by id
+ROLE_MAP_KEY = "roles:role-map"
+
+
+def _token():
+    return uuid.uuid4().hex[:12]
+
+
+def invalidate_user(*user_ids):
+    """Drop the snapshots of these users once the current transaction commits."""
+    ids = [pk for pk in user_ids if pk is not None]
+    if ids:
+        transaction.on_commit(lambda: cache.set_many(
+            {USER_VERSION_KEY.format(pk): _token() for pk in ids}, timeout=None
+        ))
+
+
+def invalidate_all():
+    """Drop every snapshot (a role was renamed, deleted or had its permissions changed)."""
+    RolesGeneration.objects.filter(pk=1).update(value=F("value") + 1)
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, _token(), timeout=None))
+
+
+def roles_generation() -> int:
+    """The RolesGeneration value, one query."""
+    return RolesGeneration.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+
+
+def _versions(cached, user_ids):
+    """Read (or create) the generation and per-user version tokens from a get_many result."""
+    missing = {}
+    generation = cached.get(GENERATION_KEY)
+    if generation is None:
+        generation = missing[GENERATION_KEY] = _token()
+    versions = {}
+    for pk in user_ids:
+        key = USER_VERSION_KEY.format(pk)
+        versions[pk] = cached.get(key)
+        if versions[pk] is None:
+            versions[pk] = missing[key] = _token()
+    for key, value in missing.items():
+        # add() so a concurrent bump is not overwritten; re-read what won
+        if not cache.add(key, value, timeout=None):
+            value = cache.get(key, value)
+            if key == GENERATION_KEY:
+                generation = value
+            else:
+                versions[int(key.split(":")[2])] = value
+    return generation, versions
+
+
+def get_snapshots(users) -> dict:
+    """
+        Effective roles and permissions for several users: {user id: snapshot}.
+
+        A snapshot is {"roles": [names], "permissions": ["app_label.codename", ...],
+        "is_superuser": bool, ...}. Warm path: one cache round trip and no queries. Users
+        whose snapshot is missing or stale are computed together with two queries.
+    """
+    users = [user for user in users if user is not None and user.pk is not None]
+    if not users:
+        return {}
+    keys = [GENERATION_KEY]
+    for user in users:
+        keys += [USER_VERSION_KEY.format(user.pk), SNAPSHOT_KEY.format(user.pk)]
+    cached = cache.get_many(keys)
+    generation, versions = _versions(cached, [user.pk for user in users])
+
+    snapshots, stale = {}, []
+    for user in users:
+        snap = cached.get(SNAPSHOT_KEY.format(user.pk))
+        if (
+            snap is not None
+            and snap["generation"] == generation
+            and snap["version"] == versions[user.pk]
+            and snap["is_superuser"] == user.is_superuser
+            and snap.get("permissions_version") == user.permissions_version
+        ):
+            snapshots[user.pk] = snap
+        else:
+            stale.append(user)
+
+    if stale:
+        fresh = build_snapshots(stale, generation, versions)
+        cache.set_many(
+            {SNAPSHOT_KEY.format(pk): snap for pk, snap in fresh.items()},
+            timeout=settings.ROLES_SNAPSHOT_TTL,
+        )
+        snapshots.update(fresh)
+    return snapshots
+
+
+def get_snapshot(user) -> dict:
+    """Snapshot of one user, see get_snapshots."""
+    if user is None or user.pk is None:
+        return {"roles": [], "permissions": [], "is_superuser": False}
+    return get_snapshots([user])[user.pk]
+
+
+def build_snapshots(users, generation, versions) -> dict:
+    User = get_user_model()
+    ids = [user.pk for user in users]
+
+    roles, perms = defaultdict(list), defaultdict(set)
+    # roles and the permissions they grant in one query, then direct permissions
+    for user_id, name, app_label, codename in (
+        User.groups.through.objects.filter(user_id__in=ids)
+        .order_by("group__name")
+        .values_list("user_id", "group__name", "group__permissions__content_type__app_label",
+                     "group__permissions__codename")
+    ):
+        if name not in roles[user_id]:
+            roles[user_id].append(name)
+        if codename:
+            perms[user_id].add(f"{app_label}.{codename}")
+    for user_id, app_label, codename in User.user_permissions.through.objects.filter(user_id__in=ids).values_list(
+        "user_id", "permission__content_type__app_label", "permission__codename"
+    ):
+        perms[user_id].add(f"{app_label}.{codename}")
+
+    everything = set()
+    if any(user.is_superuser for user in users):
+        everything = {
+            f"{app_label}.{codename}"
+            for app_label, codename in Permission.objects.values_list("content_type__app_label", "codename")
+        }
+    return {
+        user.pk: {
+            "roles": roles[user.pk],
+            "permissions": sorted(everything if user.is_superuser else perms[user.pk]),
+            "is_superuser": user.is_superuser,
+            "permissions_version": user.permissions_version,
+            "generation": generation,
+            "version": versions[user.pk],
+        }
+        for user in users
+    }
+
+
+def codenames(snapshot) -> list:
+    """Permission codenames without the app label, as UserSerializer exposes them."""
+    return sorted({perm.split(".", 1)[1] for perm in snapshot["permissions"]})
+
+
+def role_map(role_ids=(), permission_ids=()) -> dict:
+    """
+        {"roles": {role id: (name, [permission ids])}, "permissions": {permission id:
+        "app_label.codename"}}, cached while the roles generation holds (any role edit bumps
+        it), checked against the RolesGeneration row (one query). Rebuilt with three more
+        queries when stale, or when it lacks one of ``role_ids`` / ``permission_ids`` (a role
+        or permission created since).
+    """
+    cached = cache.get_many([GENERATION_KEY, ROLE_MAP_KEY])
+    generation, _ = _versions(cached, [])
+    db_generation = roles_generation()
+    mapping = cached.get(ROLE_MAP_KEY)
+    if (
+        mapping is not None
+        and mapping["generation"] == generation
+        and mapping.get("db_generation") == db_generation
+        and all(pk in mapping["roles"] for pk in role_ids)
+        and all(pk in mapping["permissions"] for pk in permission_ids)
+    ):
+        return mapping
+
+    roles = {pk: (name, []) for pk, name in Group.objects.values_list("id", "name")}
+    for group_id, permission_id in Group.permissions.through.objects.values_list("group_id", "permission_id"):
+        if group_id in roles:  # a role created since the first query
+            roles[group_id][1].append(permission_id)
+    mapping = {
+        "roles": roles,
+        "permissions": {
+            pk: f"{app_label}.{codename}"
+            for pk, app_label, codename in Permission.objects.values_list("id", "content_type__app_label", "codename")
+        },
+        "generation": generation,
+        "db_generation": db_generation,
+    }
+    cache.set(ROLE_MAP_KEY, mapping, timeout=settings.ROLES_SNAPSHOT_TTL)
+    return mapping
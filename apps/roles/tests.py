@@ -1,3 +1,129 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Role
+from .snapshot import GENERATION_KEY, USER_VERSION_KEY, get_snapshot, role_map
+from .tokens import PERMISSIONS_CLAIM, ROLES_CLAIM, VERSION_CLAIM, RoleClaimsRefreshToken
+
+User = get_user_model()
+
+# a private cache, so tests may clear it without touching a shared one (REDIS_URL)
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "roles-tests"}}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RoleSnapshotTests(TestCase):
+    """The cached roles/permissions snapshot follows role and membership edits."""
+
+    def setUp(self):
+        cache.clear()
+        self.permission = Permission.objects.get(content_type__app_label="paga_payments", codename="view_payment")
+        self.role = Role.objects.create(name="Finance")
+        self.role.permissions.add(self.permission)
+        self.user = User.objects.create(email="snapshot@sunkinghub.local")
+        self.user.groups.add(self.role)
+
+    def snapshot(self):
+        # a fresh instance, as auth loads it on the next request
+        return get_snapshot(User.objects.get(pk=self.user.pk))
+
+    def test_snapshot_is_cached(self):
+        self.assertEqual(self.snapshot()["roles"], ["Finance"])
+        with self.assertNumQueries(1):
+            self.assertIn("paga_payments.view_payment", self.snapshot()["permissions"])
+
+    def test_role_permission_edit_drops_the_snapshot(self):
+        self.assertIn("paga_payments.view_payment", self.snapshot()["permissions"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.permission)
+
+        self.assertNotIn("paga_payments.view_payment", self.snapshot()["permissions"])
+
+    def test_edit_seen_by_a_worker_that_missed_the_cache_bump(self):
+        self.snapshot()
+        # another worker's per-process cache: the versions bumped on commit never reach it
+        stale_versions = cache.get_many([GENERATION_KEY, USER_VERSION_KEY.format(self.user.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.permission)
+            self.user.groups.remove(self.role)
+        cache.set_many(stale_versions, timeout=None)
+
+        snapshot = self.snapshot()
+        self.assertEqual(snapshot["roles"], [])
+        self.assertEqual(snapshot["permissions"], [])
+
+    def test_role_map_follows_a_rename(self):
+        self.assertEqual(role_map()["roles"][self.role.pk][0], "Finance")
+        stale_versions = cache.get_many([GENERATION_KEY])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.name = "Treasury"
+            self.role.save()
+        cache.set_many(stale_versions, timeout=None)
+
+        self.assertEqual(role_map()["roles"][self.role.pk][0], "Treasury")
+
+
+@override_settings(CACHES=TEST_CACHES, ROLES_IN_TOKEN=True)
+class RoleClaimsTokenTests(TestCase):
+    """Role-claims access tokens: authorized from the claims, refused once the roles change."""
+
+    STATS = "/api/payments/stats/"  # HasRole(["Admin", "Finance"])
+
+    def setUp(self):
+        cache.clear()
+        self.role = Role.objects.create(name="Finance")
+        self.role.permissions.add(
+            Permission.objects.get(content_type__app_label="paga_payments", codename="view_payment")
+        )
+        self.user = User.objects.create(email="claims@sunkinghub.local")
+        self.user.groups.add(self.role)
+        self.refresh = RoleClaimsRefreshToken.for_user(self.user)
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def test_claims_authorize_without_the_user_row(self):
+        access = self.refresh.access_token
+        self.assertEqual(access[ROLES_CLAIM], ["Finance"])
+        self.assertEqual(access[PERMISSIONS_CLAIM], ["view_payment"])
+        self.assertEqual(access[VERSION_CLAIM], self.user.permissions_version)
+
+        client = self.client_for(access)
+        self.assertEqual(client.get(self.STATS).status_code, 200)  # caches the token state
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(client.get(self.STATS).status_code, 200)
+        tables = " ".join(query["sql"] for query in captured)
+        self.assertNotIn("users_user", tables)
+        self.assertNotIn("auth_group", tables)
+
+    def test_role_removal_makes_the_token_stale_until_refreshed(self):
+        client = self.client_for(self.refresh.access_token)
+        self.assertEqual(client.get(self.STATS).status_code, 200)
+
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create(email="admin@sunkinghub.local", is_superuser=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = admin.post(f"/api/user/{self.user.pk}/remove_role/", {"role_id": self.role.pk}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get(self.STATS).status_code, 401)
+
+        response = APIClient().post("/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client_for(response.data["access"]).get(self.STATS).status_code, 403)
+
+    @override_settings(ROLES_IN_TOKEN=False)
+    def test_plain_tokens_without_the_setting(self):
+        access = RoleClaimsRefreshToken.for_user(self.user).access_token
+        self.assertNotIn(ROLES_CLAIM, access)
+        self.assertEqual(self.client_for(access).get(self.STATS).status_code, 200)
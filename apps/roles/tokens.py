@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.blacklist import RevocableTokenMixin
+
+from .snapshot import codenames, get_snapshot
+
+# Claims of a role-claims token (ROLES_IN_TOKEN)
+ROLES_CLAIM = "roles"
+PERMISSIONS_CLAIM = "perms"
+SUPERUSER_CLAIM = "su"
+VERSION_CLAIM = "pv"
+
+# (permissions_version, is_active, is_superuser) of a user, what a role-claims token is checked against
+TOKEN_STATE_KEY = "roles:user:{}:token-state"
+
+
+def token_state(user_id):
+    """
+        The current (permissions_version, is_active, is_superuser) of a user, None if it does
+        not exist. Cached for ROLES_TOKEN_STATE_TTL seconds: one query per user per period.
+    """
+    key = TOKEN_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = (
+            get_user_model()._default_manager.filter(pk=user_id)
+            .values_list("permissions_version", "is_active", "is_superuser").first()
+        )
+        if state is None:
+            return None
+        cache.set(key, state, timeout=settings.ROLES_TOKEN_STATE_TTL)
+    return tuple(state)
+
+
+def forget_token_state(*user_ids):
+    """Drop the cached token state of these users once the current transaction commits."""
+    keys = [TOKEN_STATE_KEY.format(pk) for pk in user_ids if pk is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def bump_permissions_version(users):
+    """
+        Invalidate the role-claims tokens of ``users`` (ids or a User queryset): their
+        permissions_version goes up, so the next request with an older token gets a 401
+        and the client refreshes it with the new roles.
+    """
+    User = get_user_model()
+    queryset = users if hasattr(users, "model") else User._default_manager.filter(pk__in=list(users))
+    ids = list(queryset.values_list("pk", flat=True))
+    if ids:
+        User._default_manager.filter(pk__in=ids).update(permissions_version=F("permissions_version") + 1)
+        forget_token_state(*ids)
+
+
+def stamp_role_claims(token, user):
+    """Put the user's roles, permission codenames and permissions version in ``token``."""
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    snapshot = get_snapshot(user)
+    token[ROLES_CLAIM] = snapshot["roles"]
+    # a superuser holds every permission: a flag instead of the whole list
+    token[PERMISSIONS_CLAIM] = [] if user.is_superuser else codenames(snapshot)
+    token[SUPERUSER_CLAIM] = user.is_superuser
+    token[VERSION_CLAIM] = user.permissions_version
+
+
+class RoleClaimsRefreshToken(RevocableTokenMixin, RefreshToken):
+    """
+        RefreshToken that, with ROLES_IN_TOKEN, carries the role claims into its access
+        tokens. On refresh they are stamped again from the current roles, so a token made
+        stale by a role change is replaced by a refresh, not a new login. Revocable
+        (apps.users.blacklist): rotated tokens and those of deactivated users are refused.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        if settings.ROLES_IN_TOKEN:
+            stamp_role_claims(token, user)
+            token.stamped = True
+        return token
+
+    @property
+    def access_token(self):
+        if settings.ROLES_IN_TOKEN and not getattr(self, "stamped", False):
+            user_id = self.payload.get(jwt_settings.USER_ID_CLAIM)
+            user = get_user_model()._default_manager.filter(**{jwt_settings.USER_ID_FIELD: user_id}).first()
+            if user is None:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            stamp_role_claims(self, user)
+            self.stamped = True
+        return super().access_token
+
+
+class RoleClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair of the dj_rest_auth login (REST_AUTH_SERIALIZERS["JWT_TOKEN_CLAIMS_SERIALIZER"])."""
+    token_class = RoleClaimsRefreshToken
+
+
+class RoleClaimsTokenRefreshSerializer(CookieTokenRefreshSerializer):
+    """dj_rest_auth's token refresh, re-stamping the role claims of the new access token."""
+    token_class = RoleClaimsRefreshToken
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+        request.user of a role-claims token. Its id, flags, roles and permissions come from
+        the token; the User row is only loaded when something else is asked of it (a field,
+        or using it in a query).
+    """
+
+    def __init__(self, token):
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+        super().__init__(
+            lambda: get_user_model()._default_manager.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        )
+        self.__dict__["_claims"] = {
+            "pk": user_id,
+            "id": user_id,
+            "is_authenticated": True,
+            "is_anonymous": False,
+            "is_active": True,
+            "is_superuser": bool(token.get(SUPERUSER_CLAIM)),
+            "token_roles": list(token[ROLES_CLAIM]),
+            "token_permissions": set(token.get(PERMISSIONS_CLAIM, [])),
+        }
+
+    def __getattr__(self, name):
+        claims = self.__dict__["_claims"]
+        if name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+        JWTAuthentication that, for role-claims tokens, checks the token against the cached
+        token state instead of loading the User row: a deactivated user, a superuser flag
+        change or a newer permissions_version makes the token stale (401). Other tokens go
+        through JWTAuthentication unchanged.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.ROLES_IN_TOKEN or ROLES_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        state = token_state(user_id)
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        version, is_active, is_superuser = state
+        if not is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if validated_token.get(VERSION_CLAIM) != version or bool(validated_token.get(SUPERUSER_CLAIM)) != is_superuser:
+            raise InvalidToken("The roles in this token have changed, refresh it.")
+        return TokenClaimsUser(validated_token)
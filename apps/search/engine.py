@@ -0,0 +1,158 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import BigIntegerField, CharField, F, Value
+from django.db.models.functions import Cast
+
+from apps.projects.models import Project, Task
+from apps.request.models import Request
+
+from .triggers import SEARCH_CONFIG
+
+FACETS = ["status", "priority", "department", "market", "sla_status"]
+
+
+class Source:
+    """
+        One searchable model: how its hits are titled and where each facet lives
+        (projects have no market of their own, tasks take department/market from the project).
+    """
+
+    def __init__(self, kind, model, title, facets, project="project_id"):
+        self.kind = kind
+        self.model = model
+        self.title = title
+        self.facets = facets
+        self.project = project
+
+    def matches(self, query, filters):
+        """Rows matching ``query`` (a SearchQuery) and the facet ``filters`` - a GIN index scan."""
+        lookups = {self.facets[facet]: value for facet, value in filters.items()}
+        # no Meta.ordering: each part of the UNION would be sorted for nothing
+        return self.model._base_manager.filter(search_vector=query, **lookups).order_by()
+
+    def hits(self, query, filters, cut):
+        """The ``cut`` best-ranked matches, in the order of the merged ranking (id breaks ties)."""
+        # typed NULL: an untyped one is resolved to text by the UNION
+        project = F(self.project) if self.project else Cast(Value(None), BigIntegerField())
+        return self.matches(query, filters).annotate(
+            hit_kind=Value(self.kind, output_field=CharField()),
+            hit_id=F("pk"),
+            hit_title=F(self.title),
+            hit_project=project,
+            hit_status=F("status"),
+            hit_priority=F("priority"),
+            hit_sla_status=F("sla_status"),
+            hit_rank=SearchRank(F("search_vector"), query),
+        ).values_list(
+            "hit_kind", "hit_id", "hit_title", "hit_project", "hit_status", "hit_priority", "hit_sla_status", "hit_rank",
+        ).order_by("-hit_rank", "-hit_id")[:cut]
+
+    def facet_rows(self, query, filters):
+        return self.matches(query, filters).annotate(
+            facet_kind=Value(self.kind, output_field=CharField()),
+            **{f"facet_{facet}": F(path) for facet, path in self.facets.items()},
+        ).values_list("facet_kind", *[f"facet_{facet}" for facet in FACETS])
+
+
+SOURCES = {
+    "requests": Source(
+        "requests", Request, "system",
+        {"status": "status", "priority": "priority", "department": "department", "market": "market",
+         "sla_status": "sla_status"},
+        project=None,
+    ),
+    "projects": Source(
+        "projects", Project, "name",
+        {"status": "status", "priority": "priority", "department": "department", "market": "country",
+         "sla_status": "sla_status"},
+        project=None,
+    ),
+    "tasks": Source(
+        "tasks", Task, "title",
+        {"status": "status", "priority": "priority", "department": "project__department",
+         "market": "project__country", "sla_status": "sla_status"},
+    ),
+}
+
+HIT_FIELDS = ["type", "id", "title", "project", "status", "priority", "sla_status", "rank"]
+
+
+def search_query(text):
+    """websearch syntax: words, "quoted phrases", OR, -excluded."""
+    return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def union_all(parts):
+    """
+        SQL and params of the querysets ``parts`` joined with UNION ALL, each in parentheses
+        so it keeps its own ORDER BY and LIMIT.
+    """
+    compiled = [part.query.sql_with_params() for part in parts]
+    sql = " UNION ALL ".join(f"({part_sql})" for part_sql, _ in compiled)
+    return sql, tuple(param for _, part_params in compiled for param in part_params)
+
+
+def ranked_hits(query, kinds, filters, limit, offset=0) -> list:
+    """
+        The best ``limit`` hits across ``kinds`` after ``offset``, with one UNION ALL query.
+        Each type contributes its best ``offset + limit`` rows (a top-N sort), all a page of
+        the merged ranking can take from it.
+    """
+    inner, params = union_all([SOURCES[kind].hits(query, filters, offset + limit) for kind in kinds])
+    sql = f"""
+        SELECT * FROM ({inner}) AS hits ({", ".join(HIT_FIELDS)})
+        ORDER BY rank DESC, type, id DESC
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*params, limit, offset))
+        rows = cursor.fetchall()
+    hits = []
+    for row in rows:
+        hit = dict(zip(HIT_FIELDS, row))
+        hit["rank"] = round(hit["rank"], 4)
+        hits.append(hit)
+    return hits
+
+
+def facet_counts(query, kinds, filters) -> dict:
+    """
+        Counts of the matching rows per type, status, priority, department, market and
+        sla_status, with one grouped query (GROUPING SETS over a UNION ALL of the sources).
+        Exact: every match is counted.
+    """
+    columns = ["type", *FACETS]
+    inner, params = union_all([SOURCES[kind].facet_rows(query, filters) for kind in kinds])
+    groupings = ", ".join(f"GROUPING({column})" for column in columns)
+    sql = f"""
+        SELECT {groupings}, {", ".join(columns)}, COUNT(*)
+        FROM ({inner}) AS hits ({", ".join(columns)})
+        GROUP BY GROUPING SETS ({", ".join(f"({column})" for column in columns)})
+    """
+    facets = {column: {} for column in columns}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            flags, values, count = row[:len(columns)], row[len(columns):-1], row[-1]
+            column = columns[flags.index(0)]
+            facets[column][values[flags.index(0)] or ""] = count
+    for column, counts in facets.items():
+        facets[column] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+    return facets
+
+
+def search(text, kinds=None, filters=None, limit=20, offset=0) -> dict:
+    """
+        Full-text search over requests, projects and tasks: ranked hits and facet counts, two
+        queries. Counts are exact and the hits are ranked over every match.
+    """
+    kinds = list(kinds or SOURCES)
+    filters = filters or {}
+    query = search_query(text)
+    facets = facet_counts(query, kinds, filters)
+    return {
+        "query": text,
+        "count": sum(facets["type"].values()),
+        "results": ranked_hits(query, kinds, filters, limit, offset),
+        "facets": facets,
+    }
@@ -0,0 +1,157 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.projects.models import Project, Task
+from apps.request.models import Request
+from apps.search.engine import search
+
+BENCH_TAG = "search_bench"
+
+# vocabulary of the seeded text; earlier words are drawn more often (roughly Zipf)
+WORDS = [
+    "payroll", "export", "report", "sales", "inventory", "crm", "erp", "dashboard", "kenya", "nigeria",
+    "uganda", "solar", "battery", "customer", "payment", "loan", "agent", "warehouse", "stock", "invoice",
+    "ledger", "mobile", "app", "portal", "login", "access", "sync", "integration", "api", "data",
+    "migration", "reconciliation", "audit", "forecast", "pricing", "commission", "onboarding", "training",
+    "support", "ticket", "escalation", "logistics", "delivery", "route", "fleet", "maintenance", "repair",
+    "warranty", "refund", "credit", "collection", "arrears", "sms", "notification", "email", "template",
+    "approval", "workflow", "budget", "procurement", "vendor", "contract", "compliance", "kyc", "fraud",
+    "risk", "scorecard", "kpi", "target", "region", "district", "zanzibar", "legacy", "archive", "backup",
+]
+
+QUERIES = ["payroll", "payroll export", '"sales report"', "kenya inventory -legacy", "crm or erp", "zanzibar", "kyc fraud risk"]
+
+
+def random_words(count) -> str:
+    """SQL for ``count`` words drawn from WORDS, the first ones more often."""
+    array = "(ARRAY[" + ", ".join(f"'{word}'" for word in WORDS) + "])"
+    pick = f"{array}[1 + floor(power(random(), 2) * {len(WORDS)})::int]"
+    return "concat_ws(' ', " + ", ".join([pick] * count) + ")"
+
+
+def insert_sql(model, count, overrides):
+    """
+        INSERT ... SELECT over generate_series(1, count) AS i. Columns take the SQL in
+        ``overrides``, else the field default (a parameter), else NULL; the search trigger
+        fills search_vector.
+    """
+    columns, values, params = [], [], []
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.name == "search_vector":
+            continue
+        columns.append(field.column)
+        if field.name in overrides:
+            values.append(overrides[field.name])
+        elif field.has_default():
+            values.append("%s")
+            params.append(field.get_db_prep_save(field.get_default(), connection))
+        elif field.null:
+            values.append("NULL")
+        else:
+            raise CommandError(f"No seed value for {model.__name__}.{field.name}")
+    sql = (
+        f"INSERT INTO {model._meta.db_table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM generate_series(1, {int(count)}) AS i"
+    )
+    return sql, params
+
+
+class Command(BaseCommand):
+    """
+        Seed requests, projects and tasks (--rows in total, 50/10/40%) with INSERT ... SELECT
+        generate_series, then time search() (ranked hits + facets) for a few queries against
+        --target-ms at the 95th percentile. Seeded rows are deleted afterwards unless --keep.
+
+        python manage.py search_bench --rows 1000000 --repeat 20 --target-ms 200
+    """
+
+    help = "Benchmark full-text search latency on a seeded dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Rows seeded across the three tables")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+        parser.add_argument("--target-ms", type=float, default=200.0, help="p95 latency target per search")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows (their project rollups are not maintained)")
+        parser.add_argument("--no-seed", action="store_true", help="Benchmark the rows already in the database")
+
+    def seed(self, rows):
+        counts = {"requests": rows // 2, "projects": max(1, rows // 10), "tasks": rows - rows // 2 - max(1, rows // 10)}
+        text = {"description": random_words(8)}
+        statements = [
+            insert_sql(Request, counts["requests"], {
+                **text,
+                "system": random_words(1), "request_type": random_words(1), "department": f"'{BENCH_TAG}'",
+                "market": random_words(1), "improvement_type": "'bench'", "requestor_email": "'bench' || i || '@example.com'",
+                "status": "(ARRAY['scoping', 'wip', 'completed', 'deferred', 'on-hold'])[1 + mod(i, 5)]",
+                "priority": "(ARRAY['low', 'medium', 'high'])[1 + mod(i, 3)]",
+            }),
+            insert_sql(Project, counts["projects"], {
+                **text,
+                "name": random_words(3), "department": f"'{BENCH_TAG}'", "country": random_words(1), "updated_at": "now()",
+                "status": "(ARRAY['planned', 'wip', 'completed', 'deferred', 'on-hold'])[1 + mod(i, 5)]",
+            }),
+        ]
+        task_sql, task_params = insert_sql(Task, counts["tasks"], {
+            **text,
+            "title": random_words(3), "updated_at": "now()",
+            "project": "projects.ids[1 + mod(i, array_length(projects.ids, 1))]",
+        })
+        task_sql = task_sql.replace(
+            "FROM generate_series",
+            f"FROM (SELECT array_agg(id) AS ids FROM {Project._meta.db_table} WHERE department = '{BENCH_TAG}') AS projects, "
+            "generate_series",
+        )
+        statements.append((task_sql, task_params))
+
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for sql, params in statements:
+                cursor.execute(sql, params)
+        with connection.cursor() as cursor:
+            for model in (Request, Project, Task):
+                # flush the GIN pending lists the bulk insert filled, as autovacuum would
+                cursor.execute(f"VACUUM ANALYZE {model._meta.db_table}")
+        self.stdout.write(
+            f"seeded {counts['requests']} requests, {counts['projects']} projects, {counts['tasks']} tasks "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def cleanup(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Task._meta.db_table} WHERE project_id IN "
+                f"(SELECT id FROM {Project._meta.db_table} WHERE department = %s)",
+                [BENCH_TAG],
+            )
+            cursor.execute(f"DELETE FROM {Project._meta.db_table} WHERE department = %s", [BENCH_TAG])
+            cursor.execute(f"DELETE FROM {Request._meta.db_table} WHERE department = %s", [BENCH_TAG])
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("search_bench needs PostgreSQL")
+        if not options["no_seed"]:
+            self.seed(options["rows"])
+        try:
+            failures = 0
+            for text in QUERIES:
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    result = search(text)
+                    timings.append((time.perf_counter() - started) * 1000)
+                p50 = statistics.median(timings)
+                p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+                ok = p95 <= options["target_ms"]
+                failures += not ok
+                self.stdout.write(
+                    f"{text!r:>28}: {result['count']:>7} matches  p50={p50:6.1f}ms  p95={p95:6.1f}ms  "
+                    + (self.style.SUCCESS("ok") if ok else self.style.ERROR(f"over {options['target_ms']:.0f}ms"))
+                )
+            summary = f"{len(QUERIES) - failures}/{len(QUERIES)} queries within {options['target_ms']:.0f}ms at p95"
+            self.stdout.write(self.style.SUCCESS(summary) if not failures else self.style.WARNING(summary))
+        finally:
+            if not options["keep"] and not options["no_seed"]:
+                self.cleanup()
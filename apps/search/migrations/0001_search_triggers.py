@@ -0,0 +1,90 @@
+from django.db import migrations
+
+# The trigger SQL is written out, not built by app code, so this migration keeps creating the
+# same triggers whatever the code does later. Each BEFORE INSERT OR UPDATE trigger rebuilds
+# search_vector from the weighted text columns (A ranks highest); existing rows are backfilled.
+
+REQUEST_REQUEST_SQL = """
+    CREATE OR REPLACE FUNCTION request_request_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.system, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.request_type, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS request_request_search_vector ON request_request;
+    CREATE TRIGGER request_request_search_vector
+        BEFORE INSERT OR UPDATE OF system, request_type, description, search_vector ON request_request
+        FOR EACH ROW EXECUTE FUNCTION request_request_search_vector();
+
+    UPDATE request_request SET search_vector =
+        setweight(to_tsvector('english', coalesce(system, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(request_type, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C');
+"""
+
+PROJECTS_PROJECT_SQL = """
+    CREATE OR REPLACE FUNCTION projects_project_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS projects_project_search_vector ON projects_project;
+    CREATE TRIGGER projects_project_search_vector
+        BEFORE INSERT OR UPDATE OF name, description, search_vector ON projects_project
+        FOR EACH ROW EXECUTE FUNCTION projects_project_search_vector();
+
+    UPDATE projects_project SET search_vector =
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B');
+"""
+
+PROJECTS_TASK_SQL = """
+    CREATE OR REPLACE FUNCTION projects_task_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS projects_task_search_vector ON projects_task;
+    CREATE TRIGGER projects_task_search_vector
+        BEFORE INSERT OR UPDATE OF title, description, search_vector ON projects_task
+        FOR EACH ROW EXECUTE FUNCTION projects_task_search_vector();
+
+    UPDATE projects_task SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B');
+"""
+
+
+def drop_sql(table):
+    return f"""
+        DROP TRIGGER IF EXISTS {table}_search_vector ON {table};
+        DROP FUNCTION IF EXISTS {table}_search_vector();
+    """
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('request', '0006_search_vector'),
+        ('projects', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REQUEST_REQUEST_SQL, drop_sql("request_request")),
+        migrations.RunSQL(PROJECTS_PROJECT_SQL, drop_sql("projects_project")),
+        migrations.RunSQL(PROJECTS_TASK_SQL, drop_sql("projects_task")),
+    ]
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from .engine import FACETS, SOURCES
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """
+        Query-string of a search: ?q= &type=requests,projects,tasks &limit= &offset=
+        plus exact facet filters (status, priority, department, market, sla_status).
+    """
+
+    q = serializers.CharField(max_length=200)
+    type = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=10000, default=0)
+    status = serializers.CharField(required=False)
+    priority = serializers.CharField(required=False)
+    department = serializers.CharField(required=False)
+    market = serializers.CharField(required=False)
+    sla_status = serializers.CharField(required=False)
+
+    def validate_type(self, value):
+        kinds = [kind.strip() for kind in value.split(",") if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in SOURCES]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown type(s) {', '.join(unknown)}, use {', '.join(SOURCES)}.")
+        return list(dict.fromkeys(kinds))
+
+    def search_kwargs(self):
+        data = self.validated_data
+        return {
+            "text": data["q"],
+            "kinds": data.get("type"),
+            "filters": {facet: data[facet] for facet in FACETS if facet in data},
+            "limit": data["limit"],
+            "offset": data["offset"],
+        }
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.projects.models import Project, Task
+from apps.request.models import Request
+
+from .engine import search
+
+
+def make_request(system, description="", **fields):
+    return Request.objects.create(
+        description=description or "Change request", request_type="change", system=system, department="Finance",
+        market="Nigeria", improvement_type="automation", **fields,
+    )
+
+
+class SearchTriggerTests(TestCase):
+    """The search_vector triggers follow every kind of write."""
+
+    def ids(self, text, kind):
+        return [hit["id"] for hit in search(text, kinds=[kind])["results"]]
+
+    def test_insert_and_queryset_update(self):
+        request = make_request("ERP", "Export the payroll")
+        self.assertEqual(self.ids("payroll", "requests"), [request.pk])
+
+        Request.objects.filter(pk=request.pk).update(description="Reconcile the invoices")
+        self.assertEqual(self.ids("payroll", "requests"), [])
+        self.assertEqual(self.ids("invoices", "requests"), [request.pk])
+
+    def test_bulk_writes(self):
+        project = Project.objects.create(name="Rollout")
+        tasks = Task.objects.bulk_create([
+            Task(project=project, title="Migrate ledgers"), Task(project=project, title="Train staff"),
+        ])
+        self.assertEqual(self.ids("ledger", "tasks"), [tasks[0].pk])
+
+        tasks[1].description = "Ledger walkthrough"
+        Task.objects.bulk_update([tasks[1]], ["description"])
+        self.assertEqual(sorted(self.ids("ledger", "tasks")), sorted(task.pk for task in tasks))
+
+
+class SearchEngineTests(TestCase):
+    """Ranking across types, paging of the merged ranking and exact facet counts."""
+
+    def setUp(self):
+        self.project = Project.objects.create(name="Payroll rollout", department="Finance", country="Kenya")
+        Task.objects.bulk_create([
+            Task(project=self.project, title=f"Payroll step {i}", status="completed" if i % 2 else "wip")
+            for i in range(6)
+        ])
+        self.in_system = make_request("Payroll", "Monthly export", status="wip")
+        self.in_description = make_request("ERP", "Export the payroll file")
+        make_request("ERP", "Unrelated change")
+
+    def test_title_weighs_more_than_description(self):
+        ids = [hit["id"] for hit in search("payroll", kinds=["requests"])["results"]]
+        self.assertEqual(ids, [self.in_system.pk, self.in_description.pk])
+
+    def test_pages_follow_the_merged_ranking(self):
+        everything = search("payroll", limit=100)["results"]
+        self.assertEqual(len(everything), 9)
+        self.assertEqual([hit["rank"] for hit in everything], sorted((hit["rank"] for hit in everything), reverse=True))
+
+        for offset in range(0, 9, 2):
+            page = search("payroll", limit=2, offset=offset)["results"]
+            self.assertEqual(page, everything[offset:offset + 2])
+
+    def test_facet_counts_are_exact(self):
+        result = search("payroll")
+
+        self.assertEqual(result["count"], 9)
+        self.assertEqual(result["facets"]["type"], {"tasks": 6, "requests": 2, "projects": 1})
+        self.assertEqual(result["facets"]["status"], {"wip": 4, "completed": 3, "planned": 1, "scoping": 1})
+        # tasks take their market from the project
+        self.assertEqual(result["facets"]["market"], {"Kenya": 7, "Nigeria": 2})
+
+        filtered = search("payroll", filters={"status": "completed"})
+        self.assertEqual((filtered["count"], filtered["facets"]["type"]), (3, {"tasks": 3}))
+
+    def test_endpoint_runs_two_queries(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(email="search@sunkinghub.local"))
+
+        with self.assertNumQueries(2):
+            response = client.get("/api/search/", {"q": "payroll", "type": "requests,projects", "limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        self.assertEqual(client.get("/api/search/", {"q": "payroll", "type": "users"}).status_code, 400)
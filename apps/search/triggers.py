@@ -0,0 +1,11 @@
+"""
+    Full-text search configuration shared by the queries (apps.search.engine) and the triggers
+    that keep ``search_vector`` up to date on requests, projects and tasks.
+
+    The BEFORE INSERT OR UPDATE triggers (migration search 0001, SQL written out) rebuild the
+    vector from the weighted text columns, so save(), bulk_create, bulk_update,
+    QuerySet.update() and raw SQL all keep it current with no extra query. Changing the
+    columns, weights or SEARCH_CONFIG takes a new migration with the new trigger SQL.
+"""
+
+SEARCH_CONFIG = "english"
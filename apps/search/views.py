@@ -0,0 +1,25 @@
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+
+from .engine import search
+from .serializers import SearchParamsSerializer
+
+# Create your views here.
+
+
+class SearchView(generics.GenericAPIView):
+    """
+        GET /api/search/?q=payroll export&type=requests,tasks&status=wip&limit=20&offset=0
+
+        Postgres full-text search over request description/system/request_type, project
+        name/description and task title/description. Returns the hits ranked across types and
+        facet counts (type, status, priority, department, market, sla_status) of the matches,
+        in two queries on the GIN-indexed search vectors.
+    """
+    serializer_class = SearchParamsSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(search(**params.search_kwargs()))
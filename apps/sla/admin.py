@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import BusinessCalendar, Holiday, SLAPolicy
+
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 1
+
+
+@admin.register(BusinessCalendar)
+class BusinessCalendarAdmin(admin.ModelAdmin):
+    list_display = ["name", "market", "timezone", "work_start", "work_end"]
+    search_fields = ["name", "market"]
+    inlines = [HolidayInline]
+
+
+@admin.register(SLAPolicy)
+class SLAPolicyAdmin(admin.ModelAdmin):
+    list_display = ["name", "request_type", "priority", "market", "duration_type", "target", "calendar", "is_active"]
+    list_filter = ["is_active", "market", "priority", "duration_type"]
+    search_fields = ["name", "request_type", "market"]
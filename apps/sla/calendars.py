@@ -0,0 +1,119 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+
+class WorkingTimeIndex:
+    """
+        Working intervals of a business calendar between two dates, with a running total of
+        working seconds, so "start + N working hours" and "working time between a and b" are
+        two binary searches instead of a walk over days.
+
+        ``starts``/``ends`` are the epoch seconds of each working interval, ``before[i]`` the
+        working seconds in all intervals before interval i and ``through[i]`` including it.
+    """
+
+    def __init__(self, tz, work_start, work_end, work_days, holidays, first_day: date, last_day: date):
+        self.first_day = first_day
+        self.last_day = last_day
+        zone = ZoneInfo(tz)
+        self.starts, self.ends, self.before, self.through = [], [], [], []
+        total = 0.0
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in work_days and day not in holidays:
+                start = datetime.combine(day, work_start, zone).timestamp()
+                end = datetime.combine(day, work_end, zone).timestamp()
+                if end > start:
+                    self.starts.append(start)
+                    self.ends.append(end)
+                    self.before.append(total)
+                    total += end - start
+                    self.through.append(total)
+            day += timedelta(days=1)
+
+    def covers(self, moment: datetime) -> bool:
+        return bool(self.starts) and self.starts[0] <= moment.timestamp() <= self.ends[-1]
+
+    def worked(self, moment: datetime) -> float:
+        """Working seconds from the start of the index up to ``moment``."""
+        t = moment.timestamp()
+        i = bisect_right(self.starts, t) - 1
+        if i < 0:
+            return 0.0
+        return self.before[i] + min(t, self.ends[i]) - self.starts[i]
+
+    def at(self, worked: float):
+        """The moment at which ``worked`` working seconds have elapsed, None past the index."""
+        if worked <= 0:
+            return None
+        j = bisect_left(self.through, worked)
+        if j >= len(self.starts):
+            return None
+        return self.starts[j] + (worked - self.before[j])
+
+    def next_working(self, t: float):
+        """``t`` if it is in working time, else the start of the next working interval."""
+        i = bisect_left(self.ends, t)
+        if i >= len(self.starts):
+            return None
+        return max(t, self.starts[i])
+
+    def add(self, start: datetime, duration: timedelta):
+        """``start`` plus ``duration`` of working time, None if it falls outside the index."""
+        if duration <= timedelta(0):
+            # nothing to count: the work can start no earlier than the next working moment
+            moment = self.next_working(start.timestamp())
+        else:
+            moment = self.at(self.worked(start) + duration.total_seconds())
+        return None if moment is None else datetime.fromtimestamp(moment, tz=start.tzinfo)
+
+    def subtract(self, end: datetime, duration: timedelta):
+        """``end`` minus ``duration`` of working time, None if it falls outside the index."""
+        moment = self.at(self.worked(end) - duration.total_seconds())
+        return None if moment is None else datetime.fromtimestamp(moment, tz=end.tzinfo)
+
+    def between(self, a: datetime, b: datetime) -> timedelta:
+        return timedelta(seconds=self.worked(b) - self.worked(a))
+
+
+class BusinessCalendarSpec:
+    """
+        Immutable copy of a BusinessCalendar with its holidays, holding a WorkingTimeIndex that
+        is built on first use and grown (rebuilt over a wider range) when a date falls outside it.
+    """
+
+    SPAN_BEFORE = timedelta(days=366)
+    SPAN_AFTER = timedelta(days=3 * 366)
+
+    def __init__(self, tz, work_start: time, work_end: time, work_days, holidays):
+        self.tz = tz
+        self.work_start = work_start
+        self.work_end = work_end
+        self.work_days = frozenset(work_days)
+        self.holidays = frozenset(holidays)
+        self._index = None
+
+    def index_for(self, *moments) -> WorkingTimeIndex:
+        index = self._index
+        if index is not None and all(index.covers(m) for m in moments):
+            return index
+        days = [m.date() for m in moments]
+        first = min(days) - self.SPAN_BEFORE
+        last = max(days) + self.SPAN_AFTER
+        if index is not None:
+            first, last = min(first, index.first_day), max(last, index.last_day)
+        self._index = index = WorkingTimeIndex(
+            self.tz, self.work_start, self.work_end, self.work_days, self.holidays, first, last
+        )
+        return index
+
+    def add(self, start: datetime, duration: timedelta) -> datetime:
+        due = self.index_for(start).add(start, duration)
+        if due is None:
+            # past the end of the index: grow it to cover the wall-clock bound and retry
+            due = self.index_for(start, start + duration * 7).add(start, duration)
+        return due
+
+    def subtract(self, end: datetime, duration: timedelta):
+        return self.index_for(end).subtract(end, duration)
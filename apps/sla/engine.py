@@ -0,0 +1,44 @@
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+# Fields the SLA engine writes; added to update_fields / bulk_update fields automatically
+SLA_FIELDS = ["sla_target", "sla_due", "sla_due_soon_at", "sla_status", "sla_breached", "sla_breached_at"]
+
+ON_TRACK, DUE_SOON, OVERDUE = "on_track", "due_soon", "overdue"
+
+
+class SLAState(NamedTuple):
+    status: str
+    breached: bool
+    breached_at: Optional[object]
+
+
+def due_soon_threshold() -> timedelta:
+    return settings.SLA_DUE_SOON_THRESHOLD
+
+
+def compute_due(start, target):
+    """Due datetime of an item started at ``start`` with an SLA of ``target``."""
+    if start is None or not target:
+        return None
+    return start + target
+
+
+def evaluate(due, breached, breached_at, now, threshold=None, due_soon_at=None) -> SLAState:
+    """
+        SLA state at ``now`` of an item due at ``due``. It is due soon from ``due_soon_at``
+        (precomputed, possibly in working time) or else ``threshold`` before the due time.
+        The breach time is kept from the first time the item is seen overdue.
+        sweeper.sweep_model applies the same rules in SQL.
+    """
+    if due is None:
+        return SLAState(ON_TRACK, False, None)
+    if due_soon_at is None:
+        due_soon_at = due - (due_soon_threshold() if threshold is None else threshold)
+    if due < now:
+        return SLAState(OVERDUE, True, breached_at if breached else now)
+    if now >= due_soon_at:
+        return SLAState(DUE_SOON, False, breached_at)
+    return SLAState(ON_TRACK, False, breached_at)
@@ -0,0 +1,49 @@
+from django.apps import apps
+
+from . import engine
+
+DUE_SOON, BREACHED, RECOVERED, COMPLETED = "due_soon", "breached", "recovered", "completed"
+
+
+def transition_kind(old_sla_status, new_sla_status):
+    """Event for an sla_status change, None when it is not worth one (e.g. due_soon -> on_track)."""
+    if new_sla_status == old_sla_status:
+        return None
+    if new_sla_status == engine.OVERDUE:
+        return BREACHED
+    if old_sla_status == engine.OVERDUE:
+        return RECOVERED
+    if new_sla_status == engine.DUE_SOON:
+        return DUE_SOON
+    return None
+
+
+def build_event(model, object_id, kind, title, sla_status, sla_due):
+    SLAEvent = apps.get_model("sla", "SLAEvent")
+    return SLAEvent(
+        kind=kind,
+        model=model._meta.label,
+        object_id=object_id,
+        title=(title or "")[:255],
+        sla_status=sla_status,
+        sla_due=sla_due,
+    )
+
+
+def events_for(obj, old_sla_status, old_status):
+    """Events for an item written by save()/bulk writes, given its state before the write."""
+    events = []
+    title = getattr(obj, obj.sla_title_field, "") if obj.sla_title_field else str(obj)
+    kind = transition_kind(old_sla_status, obj.sla_status)
+    if kind:
+        events.append(build_event(type(obj), obj.pk, kind, title, obj.sla_status, obj.sla_due))
+    closed = getattr(obj, "SLA_CLOSED_STATUSES", [])
+    if old_status is not None and old_status not in closed and getattr(obj, "status", None) in closed:
+        events.append(build_event(type(obj), obj.pk, COMPLETED, title, obj.sla_status, obj.sla_due))
+    return events
+
+
+def record(events):
+    """Write events with one INSERT (none when the list is empty)."""
+    if events:
+        apps.get_model("sla", "SLAEvent").objects.bulk_create(events)
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+
+from apps.projects.models import Project, Task
+from apps.request.models import Request
+from apps.sla.engine import SLA_FIELDS
+
+BENCH_TAG = "sla_bench"
+
+
+def legacy_save(obj):
+    """The old write path: save, evaluate the SLA, then save the SLA fields again."""
+    models.Model.save(obj)
+    obj.update_sla_status()
+    models.Model.save(obj, update_fields=SLA_FIELDS)
+
+
+class Command(BaseCommand):
+    """
+        Queries and time per create for SLA models: the old double save, the single-write
+        save() and SLAQuerySet.bulk_create.
+
+        python manage.py sla_bench --rows 500
+    """
+
+    help = "Benchmark queries per create of requests, projects and tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Rows created per model and path")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        project = Project.objects.create(name=BENCH_TAG)
+        builders = {
+            "Request": lambda i: Request(
+                description=BENCH_TAG, request_type="bench", system="bench", department="bench",
+                market="bench", improvement_type="bench", duration_type="short_term" if i % 2 else "long_term",
+            ),
+            "Project": lambda i: Project(name=BENCH_TAG, description=BENCH_TAG),
+            "Task": lambda i: Task(project=project, title=BENCH_TAG, description=BENCH_TAG),
+        }
+        try:
+            for name, build in builders.items():
+                for label in ("legacy save", "save", "bulk_create"):
+                    objs = [build(i) for i in range(rows)]
+                    model = type(objs[0])
+                    started = time.perf_counter()
+                    with CaptureQueriesContext(connection) as queries:
+                        if label == "bulk_create":
+                            model.objects.bulk_create(objs, batch_size=500)
+                        else:
+                            for obj in objs:
+                                legacy_save(obj) if label == "legacy save" else obj.save()
+                    elapsed = time.perf_counter() - started
+                    assert all(obj.sla_due or not obj.sla_target for obj in objs)
+                    self.stdout.write(
+                        f"{name:>8} {label:>12}: queries/create={len(queries) / rows:.2f} "
+                        f"time/create={elapsed / rows * 1000:.3f}ms"
+                    )
+        finally:
+            Request.objects.filter(description=BENCH_TAG).delete()
+            Project.objects.filter(name=BENCH_TAG).delete()
@@ -0,0 +1,34 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.sla.sweeper import sweep_sla
+
+
+class Command(BaseCommand):
+    """
+        Re-evaluate sla_status/sla_breached of all open requests, projects and tasks.
+
+        python manage.py sweep_sla                 # once (cron)
+        python manage.py sweep_sla --interval 60   # long-running
+    """
+
+    help = "Recompute SLA status of open requests, projects and tasks with set-based updates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=None, help="Sweep every N seconds until stopped")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if options["interval"]:
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        while True:
+            report = sweep_sla()
+            self.stdout.write(report.summary())
+            close_old_connections()
+            if not options["interval"] or stop.wait(options["interval"]):
+                break
@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-18 16:36
+
+import apps.sla.models
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('market', models.CharField(blank=True, db_index=True, help_text='Market/country this calendar applies to by default.', max_length=100)),
+                ('timezone', models.CharField(default='UTC', help_text='IANA zone, e.g. Africa/Lagos', max_length=64)),
+                ('work_start', models.TimeField(default=datetime.time(9, 0))),
+                ('work_end', models.TimeField(default=datetime.time(17, 0))),
+                ('work_days', models.JSONField(default=apps.sla.models.default_work_days, help_text='Weekdays worked, 0 = Monday')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SLAPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('request_type', models.CharField(blank=True, max_length=50)),
+                ('priority', models.CharField(blank=True, max_length=40)),
+                ('market', models.CharField(blank=True, max_length=100)),
+                ('duration_type', models.CharField(blank=True, max_length=10)),
+                ('target', models.DurationField(help_text='Time allowed, counted in working time when a calendar applies.')),
+                ('due_soon_threshold', models.DurationField(blank=True, help_text='Defaults to SLA_DUE_SOON_THRESHOLD.', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('calendar', models.ForeignKey(blank=True, help_text="Defaults to the calendar of the item's market, wall-clock time when there is none.", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='policies', to='sla.businesscalendar')),
+            ],
+            options={
+                'verbose_name': 'SLA policy',
+                'verbose_name_plural': 'SLA policies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='sla.businesscalendar')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='holiday',
+            constraint=models.UniqueConstraint(fields=('calendar', 'date'), name='sla_holiday_unique_day'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 16:38
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sla', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SLAEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('due_soon', 'Due soon'), ('breached', 'Breached'), ('recovered', 'Recovered'), ('completed', 'Completed')], max_length=20)),
+                ('model', models.CharField(help_text='App label and model, e.g. request.Request', max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('sla_status', models.CharField(max_length=12)),
+                ('sla_due', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'SLA event',
+                'verbose_name_plural': 'SLA events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='slaevent',
+            index=models.Index(fields=['model', 'object_id'], name='sla_slaeven_model_4042a8_idx'),
+        ),
+    ]
@@ -0,0 +1,175 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from . import engine, events
+
+
+class SLAQuerySet(models.QuerySet):
+    """
+        bulk_create/bulk_update that compute the SLA fields first, so bulk writes get the
+        same SLA as save() with no extra query.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.prepare_sla(now=now)
+        created = super().bulk_create(objs, *args, **kwargs)
+        if all(obj.pk is not None for obj in objs):
+            events.record([event for obj in objs for event in events.events_for(obj, None, None)])
+        for obj in objs:
+            obj.remember_sla_state()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        before = [obj.loaded_sla_state() for obj in objs]
+        for obj in objs:
+            obj.prepare_sla(now=now)
+        fields = list(dict.fromkeys([*fields, *engine.SLA_FIELDS]))
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        events.record([event for obj, old in zip(objs, before) for event in events.events_for(obj, *old)])
+        for obj in objs:
+            obj.remember_sla_state()
+        return updated
+
+
+class SLAMixin(models.Model):
+    '''
+    SLA used to track requests, projects and tasks. This provides all the SLA tools.
+
+    The SLA is computed in save() before the row is written (one query per save), and by
+    SLAQuerySet for bulk writes. ``sla_start_field`` names the creation timestamp, which
+    must have a default (not auto_now_add) so it is known before the first write.
+    '''
+    
+    class SLAStatus(models.TextChoices):
+        ON_TRACK = engine.ON_TRACK, _("On Track")
+        DUE_SOON = engine.DUE_SOON, _("Due Soon")
+        OVERDUE = engine.OVERDUE, _("Overdue")
+        
+    sla_target = models.DurationField(
+        null=True,
+        blank=True,
+        help_text="Duration a project, task, or request should be completed"
+    )
+    
+    sla_due = models.DateTimeField(
+        null=True, blank=True,
+        help_text=_("Computed due datetime = created_at + sla_target.")
+    )
+    
+    sla_due_soon_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text=_("When the item turns due soon (due threshold, in working time under a calendar).")
+    )
+    
+    sla_status = models.CharField(
+        max_length=12,
+        choices=SLAStatus.choices,
+        default=SLAStatus.ON_TRACK,
+        db_index=True,
+    )
+    
+    sla_breached = models.BooleanField(default=False)
+    
+    sla_breached_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text=_("When the SLA was first breached.")
+    )
+
+    objects = SLAQuerySet.as_manager()
+
+    sla_start_field = "created_at"
+    sla_title_field = None  # field shown in SLA events, str(obj) when unset
+
+    class Meta:
+        abstract = True
+
+    def get_sla_policy(self):
+        """
+        The SLA policy governing this item (an apps.sla.policies.ResolvedPolicy), or None
+        to use get_sla_target() in wall-clock time.
+        """
+        return None
+
+    def get_sla_target(self):
+        """SLA duration of this item; models can derive it from their own fields."""
+        return self.sla_target
+
+    def compute_sla_due(self):
+        """Compute the due date/time if sla_target exists."""
+        start = getattr(self, self.sla_start_field, None) or timezone.now()
+        return engine.compute_due(start, self.sla_target)
+
+    def update_sla_status(self, due_soon_threshold=None, now=None):
+        """
+        Evaluate SLA state (on_track / due_soon / overdue).
+        Returns True if fields were changed, False otherwise.
+        """
+        fields = engine.SLA_FIELDS
+        old = [getattr(self, field) for field in fields]
+
+        policy = self.get_sla_policy()
+        self.sla_target = policy.target if policy is not None else self.get_sla_target()
+        if self.sla_target and not self.sla_due:
+            if policy is not None:
+                self.sla_due = policy.due(getattr(self, self.sla_start_field, None) or timezone.now())
+            else:
+                self.sla_due = self.compute_sla_due()
+            self.sla_due_soon_at = None
+        if not self.sla_due:
+            self.sla_due_soon_at = None
+        elif due_soon_threshold is not None:
+            self.sla_due_soon_at = self.sla_due - due_soon_threshold
+        elif not self.sla_due_soon_at:
+            if policy is not None:
+                self.sla_due_soon_at = policy.due_soon_at(self.sla_due)
+            else:
+                self.sla_due_soon_at = self.sla_due - engine.due_soon_threshold()
+
+        state = engine.evaluate(
+            self.sla_due, self.sla_breached, self.sla_breached_at, now or timezone.now(),
+            due_soon_at=self.sla_due_soon_at,
+        )
+        self.sla_status, self.sla_breached, self.sla_breached_at = state
+
+        return old != [getattr(self, field) for field in fields]
+
+    def prepare_sla(self, now=None):
+        """Compute the SLA fields in memory before a write. Returns True if any changed."""
+        return self.update_sla_status(now=now)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_sla_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_sla_state()
+
+    def remember_sla_state(self):
+        """Keep the stored sla_status/status so the next write can tell what changed."""
+        self._sla_loaded = (self.__dict__.get("sla_status"), self.__dict__.get("status"))
+
+    def loaded_sla_state(self):
+        return getattr(self, "_sla_loaded", (None, None))
+
+    def save(self, *args, **kwargs):
+        """
+        Single write: the SLA fields are computed first and saved with the row.
+        State changes (due soon, breached, recovered, completed) are added to the SLA event log.
+        """
+        before = self.loaded_sla_state()
+        changed = self.prepare_sla()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and changed:
+            kwargs["update_fields"] = list(dict.fromkeys([*update_fields, *engine.SLA_FIELDS]))
+        super().save(*args, **kwargs)
+        events.record(events.events_for(self, *before))
+        self.remember_sla_state()
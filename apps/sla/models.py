@@ -0,0 +1,127 @@
+from datetime import time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+def default_work_days():
+    return [0, 1, 2, 3, 4]  # Monday to Friday
+
+
+class BusinessCalendar(models.Model):
+    """
+        Working hours and holidays of a market. SLA policies using a calendar count their
+        targets in working time only.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    market = models.CharField(
+        max_length=100, blank=True, db_index=True,
+        help_text=_("Market/country this calendar applies to by default."),
+    )
+    timezone = models.CharField(max_length=64, default="UTC", help_text=_("IANA zone, e.g. Africa/Lagos"))
+    work_start = models.TimeField(default=time(9))
+    work_end = models.TimeField(default=time(17))
+    work_days = models.JSONField(default=default_work_days, help_text=_("Weekdays worked, 0 = Monday"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+        try:
+            ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValidationError({"timezone": _("Unknown time zone.")})
+        if self.work_end <= self.work_start:
+            raise ValidationError({"work_end": _("Working hours must end after they start.")})
+        if not isinstance(self.work_days, list) or not all(d in range(7) for d in self.work_days):
+            raise ValidationError({"work_days": _("Use a list of weekday numbers from 0 (Monday) to 6.")})
+
+
+class Holiday(models.Model):
+    calendar = models.ForeignKey(BusinessCalendar, on_delete=models.CASCADE, related_name="holidays")
+    date = models.DateField()
+    name = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(fields=["calendar", "date"], name="sla_holiday_unique_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.name}"
+
+
+class SLAPolicy(models.Model):
+    """
+        SLA target for requests matching request_type, priority, market and duration_type.
+        Blank keys match anything; the policy matching the most keys wins.
+    """
+    name = models.CharField(max_length=100)
+    request_type = models.CharField(max_length=50, blank=True)
+    priority = models.CharField(max_length=40, blank=True)
+    market = models.CharField(max_length=100, blank=True)
+    duration_type = models.CharField(max_length=10, blank=True)
+
+    target = models.DurationField(help_text=_("Time allowed, counted in working time when a calendar applies."))
+    due_soon_threshold = models.DurationField(
+        null=True, blank=True, help_text=_("Defaults to SLA_DUE_SOON_THRESHOLD.")
+    )
+    calendar = models.ForeignKey(
+        BusinessCalendar, on_delete=models.SET_NULL, null=True, blank=True, related_name="policies",
+        help_text=_("Defaults to the calendar of the item's market, wall-clock time when there is none."),
+    )
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name = "SLA policy"
+        verbose_name_plural = "SLA policies"
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        # an item with no target has no SLA (SLAMixin), so a zero target would silently disable it
+        if self.target is not None and self.target <= timedelta(0):
+            raise ValidationError({"target": _("The target must be longer than zero.")})
+
+
+class SLAEvent(models.Model):
+    """
+        Append-only log of SLA state changes of requests, projects and tasks. The auto id is
+        the cursor clients resume from (``since`` / Last-Event-ID).
+    """
+    class Kind(models.TextChoices):
+        DUE_SOON = "due_soon", _("Due soon")
+        BREACHED = "breached", _("Breached")
+        RECOVERED = "recovered", _("Recovered")
+        COMPLETED = "completed", _("Completed")
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    model = models.CharField(max_length=50, help_text=_("App label and model, e.g. request.Request"))
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    sla_status = models.CharField(max_length=12)
+    sla_due = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "SLA event"
+        verbose_name_plural = "SLA events"
+        indexes = [
+            models.Index(fields=["model", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.model}:{self.object_id}"
@@ -0,0 +1,116 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .calendars import BusinessCalendarSpec
+
+VERSION_KEY = "sla:policies:version"
+
+POLICY_KEYS = ("request_type", "priority", "market", "duration_type")
+
+
+class ResolvedPolicy:
+    """A matched policy with its calendar, ready to compute due dates."""
+
+    def __init__(self, pk, name, target, threshold, calendar):
+        self.pk = pk
+        self.name = name
+        self.target = target
+        self.threshold = threshold
+        self.calendar = calendar  # BusinessCalendarSpec or None for wall-clock time
+
+    def due(self, start):
+        if self.calendar is None:
+            return start + self.target
+        return self.calendar.add(start, self.target)
+
+    def due_soon_at(self, due):
+        if self.calendar is None:
+            return due - self.threshold
+        return self.calendar.subtract(due, self.threshold) or due - self.threshold
+
+
+class PolicyRegistry:
+    """
+        In-process copy of the active SLA policies and business calendars.
+
+        Lookups are dictionary reads. Edits bump VERSION_KEY in the cache (see signals); each
+        process compares its loaded version at most every CHECK_INTERVAL seconds and reloads
+        when it changed. The editing process reloads right away.
+    """
+
+    CHECK_INTERVAL = 5.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Reload everywhere once the current transaction commits."""
+        def bump():
+            cache.set(VERSION_KEY, uuid.uuid4().hex[:12], timeout=None)
+            self._loaded = None
+        transaction.on_commit(bump)
+
+    def _state(self):
+        loaded = self._loaded
+        now = time.monotonic()
+        if loaded is not None and now - self._checked_at < self.CHECK_INTERVAL:
+            return loaded
+        version = cache.get(VERSION_KEY)
+        if loaded is None or loaded["version"] != version:
+            with self._lock:
+                if self._loaded is None or self._loaded["version"] != version:
+                    self._loaded = self.load(version)
+                loaded = self._loaded
+        self._checked_at = now
+        return loaded
+
+    def load(self, version):
+        from .models import BusinessCalendar, SLAPolicy
+
+        calendars, by_market = {}, {}
+        for calendar in BusinessCalendar.objects.prefetch_related("holidays"):
+            calendars[calendar.pk] = BusinessCalendarSpec(
+                calendar.timezone, calendar.work_start, calendar.work_end, calendar.work_days,
+                [holiday.date for holiday in calendar.holidays.all()],
+            )
+            if calendar.market:
+                by_market.setdefault(calendar.market.lower(), calendars[calendar.pk])
+
+        policies = []
+        for policy in SLAPolicy.objects.filter(is_active=True).order_by("pk"):
+            keys = {key: getattr(policy, key).strip().lower() for key in POLICY_KEYS if getattr(policy, key).strip()}
+            policies.append((keys, policy))
+        # most specific first, oldest first among equals
+        policies.sort(key=lambda item: -len(item[0]))
+        return {"version": version, "calendars": calendars, "by_market": by_market,
+                "policies": policies, "resolved": {}}
+
+    def resolve(self, request_type="", priority="", market="", duration_type=""):
+        """The best policy for these keys, or None."""
+        state = self._state()
+        lookup = tuple((value or "").strip().lower() for value in (request_type, priority, market, duration_type))
+        if lookup in state["resolved"]:
+            return state["resolved"][lookup]
+
+        values = dict(zip(POLICY_KEYS, lookup))
+        resolved = None
+        for keys, policy in state["policies"]:
+            if all(values[key] == value for key, value in keys.items()):
+                calendar = state["calendars"].get(policy.calendar_id) or state["by_market"].get(values["market"])
+                resolved = ResolvedPolicy(
+                    policy.pk, policy.name, policy.target,
+                    policy.due_soon_threshold or settings.SLA_DUE_SOON_THRESHOLD, calendar,
+                )
+                break
+        state["resolved"][lookup] = resolved
+        return resolved
+
+
+registry = PolicyRegistry()
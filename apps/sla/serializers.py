@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+from .models import SLAEvent
+
+
+class SLAEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SLAEvent
+        fields = ["id", "kind", "model", "object_id", "title", "sla_status", "sla_due", "created_at"]
+        read_only_fields = fields
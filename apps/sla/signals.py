@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import BusinessCalendar, Holiday, SLAPolicy
+from .policies import registry
+from .sweeper import scheduler
+
+
+@receiver(request_started)
+def start_sla_scheduler(sender, **kwargs):
+    """Start the in-process SLA sweeper with the first request, so management commands never run it."""
+    if settings.SLA_SWEEP_IN_PROCESS:
+        scheduler.start()
+    request_started.disconnect(start_sla_scheduler)
+
+
+@receiver(post_save, sender=SLAPolicy)
+@receiver(post_delete, sender=SLAPolicy)
+@receiver(post_save, sender=BusinessCalendar)
+@receiver(post_delete, sender=BusinessCalendar)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def policies_changed(sender, **kwargs):
+    """Reload the in-process SLA policies in every process."""
+    registry.invalidate()
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from . import events
+
+logger = logging.getLogger(__name__)
+
+# Models carrying the SLA mixin fields
+SLA_MODELS = ["request.Request", "projects.Project", "projects.Task"]
+
+SWEEP_LOCK_KEY = "sla:sweep:lock"
+
+
+def sla_models():
+    return [apps.get_model(label) for label in SLA_MODELS]
+
+
+class SweepReport:
+    """Rows moved to each SLA status, per model, by one sweep."""
+
+    def __init__(self):
+        self.transitions = {}
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(sum(counts.values()) for counts in self.transitions.values())
+
+    def summary(self) -> str:
+        parts = [
+            f"{model}: " + " ".join(f"{status}={count}" for status, count in counts.items())
+            for model, counts in self.transitions.items()
+        ]
+        return f"{self.total} rows transitioned in {self.elapsed * 1000:.0f}ms ({'; '.join(parts)})"
+
+
+def sweep_model(model, now, threshold) -> dict:
+    """
+        Bring sla_status/sla_breached/sla_breached_at of every open row of ``model`` in line
+        with its sla_due, with one locking SELECT and one UPDATE per target status. Each is a
+        range on the sla_due index and skips rows already in the target state, so a quiet
+        sweep writes nothing. Same rules as engine.evaluate; transitions go to the SLA event log.
+    """
+    SLA = model.SLAStatus
+    open_rows = model.objects.exclude(status__in=model.SLA_CLOSED_STATUSES)
+    soon = now + threshold
+    # rows saved before sla_due_soon_at existed fall back to the global threshold
+    is_due_soon = Q(sla_due_soon_at__lte=now) | Q(sla_due_soon_at__isnull=True, sla_due__lte=soon)
+    is_on_track = Q(sla_due_soon_at__gt=now) | Q(sla_due_soon_at__isnull=True, sla_due__gt=soon)
+
+    targets = [
+        (
+            SLA.OVERDUE,
+            open_rows.filter(sla_due__lt=now).exclude(sla_status=SLA.OVERDUE, sla_breached=True),
+            # breached_at is set once, when the breach is first seen
+            {"sla_breached": True,
+             "sla_breached_at": Case(When(sla_breached=True, then=F("sla_breached_at")), default=Value(now))},
+        ),
+        (
+            SLA.DUE_SOON,
+            open_rows.filter(is_due_soon, sla_due__gte=now).exclude(sla_status=SLA.DUE_SOON, sla_breached=False),
+            {"sla_breached": False},
+        ),
+        (
+            SLA.ON_TRACK,
+            open_rows.filter(is_on_track, sla_due__gte=now).exclude(sla_status=SLA.ON_TRACK, sla_breached=False),
+            {"sla_breached": False},
+        ),
+    ]
+
+    counts, log = {}, []
+    title_field = model.sla_title_field or "pk"
+    for status, rows, values in targets:
+        moving = list(rows.select_for_update().order_by().values_list("pk", "sla_status", title_field, "sla_due"))
+        if moving:
+            model.objects.filter(pk__in=[pk for pk, *_ in moving]).update(sla_status=status, **values)
+        for pk, old_status, title, due in moving:
+            kind = events.transition_kind(old_status, status.value)
+            if kind:
+                log.append(events.build_event(model, pk, kind, str(title), status.value, due))
+        counts[status.value] = len(moving)
+    events.record(log)
+    return counts
+
+
+def sweep_sla(now=None) -> SweepReport:
+    """Re-evaluate the SLA state of all open requests, projects and tasks."""
+    now = now or timezone.now()
+    report = SweepReport()
+    for model in sla_models():
+        with transaction.atomic():
+            report.transitions[model._meta.label] = sweep_model(model, now, settings.SLA_DUE_SOON_THRESHOLD)
+    report.elapsed = time.monotonic() - report.started
+    return report
+
+
+class SLAScheduler:
+    """
+        Runs sweep_sla every SLA_SWEEP_INTERVAL seconds in a daemon thread of the web process
+        (SLA_SWEEP_IN_PROCESS). A cache lock held for one interval keeps it to one sweep per
+        interval across all processes sharing the cache.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or settings.SLA_SWEEP_INTERVAL
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="sla-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            if not cache.add(SWEEP_LOCK_KEY, 1, timeout=max(1, int(self.interval) - 1)):
+                continue
+            try:
+                report = sweep_sla()
+                if report.total:
+                    logger.info("SLA sweep: %s", report.summary())
+            except Exception:
+                logger.exception("SLA sweep failed")
+            finally:
+                close_old_connections()
+
+
+scheduler = SLAScheduler()
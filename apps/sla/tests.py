@@ -0,0 +1,201 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.projects.models import Project
+from apps.request.models import Request
+
+from .calendars import BusinessCalendarSpec
+from .models import BusinessCalendar, Holiday, SLAEvent, SLAPolicy
+from .policies import registry
+from .sweeper import sweep_model
+
+THRESHOLD = timedelta(hours=24)
+
+LAGOS = ZoneInfo("Africa/Lagos")
+# Christmas week: Thursday 25 and Friday 26 are holidays, then the weekend
+CHRISTMAS = [date(2025, 12, 25), date(2025, 12, 26)]
+
+# a private cache, so tests may clear it without touching a shared one (REDIS_URL)
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "sla-tests"}}
+
+
+def reset_policies():
+    cache.clear()
+    registry._loaded = None
+
+
+class SweepModelTests(TestCase):
+    """sweep_model moves open rows to the SLA status their sla_due gives at ``now``."""
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def project(self, name, due, status=Project.Status.WIP, **fields):
+        project = Project.objects.create(name=name, status=status)
+        # set the SLA behind save()'s back, as time passing does
+        Project.objects.filter(pk=project.pk).update(**{"sla_due": due, "sla_due_soon_at": None, **fields})
+        return project
+
+    def sweep(self):
+        return sweep_model(Project, self.now, THRESHOLD)
+
+    def events(self):
+        return sorted(SLAEvent.objects.filter(model="projects.Project").values_list("title", "kind"))
+
+    def test_transitions_and_events(self):
+        late = self.project("late", self.now - timedelta(hours=1))
+        soon = self.project("soon", self.now + timedelta(hours=2))
+        self.project("far", self.now + timedelta(days=5))
+        self.project("done", self.now - timedelta(days=1), status=Project.Status.COMPLETED)
+
+        self.assertEqual(self.sweep(), {"overdue": 1, "due_soon": 1, "on_track": 0})
+
+        late.refresh_from_db()
+        self.assertEqual((late.sla_status, late.sla_breached, late.sla_breached_at), ("overdue", True, self.now))
+        soon.refresh_from_db()
+        self.assertEqual((soon.sla_status, soon.sla_breached), ("due_soon", False))
+        done = Project.objects.get(name="done")
+        self.assertEqual((done.sla_status, done.sla_breached), ("on_track", False))
+        self.assertEqual(self.events(), [("late", "breached"), ("soon", "due_soon")])
+
+    def test_quiet_sweep_writes_nothing(self):
+        self.project("late", self.now - timedelta(hours=1))
+        self.sweep()
+
+        with self.assertNumQueries(3):
+            self.assertEqual(self.sweep(), {"overdue": 0, "due_soon": 0, "on_track": 0})
+        self.assertEqual(SLAEvent.objects.count(), 1)
+
+    def test_breach_time_is_kept_and_recovery_logged(self):
+        first_seen = self.now - timedelta(hours=3)
+        late = self.project(
+            "late", self.now - timedelta(hours=4), sla_status="due_soon", sla_breached=True, sla_breached_at=first_seen,
+        )
+
+        self.assertEqual(self.sweep()["overdue"], 1)
+        late.refresh_from_db()
+        self.assertEqual((late.sla_status, late.sla_breached_at), ("overdue", first_seen))
+
+        # the due date moved out (e.g. the target was extended)
+        Project.objects.filter(pk=late.pk).update(sla_due=self.now + timedelta(days=5))
+        self.assertEqual(self.sweep(), {"overdue": 0, "due_soon": 0, "on_track": 1})
+
+        late.refresh_from_db()
+        self.assertEqual((late.sla_status, late.sla_breached), ("on_track", False))
+        self.assertEqual(self.events(), [("late", "breached"), ("late", "recovered")])
+
+    def test_due_soon_at_overrides_the_threshold(self):
+        # due in two days, but due soon already in working time (e.g. over a weekend)
+        project = self.project("weekend", self.now + timedelta(days=2), sla_due_soon_at=self.now - timedelta(hours=1))
+        self.project("global", self.now + timedelta(days=2))
+
+        self.assertEqual(self.sweep(), {"overdue": 0, "due_soon": 1, "on_track": 0})
+        project.refresh_from_db()
+        self.assertEqual(project.sla_status, "due_soon")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SingleWriteTests(TestCase):
+    """The SLA fields are computed before the first write, so a create is one INSERT."""
+
+    def setUp(self):
+        reset_policies()
+        self.addCleanup(reset_policies)
+        registry.resolve()  # load the (empty) policies once, as a warm process has them
+
+    def request(self, **fields):
+        return Request(
+            description="Export the payroll", request_type="report", system="ERP", department="Finance",
+            market="Nigeria", improvement_type="automation", **fields,
+        )
+
+    def test_request_create_is_one_query(self):
+        request = self.request(duration_type=Request.DurationType.LONG)
+        with self.assertNumQueries(1):
+            request.save()
+
+        stored = Request.objects.get(pk=request.pk)
+        self.assertEqual(stored.sla_target, timedelta(days=10))
+        self.assertEqual(stored.sla_due, stored.timestamp + timedelta(days=10))
+        self.assertEqual(stored.sla_due_soon_at, stored.sla_due - THRESHOLD)
+        self.assertEqual(stored.sla_status, "on_track")
+
+    def test_project_create_is_one_query(self):
+        with self.assertNumQueries(1):
+            project = Project.objects.create(name="Rollout", sla_target=timedelta(days=7))
+
+        stored = Project.objects.get(pk=project.pk)
+        self.assertEqual(stored.sla_due, stored.created_at + timedelta(days=7))
+        self.assertEqual(stored.sla_status, "on_track")
+
+    def test_bulk_create_computes_the_sla(self):
+        with self.assertNumQueries(1):
+            Request.objects.bulk_create([self.request(), self.request(duration_type=Request.DurationType.LONG)])
+
+        self.assertEqual(
+            sorted(Request.objects.values_list("sla_target", flat=True)), [timedelta(days=3), timedelta(days=10)],
+        )
+        self.assertFalse(Request.objects.filter(sla_due__isnull=True).exists())
+
+
+def lagos(day, hour, minute=0):
+    return datetime(2025, 12, day, hour, minute, tzinfo=LAGOS)
+
+
+class WorkingTimeTests(TestCase):
+    """Working-time arithmetic of a 9-17, Monday to Friday calendar over holidays and weekends."""
+
+    def setUp(self):
+        self.calendar = BusinessCalendarSpec("Africa/Lagos", time(9), time(17), range(5), CHRISTMAS)
+
+    def test_add_skips_holidays_and_the_weekend(self):
+        # two hours left on Wednesday 24, then nothing until Monday 29
+        self.assertEqual(self.calendar.add(lagos(24, 15), timedelta(hours=4)), lagos(29, 11))
+        self.assertEqual(self.calendar.add(lagos(24, 15), timedelta(hours=2)), lagos(24, 17))
+        # started out of hours, the clock starts on the next working day
+        self.assertEqual(self.calendar.add(lagos(27, 12), timedelta(hours=1)), lagos(29, 10))
+
+    def test_subtract_and_between_are_the_inverse(self):
+        index = self.calendar.index_for(lagos(24, 15))
+        self.assertEqual(self.calendar.subtract(lagos(29, 11), timedelta(hours=4)), lagos(24, 15))
+        self.assertEqual(index.between(lagos(24, 15), lagos(29, 11)), timedelta(hours=4))
+        self.assertEqual(index.between(lagos(25, 9), lagos(28, 23)), timedelta(0))
+
+    def test_zero_duration_snaps_to_the_next_working_moment(self):
+        self.assertEqual(self.calendar.add(lagos(24, 10), timedelta(0)), lagos(24, 10))
+        self.assertEqual(self.calendar.add(lagos(24, 18), timedelta(0)), lagos(29, 9))
+        self.assertEqual(self.calendar.add(lagos(27, 12), timedelta(0)), lagos(29, 9))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SLAPolicyTests(TestCase):
+    """Requests take their target and calendar from the matching SLAPolicy."""
+
+    def setUp(self):
+        reset_policies()
+        self.addCleanup(reset_policies)
+
+    def test_due_date_counts_working_time_of_the_market_calendar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            calendar = BusinessCalendar.objects.create(name="Nigeria", market="Nigeria", timezone="Africa/Lagos")
+            Holiday.objects.bulk_create([Holiday(calendar=calendar, date=day) for day in CHRISTMAS])
+            SLAPolicy.objects.create(name="Reports", request_type="report", target=timedelta(hours=8))
+
+        request = Request.objects.create(
+            description="Export the payroll", request_type="report", system="ERP", department="Finance",
+            market="Nigeria", improvement_type="automation", timestamp=lagos(24, 15),
+        )
+
+        self.assertEqual(request.sla_target, timedelta(hours=8))
+        self.assertEqual(request.sla_due, lagos(29, 15))
+
+    def test_zero_target_is_refused(self):
+        policy = SLAPolicy(name="Instant", target=timedelta(0))
+        with self.assertRaises(ValidationError) as raised:
+            policy.full_clean()
+        self.assertIn("target", raised.exception.message_dict)
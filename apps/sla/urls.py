@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import SLAEventListView, sla_event_stream
+
+urlpatterns = [
+    path("sla/events/", SLAEventListView.as_view(), name="sla-events"),
+    path("sla/events/stream/", sla_event_stream, name="sla-event-stream"),
+]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import generics, permissions, serializers
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .models import SLAEvent
+from .serializers import SLAEventSerializer
+
+# Create your views here.
+
+EVENT_BATCH = 500
+
+
+class SLAEventListView(generics.GenericAPIView):
+    """
+        GET /api/sla/events/?since=<event id>
+        Events after the cursor, oldest first (at most 500), and the cursor to send next time.
+        Without ``since`` the latest events are returned. Fallback for clients that cannot
+        keep the event stream open.
+    """
+    serializer_class = SLAEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        since = parse_cursor(request.query_params.get("since"))
+        if since is None:
+            events = list(SLAEvent.objects.order_by("-id")[:EVENT_BATCH])[::-1]
+        else:
+            events = list(SLAEvent.objects.filter(id__gt=since).order_by("id")[:EVENT_BATCH])
+        cursor = events[-1].id if events else (since or 0)
+        return Response({"since": cursor, "results": self.get_serializer(events, many=True).data})
+
+
+def parse_cursor(value):
+    if value in (None, ""):
+        return None
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({"since": "Must be an event id."})
+
+
+def authenticate(request):
+    """The JWT user of a plain Django request, None when missing or invalid."""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def sla_event_stream(request):
+    """
+        GET /api/sla/events/stream/  (text/event-stream, needs the ASGI server)
+
+        Pushes SLA events as Server-Sent Events: ``id`` is the event id, ``event`` its kind
+        and ``data`` the JSON event. A reconnecting EventSource sends Last-Event-ID and resumes
+        after it; ``?since=`` does the same for a first connection. Otherwise only new events
+        are sent. The stream closes after SLA_EVENTS_STREAM_TIMEOUT and the client reconnects.
+    """
+    user = await sync_to_async(authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    try:
+        cursor = parse_cursor(request.headers.get("Last-Event-ID") or request.GET.get("since"))
+    except serializers.ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+    if cursor is None:
+        latest = await SLAEvent.objects.order_by("-id").values_list("id", flat=True).afirst()
+        cursor = latest or 0
+
+    response = StreamingHttpResponse(event_stream(cursor), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # no proxy buffering (nginx)
+    return response
+
+
+async def event_stream(cursor):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    deadline = time.monotonic() + settings.SLA_EVENTS_STREAM_TIMEOUT
+    last_write = time.monotonic()
+    yield f"retry: {int(settings.SLA_EVENTS_POLL_INTERVAL * 1000)}\n\n"
+
+    while time.monotonic() < deadline:
+        batch = [
+            event async for event in
+            SLAEvent.objects.filter(id__gt=cursor).order_by("id")[:EVENT_BATCH]
+        ]
+        if batch:
+            chunk = []
+            for event in batch:
+                data = encoder.encode(SLAEventSerializer(event).data)
+                chunk.append(f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n")
+                cursor = event.id
+            yield "".join(chunk)
+            last_write = time.monotonic()
+            if len(batch) == EVENT_BATCH:
+                continue
+        elif time.monotonic() - last_write >= settings.SLA_EVENTS_KEEPALIVE:
+            yield ": keepalive\n\n"
+            last_write = time.monotonic()
+        await asyncio.sleep(settings.SLA_EVENTS_POLL_INTERVAL)
@@ -0,0 +1,140 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+REVOKED_JTI_KEY = "users:revoked-jti:{}"
+
+# revoked jtis this process has seen, {jti: exp}: a replayed token is turned away without the cache
+LOCAL_MAX_ENTRIES = 10000
+_local_revoked = {}
+_local_lock = threading.Lock()
+
+
+def _remember(jti, exp):
+    with _local_lock:
+        if len(_local_revoked) >= LOCAL_MAX_ENTRIES:
+            now = time.time()
+            for key in [key for key, until in _local_revoked.items() if until < now]:
+                del _local_revoked[key]
+            if len(_local_revoked) >= LOCAL_MAX_ENTRIES:
+                _local_revoked.clear()
+        _local_revoked[jti] = exp
+
+
+def rotation_consumes_tokens() -> bool:
+    """With rotation and BLACKLIST_AFTER_ROTATION a refresh revokes its token, and a reuse fails in blacklist()."""
+    return jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION
+
+
+def _revoked_before(user_id) -> float:
+    """
+        Timestamp before which the user's refresh tokens are revoked (0 for none). Always from
+        the database (one query on the user_id index): a cached cut-off would not reach the
+        other workers of a per-process cache, which could keep refreshing a deactivated user.
+    """
+    latest = (
+        RevokedToken.objects.filter(user_id=user_id, jti__isnull=True, expires_at__gt=timezone.now())
+        .aggregate(latest=Max("revoked_at"))["latest"]
+    )
+    return latest.timestamp() if latest else 0
+
+
+def is_revoked(payload) -> bool:
+    """
+        Whether the refresh token with these claims is revoked: its jti by this process's
+        memory, the cache, then the database; its user's cut-off by the database. Under
+        rotation the jti lookup in the database is left to blacklist(), which must insert the
+        jti anyway (a cache miss there only costs the INSERT that fails).
+    """
+    jti = payload[jwt_settings.JTI_CLAIM]
+    if jti in _local_revoked:
+        return True
+    if cache.get(REVOKED_JTI_KEY.format(jti)):
+        _remember(jti, payload["exp"])
+        return True
+
+    user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+    if user_id is not None and payload.get("iat", 0) < _revoked_before(user_id):
+        return True
+
+    if rotation_consumes_tokens():
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke_token(payload) -> bool:
+    """
+        Revoke one refresh token until it expires: a single INSERT, False if its jti was
+        revoked already (the token was replayed, or two refreshes raced with it).
+    """
+    jti, exp = payload[jwt_settings.JTI_CLAIM], payload["exp"]
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti=jti, user_id=payload.get(jwt_settings.USER_ID_CLAIM), expires_at=datetime_from_epoch(exp),
+            )
+    except IntegrityError:
+        return False
+
+    def remember():
+        cache.set(REVOKED_JTI_KEY.format(jti), True, timeout=max(1, int(exp - time.time())))
+        _remember(jti, exp)
+
+    transaction.on_commit(remember)
+    return True
+
+
+def revoke_user_tokens(user_ids) -> int:
+    """
+        Revoke every refresh token issued so far to these users (e.g. on deactivation), with
+        one row per user rather than one per token, seen by every worker on their next refresh
+        (is_revoked reads the cut-off from the database). Returns the number of users.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return 0
+    now = timezone.now()
+    expires_at = now + jwt_settings.REFRESH_TOKEN_LIFETIME
+    RevokedToken.objects.bulk_create([RevokedToken(user_id=pk, revoked_at=now, expires_at=expires_at) for pk in user_ids])
+    return len(user_ids)
+
+
+def prune_revoked_tokens(batch_size=5000, now=None) -> int:
+    """
+        Delete the rows of tokens that have expired (they fail verification on their own),
+        ``batch_size`` rows per statement so no long lock is held. Returns the rows deleted.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        ids = list(RevokedToken.objects.filter(expires_at__lte=now).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+
+
+class RevocableTokenMixin:
+    """
+        Refresh token checked against the revoked tokens on verification, and revoked by
+        blacklist() when TokenRefreshSerializer rotates it. Like simplejwt's BlacklistMixin,
+        without its outstanding-token table: only revoked tokens are stored, and only until
+        they expire (prune_revoked_tokens). Access tokens are not checked, they stay stateless.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if is_revoked(self.payload):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        if not revoke_token(self.payload):
+            raise TokenError("Token is blacklisted")
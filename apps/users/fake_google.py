@@ -0,0 +1,141 @@
+import datetime
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+
+
+def signing_key():
+    """A fresh RSA key: (key id, private key PEM, self-signed x509 certificate PEM)."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-google")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ).decode()
+    return uuid.uuid4().hex, private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class FakeGoogleCertServer:
+    """
+        Local stand-in for Google's ID token certs endpoint (``/oauth2/v1/certs``), used by
+        benchmarks and manual testing, and the issuer of ID tokens signed with its keys.
+
+        Answers GET with ``{key id: x509 PEM}`` and ``Cache-Control: max-age=<max_age>``
+        after an artificial ``latency`` (seconds), over keep-alive HTTP/1.1. ``rotate()``
+        adds a new signing key the way Google does; ``calls`` counts the cert fetches.
+
+        Usage:
+            with FakeGoogleCertServer(latency=0.05) as google:
+                certs = GoogleCertCache(url=google.certs_url)
+                claims = certs.verify(google.id_token("someone@example.com", audience="client-id"))
+    """
+
+    def __init__(self, latency=0.0, max_age=3600, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.max_age = max_age
+        self.keys = {}
+        self.key_id = None
+        self.rotate()
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def certs_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/oauth2/v1/certs"
+
+    def rotate(self) -> str:
+        """Sign new tokens with a new key; the old ones stay published."""
+        key_id, private_pem, cert_pem = signing_key()
+        self.keys[key_id] = (private_pem, cert_pem)
+        self.key_id = key_id
+        return key_id
+
+    def certs(self) -> dict:
+        return {key_id: cert_pem for key_id, (_, cert_pem) in self.keys.items()}
+
+    def id_token(self, email, audience, lifetime=3600, **claims) -> str:
+        """A Google-style ID token for ``email``, signed with the current key."""
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": audience,
+            "sub": str(uuid.uuid5(uuid.NAMESPACE_DNS, email).int)[:21],
+            "email": email,
+            "email_verified": True,
+            "iat": now,
+            "exp": now + lifetime,
+            **claims,
+        }
+        signer = crypt.RSASigner.from_string(self.keys[self.key_id][0], key_id=self.key_id)
+        return google_jwt.encode(signer, payload).decode()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment, avoids delayed-ACK stalls on keep-alive
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.calls += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if self.path.rstrip("/") != "/oauth2/v1/certs":
+                    status, body = 404, {"error": "not found"}
+                else:
+                    status, body = 200, server.certs()
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={server.max_age}, must-revalidate, no-transform")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from apps.request.filters import comma_list
+from apps.roles.snapshot import role_map
+
+User = get_user_model()
+
+
+class UserDirectoryFilterParamsSerializer(serializers.Serializer):
+    """
+        Query-string filters of the admin user directory, combined with AND:
+        ?role=Admin,Finance (any of them) &is_active=true
+        (?search= on email and names is DRF's SearchFilter.)
+    """
+
+    role = serializers.CharField(required=False)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+    def validate_role(self, value):
+        """Role names, checked against the cached role map (one query, its generation)."""
+        names = comma_list(value)
+        known = sorted(name for name, _ in role_map()["roles"].values())
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown role(s) {', '.join(unknown)}, use {', '.join(known)}.")
+        return names
+
+    def filter(self, queryset):
+        data = self.validated_data
+        if data.get("role"):
+            # EXISTS rather than a join, so the roles aggregated for the page are not narrowed too
+            queryset = queryset.filter(Exists(
+                User.groups.through.objects.filter(user_id=OuterRef("pk"), group__name__in=data["role"])
+            ))
+        if data.get("is_active") is not None:
+            queryset = queryset.filter(is_active=data["is_active"])
+        return queryset
+
+
+class UserDirectoryFilterBackend(BaseFilterBackend):
+    """Applies UserDirectoryFilterParamsSerializer; an invalid filter is a 400."""
+
+    def filter_queryset(self, request, queryset, view):
+        params = UserDirectoryFilterParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.filter(queryset)
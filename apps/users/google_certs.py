@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from google.auth import jwt as google_jwt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "google:certs:v1:{}"
+REFRESH_LOCK_KEY = "google:certs:refresh-lock:{}"
+ROTATION_LOCK_KEY = "google:certs:rotation-lock:{}"
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleCertsUnavailable(Exception):
+    """Raised when there are no cached certs and Google could not be reached."""
+
+
+def max_age(cache_control, default) -> int:
+    """Seconds from a Cache-Control header's max-age, ``default`` without one."""
+    match = MAX_AGE.search(cache_control or "")
+    return int(match.group(1)) if match else default
+
+
+class GoogleCertCache:
+    """
+        Google's ID token signing certs ({key id: x509 PEM}), cached with Django's cache
+        framework for as long as the response's Cache-Control max-age allows
+        (GOOGLE_CERTS_TTL when it has none), and tokens verified locally against them.
+
+        Like the Paga bank directory, an expired entry is served stale while one background
+        thread refreshes it, so only a cold cache waits on Google. A token signed with a key
+        the cached set does not know yet (Google rotated its keys) refreshes the certs once,
+        at most every GOOGLE_CERTS_REFRESH_LOCK seconds. Fetches share one pooled keep-alive
+        session, and each process keeps the entry in memory for LOCAL_TTL seconds.
+    """
+
+    LOCAL_TTL = 60
+
+    def __init__(self, url=None, timeout=None):
+        self._url = url
+        self._timeout = timeout
+        self._local = None
+        self._local_until = 0.0
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return self._url or settings.GOOGLE_CERTS_URL
+
+    def key(self, template) -> str:
+        return template.format(hashlib.md5(self.url.encode()).hexdigest()[:12])
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=4,
+                        # a GET of public certs is safe to replay
+                        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def get(self) -> dict:
+        """
+            Return the cached entry: {"certs", "fetched_at", "expires_at"}.
+        """
+        if self._local is not None and time.monotonic() < self._local_until:
+            entry = self._local
+        else:
+            entry = cache.get(self.key(CACHE_KEY))
+            if entry is None:
+                return self.refresh()
+            self._remember(entry)
+        if time.time() > entry["expires_at"]:
+            self.refresh_in_background()
+        return entry
+
+    def certs(self) -> dict:
+        return self.get()["certs"]
+
+    def refresh(self) -> dict:
+        """
+            Fetch the certs from Google and store them, raises GoogleCertsUnavailable on failure.
+        """
+        try:
+            res = self.session.get(self.url, timeout=self._timeout or settings.GOOGLE_CERTS_TIMEOUT)
+        except requests.RequestException as e:
+            raise GoogleCertsUnavailable(f"Google certs request failed {e}") from e
+        if res.status_code != 200:
+            raise GoogleCertsUnavailable(f"Google certs request returned {res.status_code}")
+        try:
+            certs = res.json()
+        except ValueError as e:
+            raise GoogleCertsUnavailable("Google certs response is not JSON") from e
+
+        now = time.time()
+        entry = {
+            "certs": certs,
+            "fetched_at": now,
+            "expires_at": now + max_age(res.headers.get("Cache-Control"), settings.GOOGLE_CERTS_TTL),
+        }
+        cache.set(self.key(CACHE_KEY), entry, timeout=None)
+        return self._remember(entry)
+
+    def _remember(self, entry) -> dict:
+        self._local = entry
+        self._local_until = time.monotonic() + self.LOCAL_TTL
+        return entry
+
+    def forget(self):
+        """Drop the cached certs (this process and the shared cache)."""
+        self._local = None
+        cache.delete(self.key(CACHE_KEY))
+
+    def refresh_in_background(self):
+        """
+            Refresh in a daemon thread. The cache lock keeps it to one refresh at a time
+            across workers, and is left to expire after a failure so Google is not hammered.
+        """
+        if not cache.add(self.key(REFRESH_LOCK_KEY), 1, timeout=settings.GOOGLE_CERTS_REFRESH_LOCK):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except GoogleCertsUnavailable as e:
+                logger.warning("Google certs refresh failed, serving stale certs: %s", e)
+            else:
+                cache.delete(self.key(REFRESH_LOCK_KEY))
+
+        threading.Thread(target=run, name="google-certs-refresh", daemon=True).start()
+
+    def certs_for(self, key_id) -> dict:
+        """The cached certs, refreshed first if they do not hold ``key_id`` (at most once per lock period)."""
+        entry = self.get()
+        if key_id in entry["certs"]:
+            return entry["certs"]
+        # another worker may have fetched the new keys already
+        shared = cache.get(self.key(CACHE_KEY))
+        if shared is not None and key_id in shared["certs"]:
+            return self._remember(shared)["certs"]
+        if cache.add(self.key(ROTATION_LOCK_KEY), 1, timeout=settings.GOOGLE_CERTS_REFRESH_LOCK):
+            entry = self.refresh()
+        return entry["certs"]
+
+    def verify(self, token, audience=None) -> dict:
+        """
+            The claims of ``token`` once its signature, iat and exp are checked against the
+            cached certs (no network call on a warm cache). Raises ValueError for an invalid
+            token and GoogleCertsUnavailable when the certs cannot be loaded.
+        """
+        header = google_jwt.decode_header(token)
+        certs = self.certs_for(header.get("kid"))
+        return google_jwt.decode(token, certs=certs, audience=audience)
+
+
+google_certs = GoogleCertCache()
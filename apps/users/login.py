@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from apps.roles.defaults import default_role_id
+
+# Storing Google link with allauth
+try:
+    from allauth.socialaccount.models import SocialAccount
+    HAS_ALLAUTH_SOCIAL = True
+except Exception:
+    HAS_ALLAUTH_SOCIAL = False
+
+User = get_user_model()
+
+# Google account ids already linked to a user, so a returning login skips the link write
+GOOGLE_LINK_KEY = "users:google-link:{}"
+GOOGLE_LINK_TTL = 24 * 60 * 60
+
+# queries of a returning user's full login (POST /api/auth/google/verify) once the caches are warm
+RETURNING_LOGIN_QUERIES = 1
+
+
+def google_user(email, first_name="", last_name=""):
+    """
+        The local user of a verified Google email, created with the default role on the first
+        login. Returns (user, created).
+
+        A returning user costs one query (one more if a blank name is filled in). A new user
+        is created with its role in one short transaction; if a concurrent first login won
+        the race, its user is returned instead.
+    """
+    try:
+        user = User.objects.get(email=email)
+    except User.DoesNotExist:
+        role_id = default_role_id()
+        try:
+            with transaction.atomic():
+                user = User.objects.create(email=email, first_name=first_name, last_name=last_name, is_active=True)
+                user.groups.add(role_id)
+        except IntegrityError:
+            user = User.objects.get(email=email)
+        else:
+            return user, True
+
+    # Optional: update names if blank
+    changed = []
+    if first_name and not user.first_name:
+        user.first_name = first_name
+        changed.append("first_name")
+    if last_name and not user.last_name:
+        user.last_name = last_name
+        changed.append("last_name")
+    if changed:
+        user.save(update_fields=changed)
+    return user, False
+
+
+def link_google_account(user, google_sub, email):
+    """
+        Record the Google link in allauth's SocialAccount (audits, no duplicate links) with
+        one INSERT ... ON CONFLICT DO NOTHING, skipped while the link is remembered in the cache.
+        An account id already linked to another user keeps its link.
+    """
+    if not HAS_ALLAUTH_SOCIAL or not google_sub:
+        return
+    key = GOOGLE_LINK_KEY.format(google_sub)
+    if cache.get(key) == user.pk:
+        return
+    SocialAccount.objects.bulk_create(
+        [SocialAccount(user=user, provider="google", uid=str(google_sub), extra_data={"email": email})],
+        ignore_conflicts=True,
+    )
+    cache.set(key, user.pk, timeout=GOOGLE_LINK_TTL)
@@ -0,0 +1,104 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token as google_id_token
+from rest_framework.test import APIRequestFactory
+
+from apps.paga_payments.management.commands.paga_bench import percentile
+from apps.users.fake_google import FakeGoogleCertServer
+from apps.users.google_certs import google_certs
+from apps.users.login import RETURNING_LOGIN_QUERIES
+from apps.users.serializers import GoogleIDTokenSerializer
+from apps.users.views import GoogleVerifyView
+
+BENCH_CLIENT_ID = "google-login-bench.apps.googleusercontent.com"
+
+
+class Command(BaseCommand):
+    """
+        Google ID token verification latency per login, against a local fake certs endpoint
+        answering after --latency-ms (Google's round trip):
+
+        uncached  the previous path: a new transport and a certs fetch on every login
+        cold      GoogleIDTokenSerializer with the cert cache emptied before every login
+        warm      GoogleIDTokenSerializer with the certs cached
+
+        then full logins through GoogleVerifyView: the first login of --users bench users, and
+        their returning logins, which fail the command if they take more than
+        RETURNING_LOGIN_QUERIES queries. The bench users are deleted at the end.
+
+        python manage.py google_login_bench --logins 200 --latency-ms 50 --users 20
+    """
+
+    help = "Benchmark Google ID token verification with cold and warm cert caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200, help="Logins per scenario")
+        parser.add_argument("--latency-ms", type=float, default=50.0, help="Artificial certs endpoint latency")
+        parser.add_argument("--users", type=int, default=20, help="Bench users for the full login runs")
+
+    def handle(self, *args, logins, latency_ms, users, **options):
+        with FakeGoogleCertServer(latency=latency_ms / 1000) as google, override_settings(
+            GOOGLE_CLIENT_ID=BENCH_CLIENT_ID, GOOGLE_CERTS_URL=google.certs_url,
+        ):
+            tokens = [google.id_token(f"bench{i}@sunkinghub.local", audience=BENCH_CLIENT_ID) for i in range(logins)]
+
+            def uncached(token):
+                google_id_token.verify_token(token, google_requests.Request(), certs_url=google.certs_url)
+
+            def cold(token):
+                google_certs.forget()
+                self.login(token)
+
+            google_certs.forget()
+            for name, login in (("uncached", uncached), ("cold", cold), ("warm", self.login)):
+                calls_before = google.calls
+                samples = []
+                for token in tokens:
+                    started = time.perf_counter()
+                    login(token)
+                    samples.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"{name:>9}: p50={percentile(samples, 50) * 1000:.2f}ms "
+                    f"p95={percentile(samples, 95) * 1000:.2f}ms "
+                    f"certs fetches={google.calls - calls_before}"
+                )
+
+            emails = [f"google-bench{i}@sunkinghub.local" for i in range(users)]
+            try:
+                self.bench_logins(google, emails)
+            finally:
+                get_user_model().objects.filter(email__in=emails).delete()
+                google_certs.forget()
+
+    def bench_logins(self, google, emails):
+        view = GoogleVerifyView.as_view()
+        factory = APIRequestFactory()
+        for name in ("first", "returning"):
+            samples, queries = [], []
+            for email in emails:
+                request = factory.post("/api/auth/google/verify", {"id_token": google.id_token(email, audience=BENCH_CLIENT_ID)}, format="json")
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as captured:
+                    response = view(request)
+                samples.append(time.perf_counter() - started)
+                queries.append(len(captured))
+                if response.status_code != 200:
+                    raise CommandError(f"{name} login of {email} failed: {response.status_code} {response.data}")
+            self.stdout.write(
+                f"{name + ' login':>15}: p50={percentile(samples, 50) * 1000:.2f}ms "
+                f"p95={percentile(samples, 95) * 1000:.2f}ms queries={min(queries)}-{max(queries)}"
+            )
+        if max(queries) > RETURNING_LOGIN_QUERIES:
+            raise CommandError(f"A returning login took {max(queries)} queries, expected {RETURNING_LOGIN_QUERIES}")
+
+    @staticmethod
+    def login(token):
+        ser = GoogleIDTokenSerializer(data={"id_token": token})
+        if not ser.is_valid():
+            raise AssertionError(ser.errors)
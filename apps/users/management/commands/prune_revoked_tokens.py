@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.blacklist import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    """
+        Delete the revoked refresh tokens that have expired since, in batches (cron, daily).
+
+        python manage.py prune_revoked_tokens --batch-size 5000
+    """
+
+    help = "Delete expired rows of the revoked refresh token table in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows deleted per statement")
+
+    def handle(self, *args, batch_size, **options):
+        deleted = prune_revoked_tokens(batch_size=batch_size)
+        self.stdout.write(f"Deleted {deleted} expired revoked token(s).")
@@ -0,0 +1,92 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.paga_payments.management.commands.paga_bench import percentile
+from apps.roles.tokens import RoleClaimsRefreshToken
+from apps.users.blacklist import prune_revoked_tokens, revoke_user_tokens
+from apps.users.models import RevokedToken
+from apps.users.views import TokenRefreshView
+
+
+class Command(BaseCommand):
+    """
+        Refresh throughput and revoked-token table size over time, through TokenRefreshView
+        with rotation: every round each of --users bench users refreshes once with the token
+        of the previous round. Then checks that a replayed token and the tokens of deactivated
+        users (revoke_user_tokens on half of them) are refused, and prunes the table as it
+        would be once all the tokens have expired. The bench users are deleted at the end.
+
+        python manage.py token_refresh_bench --users 200 --rounds 5
+    """
+
+    help = "Benchmark token refresh with the revoked refresh token table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Bench users")
+        parser.add_argument("--rounds", type=int, default=5, help="Refreshes per user")
+
+    def handle(self, *args, users, rounds, **options):
+        User = get_user_model()
+        emails = [f"refresh-bench{i}@sunkinghub.local" for i in range(users)]
+        User.objects.filter(email__in=emails).delete()
+        bench_users = User.objects.bulk_create([User(email=email, is_active=True) for email in emails])
+        try:
+            self.bench(bench_users, rounds)
+        finally:
+            User.objects.filter(email__in=emails).delete()
+
+    def bench(self, users, rounds):
+        view = TokenRefreshView.as_view()
+        factory = APIRequestFactory()
+
+        def refresh(token):
+            return view(factory.post("/api/auth/token/refresh/", {"refresh": token}, format="json"))
+
+        tokens = {user.pk: str(RoleClaimsRefreshToken.for_user(user)) for user in users}
+        rows_before = RevokedToken.objects.count()
+        first_tokens = dict(tokens)
+        for round_ in range(1, rounds + 1):
+            samples, queries = [], 0
+            started = time.perf_counter()
+            for user_id, token in tokens.items():
+                request_started = time.perf_counter()
+                with CaptureQueriesContext(connection) as captured:
+                    response = refresh(token)
+                samples.append(time.perf_counter() - request_started)
+                queries += len(captured)
+                if response.status_code != 200:
+                    raise CommandError(f"Refresh of user {user_id} failed: {response.status_code} {response.data}")
+                tokens[user_id] = response.data["refresh"]
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"round {round_}: {len(tokens) / elapsed:.0f} refresh/s p50={percentile(samples, 50) * 1000:.2f}ms "
+                f"p95={percentile(samples, 95) * 1000:.2f}ms queries/refresh={queries / len(tokens):.1f} "
+                f"revoked rows={RevokedToken.objects.count() - rows_before}"
+            )
+
+        replayed = refresh(next(iter(first_tokens.values())))
+        if replayed.status_code != 401:
+            raise CommandError(f"A rotated token was accepted again: {replayed.status_code}")
+
+        deactivated = [user.pk for user in users[: len(users) // 2]]
+        started = time.perf_counter()
+        revoke_user_tokens(deactivated)
+        self.stdout.write(f"revoked the tokens of {len(deactivated)} users in {(time.perf_counter() - started) * 1000:.2f}ms")
+        refused = sum(refresh(tokens[user_id]).status_code == 401 for user_id in deactivated)
+        if refused != len(deactivated):
+            raise CommandError(f"{len(deactivated) - refused} deactivated user(s) could still refresh")
+
+        rows = RevokedToken.objects.count() - rows_before
+        started = time.perf_counter()
+        deleted = prune_revoked_tokens(now=timezone.now() + jwt_settings.REFRESH_TOKEN_LIFETIME)
+        self.stdout.write(
+            f"pruned {deleted} of {rows} rows in {(time.perf_counter() - started) * 1000:.2f}ms "
+            f"once expired, {RevokedToken.objects.count()} left"
+        )
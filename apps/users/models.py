@@ -10,6 +10,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=timezone.now)
+    # bumped when the user's roles or their permissions change; role-claims tokens carry it (apps.roles.tokens)
+    permissions_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -18,3 +20,18 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """
+        A refresh token that may not be used again, kept only until it would have expired
+        (apps.users.blacklist). With a jti it is one token (rotated on refresh); without one,
+        every refresh token of ``user`` issued before ``revoked_at`` (deactivation).
+    """
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti or f"all tokens of user {self.user_id}"
@@ -1,15 +1,19 @@
+import logging
+
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from dj_rest_auth.serializers import LoginSerializer
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
-from django.contrib.auth.models import Permission
 from django.conf import settings
 
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as google_requests
+from apps.roles.snapshot import codenames, get_snapshot, get_snapshots, role_map
+
+from .google_certs import GoogleCertsUnavailable, google_certs
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 class CustomRegisterSerializer(RegisterSerializer):
     username = None
     email = serializers.EmailField(required=True)
@@ -52,10 +56,12 @@ class GoogleIDTokenSerializer(serializers.Serializer):
         raw_token = attrs.get("id_token")
         if not raw_token:
             raise serializers.ValidationError("id_token is required")
-        # Verify signature + claims using Google's public key
+        # Verify signature + claims using Google's public keys (cached, see google_certs)
         try:
-            request = google_requests.Request()
-            claims = google_id_token.verify_oauth2_token(raw_token, request)
+            claims = google_certs.verify(raw_token)
+        except GoogleCertsUnavailable as e:
+            logger.warning("Google ID token not verified: %s", e)
+            raise serializers.ValidationError("Google sign-in is unavailable, try again later.")
         except Exception:
             raise serializers.ValidationError("Invalid Google ID token")
             
@@ -91,39 +97,107 @@ class GoogleIDTokenSerializer(serializers.Serializer):
         })
         return attrs
 
-class UserSerializer(serializers.ModelSerializer):
+class SnapshotListSerializer(serializers.ListSerializer):
+    """
+        Loads the roles/permissions snapshots of a whole page of users at once
+        (one cache round trip, at most two queries) before serializing it.
+    """
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, "all") else data)
+        self.child.snapshots = get_snapshots(users)
+        return super().to_representation(users)
+
+
+class SnapshotMixin:
+    """Reads roles and permissions from the cached per-user snapshot (apps.roles.snapshot)."""
+    snapshots = None
+
+    def get_snapshot(self, obj):
+        if self.snapshots and obj.pk in self.snapshots:
+            return self.snapshots[obj.pk]
+        return get_snapshot(obj)
+
+
+class UserSerializer(SnapshotMixin, serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
     permissions = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [ "id", "email", "first_name", "last_name", "roles", "permissions"]
+        list_serializer_class = SnapshotListSerializer
         
     def get_roles(self, obj):
         """
             Return an array of groups (roles) that belongs to a user
         """
-        return [g.name for g in obj.groups.all()]
+        return self.get_snapshot(obj)["roles"]
     
     def get_permissions(self, obj):
         """
             Returns all permission codename assigned directly or via roles
         """
-        user_perms = Permission.objects.filter(user=obj).order_by().values_list("codename", flat=True)
-        group_perms = Permission.objects.filter(group__user=obj).order_by().values_list("codename", flat=True)
-        combined = user_perms.union(group_perms)
-        return list(combined)
+        return codenames(self.get_snapshot(obj))
     
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(SnapshotMixin, serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
     permissions = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = [ "id", "email", "first_name", "last_name", "is_active", "roles", "permissions" ]
+        list_serializer_class = SnapshotListSerializer
         
     def get_roles(self, obj):
-        return list(obj.groups.values_list("name", flat=True))
+        return self.get_snapshot(obj)["roles"]
+
+    def get_permissions(self, obj):
+        # same as get_all_permissions(): inactive users hold none
+        return self.get_snapshot(obj)["permissions"] if obj.is_active else []
+
+class RoleMapListSerializer(serializers.ListSerializer):
+    """Loads the cached role map once for the page (one query while it is warm, its generation)."""
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, "all") else data)
+        self.child.role_map = role_map(
+            role_ids={pk for user in users for pk in user.role_ids},
+            permission_ids={pk for user in users for pk in user.permission_ids},
+        )
+        return super().to_representation(users)
+
+
+class AdminUserDirectorySerializer(serializers.ModelSerializer):
+    """
+        AdminUserSerializer's output for the directory page, from a queryset annotated with
+        role_ids and permission_ids (AdminUserViewSet.get_queryset): names and permissions
+        come from the role map, so a page costs the same queries whatever its size.
+    """
+    roles = serializers.SerializerMethodField()
+    permissions = serializers.SerializerMethodField()
+    role_map = None
+
+    class Meta:
+        model = User
+        fields = [ "id", "email", "first_name", "last_name", "is_active", "roles", "permissions" ]
+        list_serializer_class = RoleMapListSerializer
+
+    def get_mapping(self, obj):
+        if self.role_map is None:
+            self.role_map = role_map(role_ids=obj.role_ids, permission_ids=obj.permission_ids)
+        return self.role_map
+
+    def get_roles(self, obj):
+        roles = self.get_mapping(obj)["roles"]
+        return sorted(roles[pk][0] for pk in obj.role_ids)
 
     def get_permissions(self, obj):
-        return sorted(list(obj.get_all_permissions()))
\ No newline at end of file
+        # same as get_all_permissions(): inactive users hold none, superusers all of them
+        if not obj.is_active:
+            return []
+        mapping = self.get_mapping(obj)
+        if obj.is_superuser:
+            return sorted(mapping["permissions"].values())
+        ids = set(obj.permission_ids)
+        for pk in obj.role_ids:
+            ids.update(mapping["roles"][pk][1])
+        return sorted({mapping["permissions"][pk] for pk in ids})
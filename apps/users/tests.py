@@ -1,3 +1,100 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.roles.tokens import RoleClaimsRefreshToken
+from apps.users import blacklist
+from apps.users.fake_google import FakeGoogleCertServer
+from apps.users.google_certs import google_certs
+from apps.users.login import RETURNING_LOGIN_QUERIES
+from apps.users.models import RevokedToken
+
+CLIENT_ID = "sunkinghub-tests.apps.googleusercontent.com"
+
+# a private cache, so tests may clear it without touching a shared one (REDIS_URL)
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "users-tests"}}
+
+
+class GoogleVerifyQueriesTests(TransactionTestCase):
+    """
+        Query budget of POST /api/auth/google/verify, with certs from a local fake Google.
+        Transactions really commit, so the caches are warmed as in production (on commit).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.google = FakeGoogleCertServer().__enter__()
+        cls.addClassCleanup(cls.google.__exit__, None, None, None)
+        cls.enterClassContext(override_settings(GOOGLE_CLIENT_ID=CLIENT_ID, GOOGLE_CERTS_URL=cls.google.certs_url))
+
+    def setUp(self):
+        google_certs.forget()
+        self.addCleanup(google_certs.forget)
+
+    def login(self, email):
+        token = self.google.id_token(email, audience=CLIENT_ID)
+        return self.client.post("/api/auth/google/verify", {"id_token": token}, content_type="application/json")
+
+    def test_returning_login_queries(self):
+        # the first login creates the user and warms the caches
+        response = self.login("returning@sunkinghub.local")
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(RETURNING_LOGIN_QUERIES):
+            response = self.login("returning@sunkinghub.local")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"]["email"], "returning@sunkinghub.local")
+
+    def test_inactive_user_is_refused(self):
+        get_user_model().objects.create(email="inactive@sunkinghub.local", is_active=False)
+        response = self.login("inactive@sunkinghub.local")
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RefreshRevocationTests(TestCase):
+    """is_revoked after a rotation and after AdminUserViewSet.destroy."""
+
+    def setUp(self):
+        self.forget_revocations()
+        self.addCleanup(self.forget_revocations)
+        self.user = get_user_model().objects.create(email="revoked@sunkinghub.local")
+        self.refresh = RoleClaimsRefreshToken.for_user(self.user)
+
+    def forget_revocations(self):
+        # as in a fresh worker: nothing remembered in memory or in the cache
+        cache.clear()
+        blacklist._local_revoked.clear()
+
+    def refresh_with(self, token):
+        return APIClient().post("/api/auth/token/refresh/", {"refresh": str(token)}, format="json")
+
+    def test_rotated_token_is_refused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data["refresh"], str(self.refresh))
+
+        self.assertTrue(blacklist.is_revoked(self.refresh.payload))
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+        # another worker: the reuse fails on the revoked jti's row
+        self.forget_revocations()
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(RevokedToken.objects.filter(jti=self.refresh.payload["jti"]).count(), 1)
+        self.assertEqual(self.refresh_with(response.data["refresh"]).status_code, 200)
+
+    def test_deactivated_user_tokens_are_refused(self):
+        other = RoleClaimsRefreshToken.for_user(get_user_model().objects.create(email="kept@sunkinghub.local"))
+        admin = APIClient()
+        admin.force_authenticate(get_user_model().objects.create(email="admin@sunkinghub.local", is_superuser=True))
+
+        self.assertEqual(admin.delete(f"/api/users/{self.user.pk}/").status_code, 200)
+
+        self.assertTrue(blacklist.is_revoked(self.refresh.payload))
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertFalse(blacklist.is_revoked(other.payload))
+        # one row for the user, whatever the number of tokens it holds
+        self.assertEqual(RevokedToken.objects.filter(user_id=self.user.pk, jti__isnull=True).count(), 1)
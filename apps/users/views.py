@@ -1,22 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.db import transaction
+from django.db.models import Q, Value
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions, viewsets
+from rest_framework import filters, status, permissions, viewsets
 from rest_framework.permissions import IsAuthenticated
-from django.contrib.auth.models import Group
 
 
-from .serializers import GoogleIDTokenSerializer, AdminUserSerializer, UserSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .blacklist import revoke_user_tokens
+from .filters import UserDirectoryFilterBackend
+from .login import google_user, link_google_account
+from .serializers import GoogleIDTokenSerializer, AdminUserDirectorySerializer, AdminUserSerializer, UserSerializer
+from dj_rest_auth.jwt_auth import get_refresh_view
+from apps.request.pagination import StandardResultsSetPagination
 from apps.roles.permissions import HasRole
-
-# Storing Google link with allauth
-try:
-    from allauth.socialaccount.models import SocialAccount
-    HAS_ALLAUTH_SOCIAL = True
-except Exception:
-    HAS_ALLAUTH_SOCIAL = False
+from apps.roles.tokens import RoleClaimsRefreshToken, RoleClaimsTokenRefreshSerializer
 
 User = get_user_model()
 
@@ -26,83 +25,97 @@ class GoogleVerifyView(APIView):
     POST /api/auth/google/verify/
     Body: { "id_token": "<Google ID token>" }
     Returns: { access, refresh, user: {...} }
+
+    A returning user with warm caches (Google certs, roles snapshot, account link) costs
+    one query; only a first login writes, in its own short transaction (apps.users.login).
     """
     permission_classes = [permissions.AllowAny]
 
-    @transaction.atomic
     def post(self, request, *args, **kwargs):
         ser = GoogleIDTokenSerializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
 
         email = ser.validated_data["email"]
-        first_name = ser.validated_data.get("first_name", "")
-        last_name = ser.validated_data.get("last_name", "")
         google_sub = ser.validated_data.get("google_sub")
 
-        # 1) Get or create local user by email
-        user, created = User.objects.get_or_create(
-            email=email,
-            defaults={"first_name": first_name, "last_name": last_name, "is_active": True},
+        # 1) Get or create local user by email, new users get the default role
+        user, created = google_user(
+            email,
+            first_name=ser.validated_data.get("first_name", ""),
+            last_name=ser.validated_data.get("last_name", ""),
         )
-        
-        # 2) Assign a default role to the user ** We can use signals to automate it. But later **
-        if created:
-            default_role, _ = Group.objects.get_or_create(name='User')
-            user.groups.add(default_role)
-
-        # 3) Optional: update names if blank
-        if not created:
-            changed = False
-            if first_name and not user.first_name:
-                user.first_name = first_name
-                changed = True
-            if last_name and not user.last_name:
-                user.last_name = last_name
-                changed = True
-            if changed:
-                user.save(update_fields=["first_name", "last_name"])
-        
-        # 4) Checking if the user has been deactivated
+
+        # 2) Checking if the user has been deactivated
         if not user.is_active:
             return Response({"detail": "Account is inactive."}, status=status.HTTP_403_FORBIDDEN)
-        
-        # 5) Serializing User with roles and permissions
+
+        # 3) Serializing User with roles and permissions (cached snapshot)
         user_data = UserSerializer(user, context={"request": request}).data
 
-        # 2) (Optional) record Google link in allauth's SocialAccount
-        #     This is nice for audits and to prevent duplicate links.
-        if HAS_ALLAUTH_SOCIAL and google_sub:
-            SocialAccount.objects.get_or_create(
-                user=user,
-                provider="google",
-                uid=str(google_sub),
-                defaults={"extra_data": {"email": email}},
-            )
+        # 4) Record the Google link in allauth's SocialAccount
+        link_google_account(user, google_sub, email)
 
-        # 3) Issue your own JWTs
-        refresh = RefreshToken.for_user(user)
+        # 5) Issue your own JWTs (with the role claims when ROLES_IN_TOKEN is on)
+        refresh = RoleClaimsRefreshToken.for_user(user)
         access = refresh.access_token
 
-        # 4) Return what frontend needs
+        # 6) Return what frontend needs
         return Response({
             "access": str(access),
             "refresh": str(refresh),
             "user": user_data,
         }, status=status.HTTP_200_OK)
         
+class TokenRefreshView(get_refresh_view()):
+    """
+    POST /api/auth/token/refresh/
+    dj_rest_auth's refresh, with the access token's role claims stamped from the current roles.
+    """
+    serializer_class = RoleClaimsTokenRefreshSerializer
+
+
 class AdminUserViewSet(viewsets.ModelViewSet):
     """
         Full CRUD for users by Admins or Managers
+
+        The list is the paginated user directory: ?search= (email, first and last name),
+        ?role=Admin,Finance &is_active=true (UserDirectoryFilterParamsSerializer) and
+        ?ordering=email|first_name|last_name|date_joined|id. Each row's role and direct
+        permission ids are aggregated in the page query and resolved from the cached role
+        map, so a page is a count and one select whatever its size.
     """
     queryset = User.objects.all().order_by("-id")
     serializer_class = AdminUserSerializer
     permission_classes = [ IsAuthenticated, HasRole(["Admin"])]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [UserDirectoryFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ["email", "first_name", "last_name"]
+    ordering_fields = ["email", "first_name", "last_name", "date_joined", "id"]
+    ordering = ["-id"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = queryset.annotate(
+                role_ids=ArrayAgg("groups__id", distinct=True, filter=Q(groups__isnull=False), default=Value([])),
+                permission_ids=ArrayAgg(
+                    "user_permissions__id", distinct=True, filter=Q(user_permissions__isnull=False), default=Value([]),
+                ),
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return AdminUserDirectorySerializer
+        return super().get_serializer_class()
     
     def destroy(self, request, *args, **kwargs):
         """
-            Users soft delete
+            Users soft delete, their refresh tokens are revoked
         """
         user = self.get_object()
         user.is_active = False
-        user.save(update_fields=["is_active"])
+        with transaction.atomic():
+            user.save(update_fields=["is_active"])
+            revoke_user_tokens([user.pk])
         return Response({"detail": f"User {user.email} deactivated."}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -18,6 +18,8 @@ INSTALLED_APPS = [
     "apps.paga_payments",
     "apps.request",
     "apps.projects",
+    "apps.sla",
+    "apps.search",
 
     # Django core
     "django.contrib.admin",
@@ -27,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
 
     # Third-party
     "rest_framework",
@@ -112,7 +115,7 @@ AUTHENTICATION_BACKENDS = [
 # DRF + JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.roles.tokens.RoleClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -127,6 +130,7 @@ REST_AUTH_REGISTER_SERIALIZERS = {
 REST_AUTH_SERIALIZERS = {
     "LOGIN_SERIALIZER":"apps.users.serializers.CustomLoginSerializer",
     "USER_DETAILS_SERIALIZER": "apps.users.serializers.UserSerializer",
+    "JWT_TOKEN_CLAIMS_SERIALIZER": "apps.roles.tokens.RoleClaimsTokenObtainPairSerializer",
 }
 
 SIMPLE_JWT = {
@@ -151,6 +155,13 @@ ACCOUNT_SIGNUP_FIELDS = ["email", "password1", "password2"]
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_ISSUERS = {"https://accounts.google.com", "accounts.google.com"}
 
+# Google ID token signing certs (apps.users.google_certs): cached for the response's
+# Cache-Control max-age (GOOGLE_CERTS_TTL without one), then refreshed in background
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_TTL = int(os.getenv("GOOGLE_CERTS_TTL", str(60 * 60)))
+GOOGLE_CERTS_TIMEOUT = float(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
+GOOGLE_CERTS_REFRESH_LOCK = 60  # seconds between refresh attempts (background or unknown key id)
+
 
 # Google OAuth
 SOCIALACCOUNT_PROVIDERS = {
@@ -164,6 +175,82 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Cache (bank directory, duplicate-payment fingerprints). Set REDIS_URL in production
+# so every worker shares one cache; the local-memory default is per process.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sunkinghub",
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+}
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Cached effective roles/permissions per user (apps.roles.snapshot), versioned so edits apply at once;
+# also checked against User.permissions_version and the RolesGeneration row, so a per-process cache is safe
+ROLES_SNAPSHOT_TTL = 24 * 60 * 60
+
+# Role names, permission codenames and a permissions version in the access token (apps.roles.tokens),
+# so HasRole/HasPermission answer without the database. A role change bumps the version and older
+# tokens get a 401 until refreshed; is_active and the version are re-read at most every TTL seconds.
+ROLES_IN_TOKEN = os.getenv("ROLES_IN_TOKEN", "False") == "True"
+ROLES_TOKEN_STATE_TTL = 60
+
+# Role (Group) given to users on their first Google login (apps.users.login)
+DEFAULT_USER_ROLE = os.getenv("DEFAULT_USER_ROLE", "User")
+
+# SLA sweeper (apps.sla): re-evaluates sla_status of open requests, projects and tasks
+SLA_DUE_SOON_THRESHOLD = timedelta(hours=24)
+SLA_SWEEP_INTERVAL = int(os.getenv("SLA_SWEEP_INTERVAL", "60"))  # seconds
+SLA_SWEEP_IN_PROCESS = os.getenv("SLA_SWEEP_IN_PROCESS", "False") == "True"  # run it inside the web process
+SLA_EVENTS_POLL_INTERVAL = 2.0  # seconds between event log reads per open stream
+SLA_EVENTS_KEEPALIVE = 15  # seconds of silence before a keepalive comment
+SLA_EVENTS_STREAM_TIMEOUT = 5 * 60  # seconds before a stream is closed (the client reconnects)
+
+# Bulk task actions on /api/projects/<id>/tasks/bulk/ (apps.projects.bulk)
+TASKS_BULK_MAX_ROWS = int(os.getenv("TASKS_BULK_MAX_ROWS", "1000"))
+
+# Request -> project conversion (apps.projects.conversion): task rows scaffolded by template name.
+# due_in_days counts from the project start date.
+PROJECT_CONVERT_MAX_REQUESTS = int(os.getenv("PROJECT_CONVERT_MAX_REQUESTS", "1000"))
+PROJECT_TASK_TEMPLATES = {
+    "default": [
+        {"title": "Scoping", "status": "scoping", "estimated_hours": 8, "due_in_days": 3},
+        {"title": "Build", "estimated_hours": 40, "due_in_days": 14},
+        {"title": "Testing", "estimated_hours": 16, "due_in_days": 21},
+        {"title": "Rollout", "estimated_hours": 8, "due_in_days": 28},
+    ],
+}
+
+# Paga business API client
+PAGA_BASE_URL = os.getenv("PAGA_BASE_URL", "")
+PAGA_PRINCIPAL = os.getenv("PAGA_PRINCIPAL")
+PAGA_CREDENTIALS = os.getenv("PAGA_CREDENTIALS")
+PAGA_HASHKEY = os.getenv("PAGA_HASHKEY", "")
+PAGA_CONNECT_TIMEOUT = float(os.getenv("PAGA_CONNECT_TIMEOUT", "3.05"))
+PAGA_READ_TIMEOUT = float(os.getenv("PAGA_READ_TIMEOUT", "25"))
+PAGA_POOL_MAXSIZE = int(os.getenv("PAGA_POOL_MAXSIZE", "20"))   # keep-alive connections per process
+PAGA_MAX_RETRIES = int(os.getenv("PAGA_MAX_RETRIES", "2"))
+PAGA_RETRY_BACKOFF = float(os.getenv("PAGA_RETRY_BACKOFF", "0.3"))  # seconds, doubled per attempt
+PAGA_BANKS_TTL = int(os.getenv("PAGA_BANKS_TTL", str(6 * 60 * 60)))  # bank list served fresh, then refreshed in background
+PAGA_BANKS_REFRESH_LOCK = 60  # seconds between background refresh attempts
+PAGA_BANKS_FAILURE_TTL = 30  # seconds callers fail fast after a failed fetch into an empty cache
+PAGA_DISPATCH_MODE = os.getenv("PAGA_DISPATCH_MODE", "sync")  # "sync" or "queue" (run_payment_dispatcher)
+PAGA_DISPATCH_WORKERS = int(os.getenv("PAGA_DISPATCH_WORKERS", "8"))
+PAGA_DISPATCH_LEASE = 300  # seconds before a PROCESSING job from a dead worker is requeued
+PAGA_DISPATCH_MAX_ATTEMPTS = 3
+PAGA_DUPLICATE_WINDOW = 15 * 60  # seconds an identical PENDING/SUCCESS payment blocks a new one
+PAGA_BATCH_MAX_ROWS = int(os.getenv("PAGA_BATCH_MAX_ROWS", "10000"))
+PAGA_BATCH_RATE_LIMIT = float(os.getenv("PAGA_BATCH_RATE_LIMIT", "20"))  # dispatch jobs per second per batch, 0 = no limit
+PAGA_RECONCILE_WORKERS = int(os.getenv("PAGA_RECONCILE_WORKERS", "8"))  # status lookups in flight
+PAGA_RECONCILE_CHUNK = 200  # payments read, looked up and written per round
+PAGA_RECONCILE_GRACE = 5 * 60  # seconds a payment must be PENDING before it is reconciled
+PAGA_RECONCILE_RATE_LIMIT = float(os.getenv("PAGA_RECONCILE_RATE_LIMIT", "0"))  # status lookups per second, 0 = no limit
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
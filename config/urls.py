@@ -2,12 +2,14 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from apps.users.views import GoogleVerifyView
+from apps.users.views import GoogleVerifyView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Ahead of dj_rest_auth's own refresh: re-stamps the role claims (ROLES_IN_TOKEN)
+    path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/", include("dj_rest_auth.urls")),
     path("api/auth/registration/", include("dj_rest_auth.registration.urls")),
     
@@ -31,5 +33,11 @@ urlpatterns = [
     path("api/payments/", include("apps.paga_payments.urls")),
     
     # Projects and Tasks endpoints
-    path("api/", include("apps.projects.urls"))
+    path("api/", include("apps.projects.urls")),
+    
+    # SLA event log and live stream
+    path("api/", include("apps.sla.urls")),
+
+    # Full-text search across requests, projects and tasks
+    path("api/", include("apps.search.urls")),
 ]